@@ -5,10 +5,12 @@ Returns entities below fixed 15% threshold.
 """
 
 import asyncio
+import base64
 import json
 import logging
+import re
 import uuid
-from typing import Any, Dict, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 
 from aiohttp import web
@@ -22,6 +24,300 @@ logger = logging.getLogger(__name__)
 
 THRESHOLD = 15
 
+# Attributes the real integration forwards (DEFAULT_ATTRIBUTES in const.py)
+DEFAULT_ATTRIBUTES = ("friendly_name", "device_class", "unit_of_measurement", "icon")
+
+# Default stream_entities chunk size (STREAM_CHUNK_BYTES in const.py)
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Severity tier upper bounds (DEFAULT_SEVERITY_TIERS in const.py); levels
+# at or above the last bound are "ok"
+SEVERITY_TIERS = (("critical", 5), ("warning", 15), ("watch", 30))
+TIERS = tuple(name for name, _ in SEVERITY_TIERS) + ("ok",)
+
+
+def _tier(level: float) -> str:
+    for name, bound in SEVERITY_TIERS:
+        if level < bound:
+            return name
+    return "ok"
+
+
+# Binary battery sensor states; they have no level (BINARY_SENSOR_PREFIX
+# in const.py), "on" is low with status "low" (STATUS_LOW), "off" is "ok"
+BINARY_STATES = ("on", "off")
+
+
+def _battery_level(entity_id: str, state: Any) -> Optional[float]:
+    """Level of a battery state, clamped to 0-100; None for a binary sensor.
+
+    Raises ValueError for a state that is neither a level nor on/off.
+    """
+    if entity_id.startswith("binary_sensor."):
+        if state not in BINARY_STATES:
+            raise ValueError(f"no level for {state!r}")
+        return None
+    return max(0.0, min(100.0, float(state)))
+
+
+def _status(level: Optional[float], state: Any) -> str:
+    """Severity of a tracked battery: its tier, or low/ok for a binary sensor."""
+    if level is None:
+        return "low" if state == "on" else "ok"
+    return _tier(level)
+
+
+def _is_low(row: Dict[str, Any]) -> bool:
+    """On the low list: below the threshold, or a binary sensor that is on."""
+    level = row["battery_level"]
+    return row["state"] == "on" if level is None else level < THRESHOLD
+
+
+def _level_rank(level: Optional[float]) -> Tuple[bool, float]:
+    """Level part of a sort key; binary sensors (no level) sort first."""
+    return (level is not None, level or 0.0)
+
+
+# Versions query_changes can diff against before answering with "full"
+CHANGE_LOG_VERSIONS = 50
+
+# Level histogram buckets (5% wide, HISTOGRAM_BUCKET_WIDTH in const.py)
+HISTOGRAM_BUCKETS = 20
+
+# Rollup child lists by depth (ROLLUP_DEPTHS in const.py)
+ROLLUP_LEVELS = ("floors", "areas", "devices")
+
+# Fields a query_unavailable row has (UNAVAILABLE_FIELDS in const.py)
+UNAVAILABLE_FIELDS = frozenset({
+    "entity_id", "state", "battery_level", "device_name", "manufacturer",
+    "model", "area_name", "last_changed", "last_updated",
+})
+
+
+def _project(rows: List[Dict[str, Any]], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Apply an optional "fields" projection to result rows."""
+    if not fields:
+        return rows
+    return [{key: row[key] for key in fields if key in row} for row in rows]
+
+
+def _timestamp(value: Optional[str]) -> float:
+    """POSIX seconds of an ISO timestamp; 0 when missing."""
+    if not value:
+        return 0.0
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+# Sort orders of the low-battery list (_SORT_KEYS in battery_monitor.py)
+SORT_KEYS = {
+    "level": lambda r: (
+        *_level_rank(r["battery_level"]), r["device_name"] or r["entity_id"],
+        r["entity_id"],
+    ),
+    "name": lambda r: ((r["device_name"] or r["entity_id"]).casefold(), r["entity_id"]),
+    "area": lambda r: (
+        r["area_name"] is None, (r["area_name"] or "").casefold(),
+        *_level_rank(r["battery_level"]), r["entity_id"],
+    ),
+    "last_changed": lambda r: (-_timestamp(r["last_changed"]), r["entity_id"]),
+    "margin": lambda r: (
+        *_level_rank(
+            None if r["battery_level"] is None else r["battery_level"] - THRESHOLD
+        ),
+        r["entity_id"],
+    ),
+}
+
+
+# Words of the searchable text (search_index.py)
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _trigrams(text: str, prefix: bool = False) -> Set[str]:
+    """Trigrams of every word, padded like search_index._trigrams."""
+    grams: Set[str] = set()
+    tail = "" if prefix else " "
+    for word in _WORD.findall(text.casefold()):
+        padded = f"  {word}{tail}"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _row_trigrams(row: Dict[str, Any]) -> Set[str]:
+    return _trigrams(" ".join(
+        value
+        for value in (
+            row.get("device_name"), row["entity_id"],
+            row.get("area_name"), row.get("model"),
+        )
+        if value
+    ))
+
+
+def _search(
+    rows: List[Dict[str, Any]], command: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """Keep the rows matching the command's "search" text, if any."""
+    grams = _trigrams(command.get("search") or "", prefix=True)
+    if not grams:
+        return rows
+    return [row for row in rows if grams <= _row_trigrams(row)]
+
+
+# Filter leaves (filters.py) and their limits (FILTER_MAX_* in const.py)
+FILTER_LEAVES = {"tier", "label", "low", "search", "area", "floor", "below"}
+FILTER_MAX_DEPTH = 8
+
+
+def _check_filter(expression: Any, depth: int) -> None:
+    """Raise ValueError unless expression follows the filter grammar."""
+    if depth > FILTER_MAX_DEPTH + 1:
+        raise ValueError("Invalid filter: too deep")
+    if not isinstance(expression, dict) or len(expression) != 1:
+        raise ValueError("Invalid filter: each term is an object with one key")
+    ((key, value),) = expression.items()
+    if key in ("and", "or"):
+        if not isinstance(value, list) or not value:
+            raise ValueError(f"Invalid filter: {key} takes a non-empty list")
+        for operand in value:
+            _check_filter(operand, depth + 1)
+    elif key == "not":
+        _check_filter(value, depth + 1)
+    elif key not in FILTER_LEAVES:
+        raise ValueError(f"Invalid filter: unknown filter term: {key!r}")
+    elif key == "tier" and value not in TIERS:
+        raise ValueError(f"Invalid filter: unknown tier: {value!r}")
+    elif key == "low" and value is not True:
+        raise ValueError("Invalid filter: low only takes true")
+    elif key == "below" and (
+        isinstance(value, bool) or not isinstance(value, (int, float))
+        or not 0 <= value <= 100
+    ):
+        raise ValueError("Invalid filter: below takes a number from 0 to 100")
+    elif key not in ("tier", "low", "below") and (not isinstance(value, str) or not value):
+        raise ValueError(f"Invalid filter: {key} takes a non-empty string")
+
+
+def _filter_matches(
+    expression: Dict[str, Any], row: Dict[str, Any], entity: Dict[str, Any]
+) -> bool:
+    """Evaluate a checked filter against one row and its entity data."""
+    ((key, value),) = expression.items()
+    if key == "and":
+        return all(_filter_matches(term, row, entity) for term in value)
+    if key == "or":
+        return any(_filter_matches(term, row, entity) for term in value)
+    if key == "not":
+        return not _filter_matches(value, row, entity)
+    level = row.get("battery_level")
+    if key == "tier":
+        return row.get("status") == value
+    if key == "low":
+        return "status" in row and _is_low(row)
+    if key == "below":
+        return level is not None and level < value
+    if key == "label":
+        return value in entity.get("labels", ())
+    if key == "search":
+        return _trigrams(value, prefix=True) <= _row_trigrams(row)
+    if key == "floor":
+        return entity.get("floor_id") == value
+    area = entity.get("area_name")
+    return area is not None and area.casefold().replace(" ", "_") == value
+
+
+def _relevance_key(command: Dict[str, Any]):
+    """Best match first, as in BatteryMonitor search results."""
+    count = len(_trigrams(command["search"], prefix=True))
+    return lambda r: (-round(count / len(_row_trigrams(r)), 6), r["entity_id"])
+
+
+def _group_key(group: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Device groups: lowest level first (group_index in battery_monitor.py).
+
+    Groups with a binary sensor that is on (status "low") come first.
+    """
+    return (
+        *_level_rank(None if group["status"] == "low" else group["min_level"]),
+        group["device_name"].casefold(),
+        group["device_id"] or group["entities"][0]["entity_id"],
+    )
+
+
+def _paginate(
+    rows: List[Dict[str, Any]], sort: str, command: Dict[str, Any], key=None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Sort rows and cut the page selected by "limit"/"cursor".
+
+    Rows narrowed by a "search" are ranked by relevance instead of sort;
+    key overrides the sort order's key (for grouped rows).
+    Returns (page, extra result keys); raises ValueError for a bad cursor.
+    """
+    if key is None and _trigrams(command.get("search") or "", prefix=True):
+        sort = "relevance"
+        key = _relevance_key(command)
+    elif key is None:
+        key = SORT_KEYS[sort]
+    rows = sorted(rows, key=key)
+    cursor = command.get("cursor")
+    if cursor:
+        try:
+            cursor_sort, after = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except Exception as err:
+            raise ValueError("malformed cursor") from err
+        if cursor_sort != sort:
+            raise ValueError("cursor does not match this sort order")
+        rows = [row for row in rows if list(key(row)) > after]
+    limit = command.get("limit")
+    if limit is None:
+        return rows, {}
+    page = rows[:limit]
+    has_more = len(rows) > limit
+    next_cursor = None
+    if has_more:
+        raw = json.dumps([sort, list(key(page[-1]))], separators=(",", ":"))
+        next_cursor = base64.urlsafe_b64encode(raw.encode()).decode()
+    return page, {"has_more": has_more, "next_cursor": next_cursor}
+
+
+# Dictionary-encoded fields in columnar results (serialization.py)
+DICTIONARY_FIELDS = {"state", "status", "manufacturer", "model", "area_name"}
+
+
+def _result_data(rows: List[Dict[str, Any]], command: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a query result in the requested "format" (rows or columnar)."""
+    rows = _project(rows, command.get("fields"))
+    if command.get("format") != "columnar":
+        return {"entities": rows, "total": len(rows)}
+
+    fields = command.get("fields") or (list(rows[0]) if rows else [])
+    columns: Dict[str, List[Any]] = {}
+    dictionaries: Dict[str, List[Any]] = {}
+    for field in fields:
+        column = [row.get(field) for row in rows]
+        if field in DICTIONARY_FIELDS:
+            lookup: Dict[Any, int] = {}
+            column = [lookup.setdefault(value, len(lookup)) for value in column]
+            dictionaries[field] = list(lookup)
+        columns[field] = column
+    return {
+        "format": "columnar",
+        "fields": fields,
+        "columns": columns,
+        "dictionaries": dictionaries,
+        "total": len(rows),
+    }
+
+
+class _CapturedReply:
+    """Stands in for the socket so a handler's reply can be collected."""
+
+    def __init__(self) -> None:
+        self.reply: Dict[str, Any] = {}
+
+    async def send_json(self, data: Dict[str, Any]) -> None:
+        self.reply = data
+
 
 class MockHAServer:
     """Mock Home Assistant server."""
@@ -33,6 +329,18 @@ class MockHAServer:
         self.subscriptions: Dict[str, Set[str]] = {}
         self.control_config: Dict[str, Any] = {}
         self.message_id_counter = 0
+        # Index version and the low-list rows as of each recent version,
+        # standing in for the integration's change log
+        self.version = 0
+        # Random id per process start; versions only compare within one
+        self.epoch = uuid.uuid4().hex[:12]
+        self.low_history: Dict[int, Dict[str, Dict[str, Any]]] = {0: {}}
+        # subscribe_summary streams: (socket, msg_id) -> last summary sent
+        self.summary_subscribers: Dict[Any, Dict[str, Any]] = {}
+        # subscribe_rollup streams: (socket, msg_id) -> (depth, last rollup)
+        self.rollup_subscribers: Dict[Any, Tuple[int, Dict[str, Any]]] = {}
+        # subscribe_battery_types streams: (socket, msg_id) -> last result sent
+        self.battery_types_subscribers: Dict[Any, Dict[str, Any]] = {}
         self._setup_routes()
 
     def _setup_routes(self) -> None:
@@ -140,6 +448,26 @@ class MockHAServer:
             await self._handle_query_unavailable(ws, command)
         elif cmd_type == "vulcan-brownout/subscribe":
             await self._handle_subscribe(ws, command)
+        elif cmd_type == "vulcan-brownout/stream_entities":
+            await self._handle_stream_entities(ws, command)
+        elif cmd_type == "vulcan-brownout/batch":
+            await self._handle_batch(ws, command)
+        elif cmd_type == "vulcan-brownout/query_changes":
+            await self._handle_query_changes(ws, command)
+        elif cmd_type == "vulcan-brownout/summary":
+            await self._handle_summary(ws, command)
+        elif cmd_type == "vulcan-brownout/subscribe_summary":
+            await self._handle_subscribe_summary(ws, command)
+        elif cmd_type == "vulcan-brownout/histogram":
+            await self._handle_histogram(ws, command)
+        elif cmd_type == "vulcan-brownout/battery_types":
+            await self._handle_battery_types(ws, command)
+        elif cmd_type == "vulcan-brownout/subscribe_battery_types":
+            await self._handle_subscribe_battery_types(ws, command)
+        elif cmd_type == "vulcan-brownout/rollup":
+            await self._handle_rollup(ws, command)
+        elif cmd_type == "vulcan-brownout/subscribe_rollup":
+            await self._handle_subscribe_rollup(ws, command)
         else:
             if msg_id:
                 await ws.send_json({
@@ -147,33 +475,54 @@ class MockHAServer:
                     "error": {"code": "unknown_command", "message": f"Unknown: {cmd_type}"},
                 })
 
-    async def _handle_query_entities(
-        self, ws: web.WebSocketResponse, command: Dict[str, Any]
-    ) -> None:
-        """Return entities below the fixed 15% threshold, sorted by level asc."""
-        msg_id = command.get("id")
+    def _with_filter(
+        self, rows: List[Dict[str, Any]], command: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Keep the rows matching the command's "filter" and "labels".
 
-        if self.control_config.get("malformed_response", False):
-            await ws.send(b"{invalid json")
-            return
+        Raises ValueError for a filter outside the grammar (filters.py).
+        """
+        terms = [command["filter"]] if command.get("filter") is not None else []
+        if command.get("labels"):
+            terms.append({"or": [{"label": label} for label in command["labels"]]})
+        if not terms:
+            return rows
+        expression = {"and": terms}
+        _check_filter(expression, 0)
+        return [
+            row for row in rows
+            if _filter_matches(expression, row, self.entity_data[row["entity_id"]])
+        ]
 
+    def _low_battery_rows(self) -> List[Dict[str, Any]]:
+        """Build rows for entities below the fixed threshold, level ascending."""
+        return [row for row in self._tracked_rows() if _is_low(row)]
+
+    def _tracked_rows(self) -> List[Dict[str, Any]]:
+        """Build rows for every available battery entity, level ascending."""
         entities = []
         for entity_id, entity in sorted(self.entity_data.items()):
             try:
-                battery_level = float(entity.get("state", 0))
+                state = entity.get("state", 0)
+                battery_level = _battery_level(entity_id, state)
                 available = entity.get("available", True)
                 if not available:
                     continue
-                if battery_level >= THRESHOLD:
-                    continue
 
                 entities.append({
                     "entity_id": entity_id,
-                    "state": str(battery_level),
+                    "state": (
+                        state if entity_id.startswith("binary_sensor.")
+                        else str(battery_level)
+                    ),
                     "battery_level": battery_level,
                     "device_name": entity.get("friendly_name", entity_id),
-                    "status": "critical",
-                    "attributes": entity.get("attributes", {}),
+                    "status": _status(battery_level, state),
+                    "attributes": {
+                        key: value
+                        for key, value in entity.get("attributes", {}).items()
+                        if key in DEFAULT_ATTRIBUTES
+                    },
                     "last_changed": entity.get("last_changed"),
                     "last_updated": entity.get("last_updated"),
                     "manufacturer": entity.get("manufacturer"),
@@ -183,28 +532,617 @@ class MockHAServer:
             except (ValueError, TypeError):
                 continue
 
-        entities.sort(key=lambda d: d["battery_level"])
+        entities.sort(key=lambda d: _level_rank(d["battery_level"]))
+        return entities
+
+    async def _handle_query_entities(
+        self, ws: web.WebSocketResponse, command: Dict[str, Any]
+    ) -> None:
+        """Return entities below the fixed 15% threshold, sorted by level asc."""
+        msg_id = command.get("id")
+
+        if self.control_config.get("malformed_response", False):
+            await ws.send(b"{invalid json")
+            return
+
+        sort = command.get("sort", "level")
+        if sort not in SORT_KEYS:
+            await ws.send_json({
+                "type": "result", "id": msg_id, "success": False,
+                "error": {"code": "invalid_format", "message": f"Unknown sort: {sort}"},
+            })
+            return
+
+        tier = command.get("tier")
+        if tier is not None and (tier not in TIERS or sort != "level"):
+            await ws.send_json({
+                "type": "result", "id": msg_id, "success": False,
+                "error": {"code": "invalid_format", "message": f"Bad tier query: {tier}"},
+            })
+            return
+
+        group_by = command.get("group_by")
+        if group_by is not None:
+            if (
+                group_by != "device" or sort != "level" or tier is not None
+                or command.get("search") or command.get("labels")
+                or command.get("filter") is not None
+                or command.get("format") == "columnar"
+            ):
+                await ws.send_json({
+                    "type": "result", "id": msg_id, "success": False,
+                    "error": {"code": "invalid_format", "message": "Bad group_by query"},
+                })
+                return
+            await self._send_device_groups(ws, command)
+            return
+
+        if tier is None:
+            entities = self._low_battery_rows()
+        else:
+            entities = [row for row in self._tracked_rows() if row["status"] == tier]
+        try:
+            entities = self._with_filter(_search(entities, command), command)
+        except ValueError as err:
+            await ws.send_json({
+                "type": "result", "id": msg_id, "success": False,
+                "error": {"code": "invalid_format", "message": str(err)},
+            })
+            return
+        total = len(entities)
+        try:
+            entities, extra = _paginate(entities, sort, command)
+        except ValueError as err:
+            await ws.send_json({
+                "type": "result", "id": msg_id, "success": False,
+                "error": {"code": "invalid_cursor", "message": str(err)},
+            })
+            return
+
+        await ws.send_json({
+            "type": "result",
+            "id": msg_id,
+            "success": True,
+            "data": {**_result_data(entities, command), "total": total, **extra},
+        })
+
+    async def _send_device_groups(
+        self, ws: web.WebSocketResponse, command: Dict[str, Any]
+    ) -> None:
+        """Reply with devices that have a low entity, lowest level first."""
+        msg_id = command.get("id")
+        members: Dict[str, List[Dict[str, Any]]] = {}
+        for row in self._tracked_rows():
+            device_id = self.entity_data[row["entity_id"]].get("device_id")
+            members.setdefault(device_id or row["entity_id"], []).append(row)
+
+        groups = []
+        for group_id, rows in members.items():
+            low = [row for row in rows if _is_low(row)]
+            if not low:
+                continue
+            rows.sort(key=SORT_KEYS["level"])
+            levels = [
+                row["battery_level"] for row in rows
+                if row["battery_level"] is not None
+            ]
+            min_level = min(levels) if levels else None
+            # A low member without a level (binary sensor on) is the worst
+            flagged = any(row["battery_level"] is None for row in low)
+            groups.append({
+                "device_id": self.entity_data[rows[0]["entity_id"]].get("device_id"),
+                "device_name": rows[0]["device_name"],
+                "area_name": rows[0]["area_name"],
+                "min_level": min_level,
+                "status": (
+                    "low" if flagged or min_level is None else _tier(min_level)
+                ),
+                "low": len(low),
+                "entities": _project(rows, command.get("fields")),
+            })
+
+        total = len(groups)
+        try:
+            groups, extra = _paginate(groups, "device", command, key=_group_key)
+        except ValueError as err:
+            await ws.send_json({
+                "type": "result", "id": msg_id, "success": False,
+                "error": {"code": "invalid_cursor", "message": str(err)},
+            })
+            return
+        await ws.send_json({
+            "type": "result",
+            "id": msg_id,
+            "success": True,
+            "data": {"groups": groups, "total": total, **extra},
+        })
+
+    async def _handle_stream_entities(
+        self, ws: web.WebSocketResponse, command: Dict[str, Any]
+    ) -> None:
+        """Send the low-battery rows as chunk events, then an end marker."""
+        msg_id = command.get("id")
+        chunk_bytes = int(command.get("chunk_bytes", STREAM_CHUNK_BYTES))
+        try:
+            rows = self._with_filter(_search(self._low_battery_rows(), command), command)
+        except ValueError as err:
+            await ws.send_json({
+                "type": "result", "id": msg_id, "success": False,
+                "error": {"code": "invalid_format", "message": str(err)},
+            })
+            return
+        rows, _ = _paginate(
+            rows, command.get("sort", "level"), {"search": command.get("search")}
+        )
+        rows = _project(rows, command.get("fields"))
 
         await ws.send_json({
             "type": "result",
             "id": msg_id,
             "success": True,
             "data": {
-                "entities": entities,
-                "total": len(entities),
+                "total": len(rows), "version": self.version, "epoch": self.epoch,
             },
         })
 
+        chunks: List[List[Dict[str, Any]]] = []
+        chunk: List[Dict[str, Any]] = []
+        size = 0
+        for row in rows:
+            row_size = len(json.dumps(row))
+            if chunk and size + row_size > chunk_bytes:
+                chunks.append(chunk)
+                chunk = []
+                size = 0
+            chunk.append(row)
+            size += row_size + 1
+        if chunk:
+            chunks.append(chunk)
+
+        for index, chunk in enumerate(chunks):
+            await ws.send_json({
+                "type": "event",
+                "id": msg_id,
+                "event": {"chunk": index, "entities": chunk},
+            })
+            await asyncio.sleep(0)
+        await ws.send_json({
+            "type": "event",
+            "id": msg_id,
+            "event": {"end": True, "total": len(rows), "chunks": len(chunks)},
+        })
+
+    async def _handle_batch(
+        self, ws: web.WebSocketResponse, command: Dict[str, Any]
+    ) -> None:
+        """Run query/subscribe sub-commands and reply with all results at once."""
+        msg_id = command.get("id")
+        handlers = {
+            "vulcan-brownout/query_entities": self._handle_query_entities,
+            "vulcan-brownout/query_unavailable": self._handle_query_unavailable,
+            "vulcan-brownout/subscribe": self._handle_subscribe,
+            "vulcan-brownout/query_changes": self._handle_query_changes,
+            "vulcan-brownout/summary": self._handle_summary,
+            "vulcan-brownout/histogram": self._handle_histogram,
+            "vulcan-brownout/rollup": self._handle_rollup,
+            "vulcan-brownout/battery_types": self._handle_battery_types,
+        }
+
+        results = []
+        for sub_command in command.get("commands", []):
+            sub_type = sub_command.get("type")
+            handler = handlers.get(sub_type)
+            if handler is None:
+                results.append({
+                    "type": sub_type, "success": False,
+                    "error": {"code": "unknown_command",
+                              "message": f"Unsupported in batch: {sub_type}"},
+                })
+                continue
+            capture = _CapturedReply()
+            await handler(capture, {**sub_command, "id": msg_id})
+            if not capture.reply.get("success", True):
+                results.append({
+                    "type": sub_type, "success": False,
+                    "error": capture.reply["error"],
+                })
+                continue
+            results.append({
+                "type": sub_type, "success": True, "result": capture.reply["data"],
+            })
+
+        await ws.send_json({
+            "type": "result",
+            "id": msg_id,
+            "success": True,
+            "data": {
+                "version": self.version, "epoch": self.epoch, "results": results,
+            },
+        })
+
+    def _bump_version(self) -> None:
+        """Advance the version and remember the low list as of it."""
+        self.version += 1
+        self.low_history[self.version] = {
+            row["entity_id"]: row for row in self._low_battery_rows()
+        }
+        for version in list(self.low_history):
+            if version <= self.version - CHANGE_LOG_VERSIONS:
+                del self.low_history[version]
+        asyncio.ensure_future(self._publish_summary())
+        asyncio.ensure_future(self._publish_rollup())
+        asyncio.ensure_future(self._publish_battery_types())
+
+    async def _handle_query_changes(
+        self, ws: web.WebSocketResponse, command: Dict[str, Any]
+    ) -> None:
+        """Diff the low list against the one at version "since"."""
+        msg_id = command.get("id")
+        since = command.get("since", 0)
+        fields = command.get("fields")
+        current = {row["entity_id"]: row for row in self._low_battery_rows()}
+        previous = self.low_history.get(since)
+        if command.get("epoch", self.epoch) != self.epoch:
+            previous = None
+
+        if previous is None:
+            data = {
+                "version": self.version,
+                "epoch": self.epoch,
+                "full": True,
+                **_result_data(list(current.values()), command),
+            }
+        else:
+            entered = [row for eid, row in current.items() if eid not in previous]
+            changed = [
+                row for eid, row in current.items()
+                if eid in previous and previous[eid] != row
+            ]
+            data = {
+                "version": self.version,
+                "epoch": self.epoch,
+                "full": False,
+                "entered": _project(entered, fields),
+                "changed": _project(changed, fields),
+                "left": sorted(eid for eid in previous if eid not in current),
+            }
+
+        await ws.send_json({
+            "type": "result",
+            "id": msg_id,
+            "success": True,
+            "data": data,
+        })
+
+    def _summary(self) -> Dict[str, Any]:
+        """Counts served by summary / subscribe_summary."""
+        levels = {}
+        binary = {}
+        unavailable = 0
+        for entity_id, entity in self.entity_data.items():
+            state = entity.get("state", "")
+            if not entity.get("available", True) or state in ("unavailable", "unknown"):
+                if entity.get("attributes", {}).get("device_class") == "battery":
+                    unavailable += 1
+                continue
+            try:
+                level = _battery_level(entity_id, state)
+            except (ValueError, TypeError):
+                continue
+            if level is None:
+                binary[entity_id] = state == "on"
+            else:
+                levels[entity_id] = level
+        lowest = min(levels, key=lambda eid: (levels[eid], eid)) if levels else None
+        tiers = dict.fromkeys(TIERS, 0)
+        for level in levels.values():
+            tiers[_tier(level)] += 1
+        # Binary sensors that are off sit in the "ok" tier
+        tiers["ok"] += sum(1 for is_on in binary.values() if not is_on)
+        return {
+            "low": (
+                sum(1 for level in levels.values() if level < THRESHOLD)
+                + sum(binary.values())
+            ),
+            "tiers": tiers,
+            "unavailable": unavailable,
+            "tracked": len(levels) + len(binary),
+            "min_level": levels[lowest] if lowest else None,
+            "lowest": lowest,
+            "version": self.version,
+        }
+
+    async def _handle_summary(
+        self, ws: web.WebSocketResponse, command: Dict[str, Any]
+    ) -> None:
+        await ws.send_json({
+            "type": "result",
+            "id": command.get("id"),
+            "success": True,
+            "data": self._summary(),
+        })
+
+    async def _handle_subscribe_summary(
+        self, ws: web.WebSocketResponse, command: Dict[str, Any]
+    ) -> None:
+        """Reply with the summary, then push it whenever its counts change."""
+        msg_id = command.get("id")
+        summary = self._summary()
+        self.summary_subscribers[(ws, msg_id)] = summary
+        await ws.send_json({
+            "type": "result", "id": msg_id, "success": True, "data": summary,
+        })
+
+    async def _publish_summary(self) -> None:
+        summary = self._summary()
+        counts = {k: v for k, v in summary.items() if k != "version"}
+        for (ws, msg_id), last in list(self.summary_subscribers.items()):
+            if {k: v for k, v in last.items() if k != "version"} == counts:
+                continue
+            if ws.closed:
+                del self.summary_subscribers[(ws, msg_id)]
+                continue
+            self.summary_subscribers[(ws, msg_id)] = summary
+            await ws.send_json({"type": "event", "id": msg_id, "event": summary})
+
+    def _rollup(self, depth: int) -> Dict[str, Any]:
+        """Floor -> area -> device rollup served by rollup / subscribe_rollup.
+
+        Areas are keyed by name and floors have no registry names here.
+        """
+        def node() -> Dict[str, Any]:
+            return {"tracked": 0, "low": 0, "unavailable": set(), "min_level": None,
+                    "name": None, "children": {}}
+
+        root = node()
+        for entity_id, entity in sorted(self.entity_data.items()):
+            state = entity.get("state", "")
+            level = None
+            available = False
+            if not entity.get("available", True) or state in ("unavailable", "unknown"):
+                if entity.get("attributes", {}).get("device_class") != "battery":
+                    continue
+            else:
+                available = True
+                try:
+                    level = _battery_level(entity_id, state)
+                except (ValueError, TypeError):
+                    continue
+            area = entity.get("area_name")
+            path = (
+                (entity.get("floor_id"), entity.get("floor_id")),
+                (area.casefold().replace(" ", "_") if area else None, area),
+                (entity.get("device_id") or entity_id,
+                 entity.get("friendly_name", entity_id)),
+            )
+            nodes = [root]
+            for key, name in path:
+                child = nodes[-1]["children"].setdefault(key, node())
+                child["name"] = child["name"] or name
+                nodes.append(child)
+            for current in nodes:
+                if not available:
+                    # Distinct devices, not entities
+                    current["unavailable"].add(path[-1][0])
+                    continue
+                current["tracked"] += 1
+                current["low"] += _is_low({"battery_level": level, "state": state})
+                if level is None:
+                    continue
+                if current["min_level"] is None or level < current["min_level"]:
+                    current["min_level"] = level
+
+        orders = (
+            lambda key, n: (key is None, (n["name"] or "").casefold()),
+            lambda key, n: (key is None, (n["name"] or "").casefold()),
+            lambda key, n: (n["min_level"] is None, n["min_level"] or 0.0,
+                            n["name"].casefold()),
+        )
+
+        def build(current: Dict[str, Any], level: int) -> Dict[str, Any]:
+            row = {k: current[k] for k in ("tracked", "low", "min_level")}
+            row["unavailable"] = len(current["unavailable"])
+            if level < depth:
+                id_key = ROLLUP_LEVELS[level][:-1] + "_id"
+                children = sorted(
+                    current["children"].items(),
+                    key=lambda item: orders[level](*item),
+                )
+                row[ROLLUP_LEVELS[level]] = [
+                    {id_key: key, "name": child["name"], **build(child, level + 1)}
+                    for key, child in children
+                ]
+            return row
+
+        return {**build(root, 0), "version": self.version}
+
+    def _rollup_depth(self, command: Dict[str, Any]) -> Optional[int]:
+        depth = command.get("depth", 2)
+        return depth if depth in (1, 2, 3) else None
+
+    async def _handle_rollup(
+        self, ws: web.WebSocketResponse, command: Dict[str, Any]
+    ) -> None:
+        msg_id = command.get("id")
+        depth = self._rollup_depth(command)
+        if depth is None:
+            await ws.send_json({
+                "type": "result", "id": msg_id, "success": False,
+                "error": {"code": "invalid_format", "message": "depth must be 1, 2 or 3"},
+            })
+            return
+        await ws.send_json({
+            "type": "result", "id": msg_id, "success": True,
+            "data": self._rollup(depth),
+        })
+
+    async def _handle_subscribe_rollup(
+        self, ws: web.WebSocketResponse, command: Dict[str, Any]
+    ) -> None:
+        """Reply with the rollup, then push it whenever a node changes."""
+        msg_id = command.get("id")
+        depth = self._rollup_depth(command)
+        if depth is None:
+            await self._handle_rollup(ws, command)
+            return
+        rollup = self._rollup(depth)
+        self.rollup_subscribers[(ws, msg_id)] = (depth, rollup)
+        await ws.send_json({
+            "type": "result", "id": msg_id, "success": True, "data": rollup,
+        })
+
+    async def _publish_rollup(self) -> None:
+        for (ws, msg_id), (depth, last) in list(self.rollup_subscribers.items()):
+            rollup = self._rollup(depth)
+            if {**last, "version": None} == {**rollup, "version": None}:
+                continue
+            if ws.closed:
+                del self.rollup_subscribers[(ws, msg_id)]
+                continue
+            self.rollup_subscribers[(ws, msg_id)] = (depth, rollup)
+            await ws.send_json({"type": "event", "id": msg_id, "event": rollup})
+
+    def _battery_types(self) -> Dict[str, Any]:
+        """Devices with a low or critical entity, by battery type and quantity."""
+        devices: Dict[str, List[Dict[str, Any]]] = {}
+        for row in self._tracked_rows():
+            entity = self.entity_data[row["entity_id"]]
+            devices.setdefault(entity.get("device_id") or row["entity_id"], []).append(row)
+        counts: Dict[Tuple[Any, Any], List[int]] = {}
+        for rows in devices.values():
+            is_low = any(_is_low(row) for row in rows)
+            is_critical = any(row["status"] == "critical" for row in rows)
+            if not (is_low or is_critical):
+                continue
+            spec = (None, None)
+            for row in sorted(rows, key=lambda r: r["entity_id"]):
+                attributes = self.entity_data[row["entity_id"]].get("attributes", {})
+                if attributes.get("battery_type"):
+                    spec = (
+                        attributes["battery_type"],
+                        max(int(attributes.get("battery_quantity", 1)), 1),
+                    )
+                    break
+            count = counts.setdefault(spec, [0, 0, 0])
+            count[0] += 1
+            count[1] += is_low
+            count[2] += is_critical
+        types = [
+            {
+                "battery_type": battery_type, "battery_quantity": quantity,
+                "devices": total, "low": low, "critical": critical,
+                "batteries": total * quantity if quantity else None,
+            }
+            for (battery_type, quantity), (total, low, critical) in counts.items()
+        ]
+        types.sort(key=lambda row: (
+            row["battery_type"] is None, -(row["batteries"] or 0),
+            row["battery_type"] or "", row["battery_quantity"] or 0,
+        ))
+        return {
+            "types": types,
+            "devices": sum(row["devices"] for row in types),
+            "batteries": sum(row["batteries"] or 0 for row in types),
+            "version": self.version,
+        }
+
+    async def _handle_battery_types(
+        self, ws: web.WebSocketResponse, command: Dict[str, Any]
+    ) -> None:
+        await ws.send_json({
+            "type": "result", "id": command.get("id"), "success": True,
+            "data": self._battery_types(),
+        })
+
+    async def _handle_subscribe_battery_types(
+        self, ws: web.WebSocketResponse, command: Dict[str, Any]
+    ) -> None:
+        """Reply with the battery types, then push them whenever they change."""
+        msg_id = command.get("id")
+        battery_types = self._battery_types()
+        self.battery_types_subscribers[(ws, msg_id)] = battery_types
+        await ws.send_json({
+            "type": "result", "id": msg_id, "success": True, "data": battery_types,
+        })
+
+    async def _publish_battery_types(self) -> None:
+        battery_types = self._battery_types()
+        for (ws, msg_id), last in list(self.battery_types_subscribers.items()):
+            if {**last, "version": None} == {**battery_types, "version": None}:
+                continue
+            if ws.closed:
+                del self.battery_types_subscribers[(ws, msg_id)]
+                continue
+            self.battery_types_subscribers[(ws, msg_id)] = battery_types
+            await ws.send_json({"type": "event", "id": msg_id, "event": battery_types})
+
+    async def _handle_histogram(
+        self, ws: web.WebSocketResponse, command: Dict[str, Any]
+    ) -> None:
+        """Level counts per 5% bucket over available numeric entities."""
+        msg_id = command.get("id")
+        facet = command.get("facet")
+        facet_key = {"area": "area_name", "manufacturer": "manufacturer"}.get(facet)
+        if facet is not None and facet_key is None:
+            await ws.send_json({
+                "type": "result", "id": msg_id, "success": False,
+                "error": {"code": "invalid_format", "message": f"Unknown facet: {facet}"},
+            })
+            return
+
+        buckets = [0] * HISTOGRAM_BUCKETS
+        facets: Dict[Any, List[int]] = {}
+        total = 0
+        for entity_id, entity in self.entity_data.items():
+            if not entity.get("available", True):
+                continue
+            try:
+                level = _battery_level(entity_id, entity.get("state"))
+            except (ValueError, TypeError):
+                continue
+            if level is None:
+                continue
+            bucket = min(int(level // 5), HISTOGRAM_BUCKETS - 1)
+            buckets[bucket] += 1
+            total += 1
+            if facet_key:
+                facets.setdefault(entity.get(facet_key), [0] * HISTOGRAM_BUCKETS)[bucket] += 1
+
+        data: Dict[str, Any] = {"bucket_width": 5.0, "buckets": buckets, "total": total}
+        if facet_key:
+            data["facets"] = [
+                {"value": value, "buckets": counts}
+                for value, counts in sorted(
+                    facets.items(), key=lambda item: (item[0] is None, item[0] or "")
+                )
+            ]
+        await ws.send_json({
+            "type": "result", "id": msg_id, "success": True, "data": data,
+        })
+
     async def _handle_query_unavailable(
         self, ws: web.WebSocketResponse, command: Dict[str, Any]
     ) -> None:
         """Return battery entities whose state is unavailable or unknown."""
         msg_id = command.get("id")
+        fields = command.get("fields")
+        if fields and UNAVAILABLE_FIELDS.isdisjoint(fields):
+            await ws.send_json({
+                "type": "result", "id": msg_id, "success": False,
+                "error": {
+                    "code": "invalid_format",
+                    "message": "Unavailable rows have none of the requested fields",
+                },
+            })
+            return
+        if fields:
+            command = {
+                **command,
+                "fields": [key for key in fields if key in UNAVAILABLE_FIELDS],
+            }
 
         entities = []
         for entity_id, entity in sorted(self.entity_data.items()):
-            if entity_id.startswith("binary_sensor."):
-                continue
             state = entity.get("state", "")
             available = entity.get("available", True)
             attributes = entity.get("attributes", {})
@@ -229,16 +1167,29 @@ class MockHAServer:
             })
 
         # Sort by last_changed descending
-        entities.sort(key=lambda d: d["last_changed"] or "", reverse=True)
+        try:
+            entities = self._with_filter(_search(entities, command), command)
+        except ValueError as err:
+            await ws.send_json({
+                "type": "result", "id": msg_id, "success": False,
+                "error": {"code": "invalid_format", "message": str(err)},
+            })
+            return
+        total = len(entities)
+        try:
+            entities, extra = _paginate(entities, "last_changed", command)
+        except ValueError as err:
+            await ws.send_json({
+                "type": "result", "id": msg_id, "success": False,
+                "error": {"code": "invalid_cursor", "message": str(err)},
+            })
+            return
 
         await ws.send_json({
             "type": "result",
             "id": msg_id,
             "success": True,
-            "data": {
-                "entities": entities,
-                "total": len(entities),
-            },
+            "data": {**_result_data(entities, command), "total": total, **extra},
         })
 
     async def _handle_subscribe(
@@ -284,6 +1235,7 @@ class MockHAServer:
             "last_changed": datetime.utcnow().isoformat() + "Z",
             "last_updated": datetime.utcnow().isoformat() + "Z",
         }
+        self._bump_version()
 
         return web.json_response({
             "entity_id": entity_id, "state": state, "attributes": attributes,
@@ -314,13 +1266,17 @@ class MockHAServer:
                     "friendly_name": entity.get("friendly_name", entity_id),
                     "attributes": entity.get("attributes", {}),
                     "available": entity.get("available", True),
+                    "device_id": entity.get("device_id"),
                     "manufacturer": entity.get("manufacturer"),
                     "model": entity.get("model"),
                     "area_name": entity.get("area_name"),
+                    "floor_id": entity.get("floor_id"),
+                    "labels": entity.get("labels", []),
                     "last_changed": datetime.utcnow().isoformat() + "Z",
                     "last_updated": datetime.utcnow().isoformat() + "Z",
                 }
             logger.info("Loaded %d mock entities", len(self.entity_data))
+            self._bump_version()
 
         return web.json_response({
             "status": "configured",
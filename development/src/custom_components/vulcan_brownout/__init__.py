@@ -1,23 +1,37 @@
 """Vulcan Brownout: Battery entity monitoring for Home Assistant."""
 
 import logging
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Callable, Coroutine, Dict, Optional
 
 from homeassistant.core import HomeAssistant, Event, State, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+    floor_registry as fr,
+)
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.start import async_at_started
+import voluptuous as vol
 
 from .const import (
-    BATTERY_THRESHOLD,
     DOMAIN,
-    STATUS_CRITICAL,
+    HANDOFF_MAX_AGE,
+    ROLLUP_DEPTHS,
+    TOPIC_BATTERY_TYPES,
+    TOPIC_SUMMARY,
     VERSION,
     PANEL_NAME,
     PANEL_TITLE,
     PANEL_ICON,
 )
-from .battery_monitor import BatteryMonitor
-from .websocket_api import register_websocket_commands
+from .battery_monitor import BatteryMonitor, async_remove_snapshot
+from .exclusions import ExclusionRules
+from .thresholds import ThresholdPolicy
+from .websocket_api import register_websocket_commands, rollup_topic
 from .subscription_manager import WebSocketSubscriptionManager
 
 _LOGGER = logging.getLogger(__name__)
@@ -32,14 +46,41 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         entry.entry_id, DOMAIN, VERSION,
     )
     try:
+        thresholds = _threshold_policy(entry)
         _LOGGER.info(
-            "async_setup_entry: starting setup version=%s threshold=%d%%",
-            VERSION, BATTERY_THRESHOLD,
+            "async_setup_entry: starting setup version=%s default_threshold=%.0f%%",
+            VERSION, thresholds.default,
         )
 
-        # Create and initialize battery monitor
-        battery_monitor = BatteryMonitor(hass)
-        await battery_monitor.discover_entities()
+        # Create and initialize battery monitor. A monitor handed off by a
+        # recent unload (reload) is adopted as-is; otherwise a persisted
+        # snapshot lets queries be served straight away and discovery then
+        # only reconciles it.
+        battery_monitor = _async_take_handoff(hass)
+        if battery_monitor is not None:
+            battery_monitor.set_thresholds(thresholds)
+            battery_monitor.set_exclusions(_exclusion_rules(entry))
+            hass.async_create_task(battery_monitor.async_reconcile_states())
+            _LOGGER.debug(
+                "async_setup_entry: battery_monitor=handoff tracked=%d",
+                len(battery_monitor.entities),
+            )
+        else:
+            battery_monitor = BatteryMonitor(
+                hass, thresholds, _exclusion_rules(entry)
+            )
+            if await battery_monitor.async_load_snapshot():
+                entry.async_on_unload(
+                    async_at_started(
+                        hass, _async_validate_snapshot_job(battery_monitor)
+                    )
+                )
+                _LOGGER.debug(
+                    "async_setup_entry: battery_monitor=warm_start restored=%d",
+                    len(battery_monitor.entities),
+                )
+            else:
+                await battery_monitor.discover_entities()
         hass.data[DOMAIN] = battery_monitor
         _LOGGER.debug(
             "async_setup_entry: battery_monitor=ready discovered=%d",
@@ -75,9 +116,67 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 )
             )
 
-        hass.bus.async_listen(EVENT_STATE_CHANGED, on_state_changed)
+        entry.async_on_unload(
+            hass.bus.async_listen(EVENT_STATE_CHANGED, on_state_changed)
+        )
         _LOGGER.debug("async_setup_entry: state_change_listener=registered")
 
+        # Push aggregate streams after each committed index change; the
+        # rollup and battery types are only rebuilt when they changed
+        rollup_revision = battery_monitor.rollup.revision
+        inventory_revision = battery_monitor.inventory.revision
+
+        @callback
+        def on_index_changed() -> None:
+            nonlocal rollup_revision, inventory_revision
+            if subscription_manager.has_topic_subscribers(TOPIC_SUMMARY):
+                summary = battery_monitor.summary()
+                subscription_manager.publish(
+                    TOPIC_SUMMARY, summary, key=_summary_key(summary)
+                )
+            revision = battery_monitor.rollup.revision
+            if revision != rollup_revision:
+                rollup_revision = revision
+                for depth in ROLLUP_DEPTHS:
+                    topic = rollup_topic(depth)
+                    if subscription_manager.has_topic_subscribers(topic):
+                        subscription_manager.publish(
+                            topic, battery_monitor.rollup_tree(depth)
+                        )
+            revision = battery_monitor.inventory.revision
+            if revision != inventory_revision:
+                inventory_revision = revision
+                if subscription_manager.has_topic_subscribers(TOPIC_BATTERY_TYPES):
+                    subscription_manager.publish(
+                        TOPIC_BATTERY_TYPES, battery_monitor.battery_types()
+                    )
+
+        entry.async_on_unload(battery_monitor.async_add_listener(on_index_changed))
+
+        # Apply threshold and exclusion edits from the options flow to the
+        # live index
+        async def on_options_updated(
+            hass: HomeAssistant, entry: ConfigEntry
+        ) -> None:
+            battery_monitor.set_thresholds(_threshold_policy(entry))
+            battery_monitor.set_exclusions(_exclusion_rules(entry))
+
+        entry.async_on_unload(entry.add_update_listener(on_options_updated))
+
+        # Keep the shared device/area metadata records (and floor names) current
+        for event_type, listener in (
+            (dr.EVENT_DEVICE_REGISTRY_UPDATED,
+             battery_monitor.async_on_device_registry_updated),
+            (ar.EVENT_AREA_REGISTRY_UPDATED,
+             battery_monitor.async_on_area_registry_updated),
+            (er.EVENT_ENTITY_REGISTRY_UPDATED,
+             battery_monitor.async_on_entity_registry_updated),
+            (fr.EVENT_FLOOR_REGISTRY_UPDATED,
+             battery_monitor.async_on_floor_registry_updated),
+        ):
+            entry.async_on_unload(hass.bus.async_listen(event_type, listener))
+        _LOGGER.debug("async_setup_entry: registry_listeners=registered")
+
         # Register sidebar panel
         try:
             import pathlib
@@ -138,8 +237,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
         _LOGGER.info(
             "async_setup_entry: setup=complete version=%s "
-            "discovered_entities=%d threshold=%d%%",
-            VERSION, len(battery_monitor.entities), BATTERY_THRESHOLD,
+            "discovered_entities=%d low=%d",
+            VERSION, len(battery_monitor.entities), battery_monitor.low_count,
         )
         return True
 
@@ -150,6 +249,60 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         return False
 
 
+def _async_validate_snapshot_job(
+    battery_monitor: BatteryMonitor,
+) -> Callable[[HomeAssistant], Coroutine[Any, Any, None]]:
+    """Return an at-started job reconciling a snapshot-restored monitor."""
+
+    async def _async_validate_snapshot(_hass: HomeAssistant) -> None:
+        await battery_monitor.async_validate_snapshot()
+
+    return _async_validate_snapshot
+
+
+def _threshold_policy(entry: ConfigEntry) -> ThresholdPolicy:
+    """Return the threshold policy in the entry options (defaults if invalid)."""
+    try:
+        return ThresholdPolicy.from_options(entry.options)
+    except vol.Invalid as err:
+        _LOGGER.warning(
+            "_threshold_policy: options=invalid error=%s using=defaults", err
+        )
+        return ThresholdPolicy()
+
+
+def _exclusion_rules(entry: ConfigEntry) -> ExclusionRules:
+    """Return the compiled exclusion rules in the entry options (none if invalid)."""
+    try:
+        return ExclusionRules.from_options(entry.options)
+    except vol.Invalid as err:
+        _LOGGER.warning(
+            "_exclusion_rules: options=invalid error=%s using=none", err
+        )
+        return ExclusionRules()
+
+
+def _summary_key(summary: Dict[str, Any]) -> tuple:
+    """Return the parts of a summary whose change is worth an event."""
+    return tuple(value for key, value in summary.items() if key != "version")
+
+
+def _async_take_handoff(hass: HomeAssistant) -> Optional[BatteryMonitor]:
+    """Pop the monitor left by the previous unload if it is recent enough."""
+    handoff = hass.data.pop(f"{DOMAIN}_handoff", None)
+    if handoff is None:
+        return None
+    unloaded_at, battery_monitor = handoff
+    age = time.monotonic() - unloaded_at
+    if age > HANDOFF_MAX_AGE:
+        _LOGGER.debug(
+            "_async_take_handoff: handoff=expired age=%.1fs max_age=%ds",
+            age, HANDOFF_MAX_AGE,
+        )
+        return None
+    return battery_monitor
+
+
 async def _on_battery_state_changed(
     hass: HomeAssistant,
     battery_monitor: BatteryMonitor,
@@ -157,13 +310,22 @@ async def _on_battery_state_changed(
     entity_id: str,
     new_state: Optional[State],
 ) -> None:
-    """Handle battery entity state changes and broadcast to subscribers."""
+    """Handle battery entity state changes and broadcast to subscribers.
+
+    A tracked entity that goes unavailable or is removed is announced as
+    left to every subscriber that could see it.
+    """
     new_state_value = new_state.state if new_state else None
     _LOGGER.debug(
         "_on_battery_state_changed: entity_id=%s new_state=%s",
         entity_id, new_state_value,
     )
     try:
+        was_tracked = entity_id in battery_monitor.entities
+        previous_tier = battery_monitor.tier_of(entity_id)
+        previous_matches = subscription_manager.matching_plans(
+            entity_id, lambda where: where.contains(battery_monitor, entity_id)
+        )
         await battery_monitor.on_state_changed(entity_id, new_state)
 
         is_battery = battery_monitor._is_battery_entity(entity_id)
@@ -185,18 +347,29 @@ async def _on_battery_state_changed(
             if sub_count > 0:
                 subscription_manager.broadcast_entity_changed(
                     entity_id=entity_id,
-                    battery_level=entity.battery_level,
-                    status=STATUS_CRITICAL,
+                    battery_level=entity.level,
+                    status=entity.tier,
                     last_changed=(
-                        entity.state.last_changed.isoformat()
-                        if entity.state.last_changed else None
+                        entity.last_changed.isoformat()
+                        if entity.last_changed else None
                     ),
                     last_updated=(
-                        entity.state.last_updated.isoformat()
-                        if entity.state.last_updated else None
+                        entity.last_updated.isoformat()
+                        if entity.last_updated else None
                     ),
-                    attributes=dict(entity.state.attributes),
+                    attributes=entity.allowed_attributes(),
+                    device_name=entity.device_name,
+                    area_name=entity.area_name,
+                    previous_status=previous_tier,
+                    matches=lambda where: where.contains(
+                        battery_monitor, entity_id
+                    ),
+                    previous_matches=previous_matches,
                 )
+        elif was_tracked and subscription_manager.get_subscription_count() > 0:
+            subscription_manager.broadcast_entity_left(
+                entity_id, previous_tier, previous_matches
+            )
     except Exception as e:
         _LOGGER.error(
             "_on_battery_state_changed: entity_id=%s error=%s",
@@ -225,7 +398,11 @@ async def async_unload_entry(
                 sub_count,
             )
 
-        hass.data.pop(DOMAIN, None)
+        # Keep the built index around so an immediate re-setup (reload,
+        # options change, upgrade) can adopt it instead of rediscovering.
+        battery_monitor = hass.data.pop(DOMAIN, None)
+        if battery_monitor is not None:
+            _async_leave_handoff(hass, battery_monitor)
         hass.data.pop(f"{DOMAIN}_subscriptions", None)
 
         _LOGGER.info("async_unload_entry: unload=complete entry_id=%s", entry.entry_id)
@@ -238,6 +415,28 @@ async def async_unload_entry(
         return False
 
 
+def _async_leave_handoff(hass: HomeAssistant, battery_monitor: BatteryMonitor) -> None:
+    """Park the monitor for the next setup, dropping it once it's too old."""
+    handoff = (time.monotonic(), battery_monitor)
+    hass.data[f"{DOMAIN}_handoff"] = handoff
+
+    @callback
+    def drop_handoff(_now: Any) -> None:
+        # Not adopted in time (entry disabled or removed); free the index
+        if hass.data.get(f"{DOMAIN}_handoff") is handoff:
+            hass.data.pop(f"{DOMAIN}_handoff")
+            _LOGGER.debug("_async_leave_handoff: handoff=dropped")
+
+    async_call_later(hass, HANDOFF_MAX_AGE, drop_handoff)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the handed-off index and the persisted snapshot when the entry is deleted."""
+    _LOGGER.debug("async_remove_entry: entry_id=%s", entry.entry_id)
+    handoff = hass.data.pop(f"{DOMAIN}_handoff", None)
+    await async_remove_snapshot(hass, handoff[1] if handoff is not None else None)
+
+
 async def async_setup(hass: HomeAssistant, config: Dict[str, Any]) -> bool:
     """Set up from YAML (not used)."""
     _LOGGER.debug("async_setup: yaml_config=ignored using_config_entries=true")
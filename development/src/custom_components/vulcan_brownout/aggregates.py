@@ -0,0 +1,220 @@
+"""Incrementally maintained aggregates over the tracked battery entities.
+
+Each structure is updated per entity change in O(1) (or O(log n)) so that
+summary-style queries never scan the whole index.
+"""
+
+import heapq
+import math
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class MinTracker:
+    """Minimum value by key, with lazy deletion.
+
+    Updates push a new heap entry and mark older entries for the key stale;
+    stale entries are dropped when they reach the top, and the heap is
+    rebuilt once stale entries outnumber live ones.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, str, int]] = []
+        # Sequence number of each key's live heap entry
+        self._live: Dict[str, int] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def set(self, key: str, value: float) -> None:
+        """Set key's value, replacing any previous one."""
+        self._seq += 1
+        self._live[key] = self._seq
+        heapq.heappush(self._heap, (value, key, self._seq))
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._compact()
+
+    def discard(self, key: str) -> None:
+        """Forget key; a no-op if it isn't present."""
+        self._live.pop(key, None)
+
+    def min(self) -> Optional[Tuple[float, str]]:
+        """Return (value, key) of the smallest live entry, or None."""
+        heap = self._heap
+        while heap:
+            value, key, seq = heap[0]
+            if self._live.get(key) == seq:
+                return value, key
+            heapq.heappop(heap)
+        return None
+
+    def _compact(self) -> None:
+        self._heap = [
+            entry for entry in self._heap if self._live.get(entry[1]) == entry[2]
+        ]
+        heapq.heapify(self._heap)
+
+
+class LevelHistogram:
+    """Battery level counts per fixed-width bucket, overall and per facet.
+
+    Each entity's (bucket, facet values) is remembered so a change moves
+    it between buckets in O(1) without rescanning.
+    """
+
+    def __init__(self, bucket_width: float, facets: Tuple[str, ...]) -> None:
+        self.bucket_width = bucket_width
+        self.bucket_count = int(math.ceil(100.0 / bucket_width))
+        self.counts = [0] * self.bucket_count
+        self.facets = facets
+        # facet -> facet value -> bucket counts
+        self.facet_counts: Dict[str, Dict[Optional[str], List[int]]] = {
+            facet: {} for facet in facets
+        }
+        self._keys: Dict[str, Tuple[int, Tuple[Optional[str], ...]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def bucket(self, level: float) -> int:
+        """Return the bucket index of level; 100% falls in the last bucket."""
+        return min(int(level // self.bucket_width), self.bucket_count - 1)
+
+    def set(
+        self, key: str, level: float, facet_values: Tuple[Optional[str], ...]
+    ) -> None:
+        """Place key at level; facet_values line up with self.facets."""
+        new = (self.bucket(level), facet_values)
+        if self._keys.get(key) == new:
+            return
+        self.discard(key)
+        self._keys[key] = new
+        bucket = new[0]
+        self.counts[bucket] += 1
+        for facet, value in zip(self.facets, facet_values):
+            by_value = self.facet_counts[facet]
+            counts = by_value.get(value)
+            if counts is None:
+                counts = by_value[value] = [0] * self.bucket_count
+            counts[bucket] += 1
+
+    def discard(self, key: str) -> None:
+        """Remove key's contribution; a no-op if it isn't counted."""
+        old = self._keys.pop(key, None)
+        if old is None:
+            return
+        bucket, facet_values = old
+        self.counts[bucket] -= 1
+        for facet, value in zip(self.facets, facet_values):
+            by_value = self.facet_counts[facet]
+            counts = by_value[value]
+            counts[bucket] -= 1
+            if not any(counts):
+                del by_value[value]
+
+
+class DeviceGroup:
+    """The tracked battery entities of one device, rolled up.
+
+    Keeps the members, the ones on the low list, the low ones without a
+    level (binary sensors that are on) and the minimum level in O(log n)
+    per member change. An entity without a device is a group of its own.
+    """
+
+    __slots__ = ("group_id", "entity_ids", "low", "flagged", "_levels")
+
+    def __init__(self, group_id: str) -> None:
+        self.group_id = group_id
+        self.entity_ids: Set[str] = set()
+        self.low: Set[str] = set()
+        self.flagged: Set[str] = set()
+        self._levels = MinTracker()
+
+    def __len__(self) -> int:
+        return len(self.entity_ids)
+
+    def set(self, entity_id: str, level: float, is_low: bool) -> None:
+        """Add or update a member; negative levels don't count as a minimum."""
+        self.entity_ids.add(entity_id)
+        if is_low:
+            self.low.add(entity_id)
+        else:
+            self.low.discard(entity_id)
+        if is_low and level < 0:
+            self.flagged.add(entity_id)
+        else:
+            self.flagged.discard(entity_id)
+        if level >= 0:
+            self._levels.set(entity_id, level)
+        else:
+            self._levels.discard(entity_id)
+
+    def discard(self, entity_id: str) -> None:
+        """Remove a member; a no-op if it isn't one."""
+        self.entity_ids.discard(entity_id)
+        self.low.discard(entity_id)
+        self.flagged.discard(entity_id)
+        self._levels.discard(entity_id)
+
+    def min_level(self) -> Optional[float]:
+        """Return the lowest member level, or None without a valid level."""
+        lowest = self._levels.min()
+        return lowest[0] if lowest is not None else None
+
+
+# (battery type, quantity per device); (None, None) when not annotated
+BatterySpec = Tuple[Optional[str], Optional[int]]
+
+
+class BatteryInventory:
+    """Devices needing batteries, counted per (battery type, quantity).
+
+    A device counts while it has a low or critical member. Each device's
+    contribution is remembered so a change moves it between counts in
+    O(1), and reads are O(types). revision is bumped on every change so
+    streams can skip an unchanged inventory.
+    """
+
+    def __init__(self) -> None:
+        # spec -> [devices, low devices, critical devices]
+        self.counts: Dict[BatterySpec, List[int]] = {}
+        self._entries: Dict[str, Tuple[BatterySpec, bool, bool]] = {}
+        self.revision = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def set(
+        self, device_id: str, spec: BatterySpec, is_low: bool, is_critical: bool
+    ) -> None:
+        """Count device_id under spec; neither low nor critical removes it."""
+        if not (is_low or is_critical):
+            self.discard(device_id)
+            return
+        entry = (spec, is_low, is_critical)
+        old = self._entries.get(device_id)
+        if old == entry:
+            return
+        if old is not None:
+            self._apply(old, -1)
+        self._apply(entry, 1)
+        self._entries[device_id] = entry
+        self.revision += 1
+
+    def discard(self, device_id: str) -> None:
+        """Stop counting device_id; a no-op if it isn't counted."""
+        old = self._entries.pop(device_id, None)
+        if old is not None:
+            self._apply(old, -1)
+            self.revision += 1
+
+    def _apply(self, entry: Tuple[BatterySpec, bool, bool], sign: int) -> None:
+        spec, is_low, is_critical = entry
+        counts = self.counts.get(spec)
+        if counts is None:
+            counts = self.counts[spec] = [0, 0, 0]
+        counts[0] += sign
+        counts[1] += sign * is_low
+        counts[2] += sign * is_critical
+        if not counts[0]:
+            del self.counts[spec]
@@ -1,64 +1,213 @@
 """Core battery monitoring service for Vulcan Brownout integration."""
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
 
-from homeassistant.core import HomeAssistant, State
-from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.const import STATE_OFF, STATE_ON, STATE_UNAVAILABLE, STATE_UNKNOWN
 from homeassistant.helpers import (
-    area_registry as ar,
     device_registry as dr,
     entity_registry as er,
+    floor_registry as fr,
 )
-from homeassistant.helpers.device_registry import DeviceRegistry
-from homeassistant.helpers.entity_registry import EntityRegistry
-from homeassistant.helpers.area_registry import AreaRegistry
-
-from .const import BATTERY_DEVICE_CLASS, BATTERY_THRESHOLD, STATUS_CRITICAL
+from homeassistant.helpers.entity_registry import RegistryEntry
+from homeassistant.helpers.json import json_bytes, json_fragment
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .aggregates import (
+    BatteryInventory,
+    BatterySpec,
+    DeviceGroup,
+    LevelHistogram,
+    MinTracker,
+)
+from .change_log import ChangeLog
+from .const import (
+    ATTR_BATTERY_QUANTITY,
+    ATTR_BATTERY_TYPE,
+    BATTERY_DEVICE_CLASS,
+    BATTERY_THRESHOLD,
+    BINARY_SENSOR_PREFIX,
+    CHANGE_LOG_SIZE,
+    DEFAULT_ATTRIBUTES,
+    DISCOVERY_BATCH_SIZE,
+    HISTOGRAM_BUCKET_WIDTH,
+    HISTOGRAM_FACETS,
+    ENTITY_FIELDS,
+    FORMAT_COLUMNAR,
+    FILTER_PLAN_CACHE_SIZE,
+    FORMAT_ROWS,
+    GROUP_BY_DEVICE,
+    SNAPSHOT_SAVE_DELAY,
+    SORT_AREA,
+    SORT_LAST_CHANGED,
+    SORT_LEVEL,
+    SORT_MARGIN,
+    SORT_NAME,
+    SORT_ORDERS,
+    SORT_RELEVANCE,
+    STATUS_CRITICAL,
+    STATUS_LOW,
+    STATUS_OK,
+    STATUS_TIERS,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+    UNAVAILABLE_FIELDS,
+)
+from .exclusions import ExclusionRules
+from .filters import FilterPlan, PlanCache
+from .label_index import LabelIndex
+from .level_store import LevelStore
+from .metadata import AreaMetadata, DeviceMetadata, MetadataTable
+from .rollup import RollupNode, RollupPath, RollupTree
+from .search_index import TrigramIndex
+from .serialization import encode_columnar, encode_rows
+from .sorted_index import SortedIndex, decode_cursor, encode_cursor, page_keys
+from .thresholds import ThresholdPolicy
 
 _LOGGER = logging.getLogger(__name__)
 
-# Type alias for device info tuple: (device_name, manufacturer, model, area_name)
-DeviceInfo = Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]
+
+def _from_timestamp(value: Optional[float]) -> Optional[datetime]:
+    return dt_util.utc_from_timestamp(value) if value is not None else None
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value is not None else None
+
+
+# State attributes a BatteryEntity keeps: the client allow-list plus the
+# battery_notes fields the inventory reads
+_KEPT_ATTRIBUTES: Tuple[str, ...] = DEFAULT_ATTRIBUTES + (
+    ATTR_BATTERY_TYPE,
+    ATTR_BATTERY_QUANTITY,
+)
 
 
 class BatteryEntity:
-    """Represents a battery entity with parsed data."""
+    """Represents a battery entity with parsed data.
+
+    Only the fields used by queries are kept; the HA State object itself is
+    not retained. Timestamps are references to the State's own objects; of
+    its attributes only the few in _KEPT_ATTRIBUTES are copied, so large
+    vendor attributes aren't kept alive. Device and area metadata are
+    shared records from the monitor's MetadataTable, never per-entity
+    copies.
+
+    The serialized to_dict() payload is cached as encoded JSON bytes and
+    only rebuilt after invalidate() (a new state replaces the whole entity).
+    """
+
+    __slots__ = (
+        "entity_id",
+        "state",
+        "battery_level",
+        "last_changed",
+        "last_updated",
+        "attributes",
+        "name",
+        "device",
+        "area_override",
+        "slot",
+        "threshold",
+        "tier",
+        "_encoded",
+    )
 
     entity_id: str
-    state: State
-    device_name: str
+    state: str
     battery_level: float
-    manufacturer: Optional[str]
-    model: Optional[str]
-    area_name: Optional[str]
+    last_changed: Optional[datetime]
+    last_updated: Optional[datetime]
+    attributes: Dict[str, Any]
+    name: str
+    device: Optional[DeviceMetadata]
+    area_override: Optional[AreaMetadata]
+    slot: int  # row in the monitor's LevelStore, -1 until tracked
+    threshold: float  # effective low threshold, set by the monitor
+    tier: Optional[str]  # severity tier ("status"), set by the monitor
 
     def __init__(
         self,
         entity_id: str,
         state: State,
-        device_name: Optional[str] = None,
-        manufacturer: Optional[str] = None,
-        model: Optional[str] = None,
-        area_name: Optional[str] = None,
+        device: Optional[DeviceMetadata] = None,
+        area_override: Optional[AreaMetadata] = None,
     ) -> None:
         self.entity_id = entity_id
-        self.state = state
-        self.device_name = (
-            device_name or state.attributes.get("friendly_name", entity_id)
-        )
+        self.state = state.state
+        self.last_changed = state.last_changed
+        self.last_updated = state.last_updated
+        attributes = state.attributes
+        self.attributes = {
+            key: attributes[key] for key in _KEPT_ATTRIBUTES if key in attributes
+        }
+        # Fallback display name when the device has none (or no device)
+        self.name = state.attributes.get("friendly_name", entity_id)
+        self.device = device
+        self.area_override = area_override
+        self.slot = -1
+        self.threshold = BATTERY_THRESHOLD
+        self.tier = None
+        self._encoded: Optional[bytes] = None
         self.battery_level = self._parse_battery_level(state.state)
-        self.manufacturer = manufacturer
-        self.model = model
-        self.area_name = area_name
         _LOGGER.debug(
             "BatteryEntity.__init__: entity_id=%s device_name=%s "
             "battery_level=%.1f manufacturer=%s model=%s area_name=%s",
             entity_id, self.device_name, self.battery_level,
-            manufacturer, model, area_name,
+            self.manufacturer, self.model, self.area_name,
         )
 
+    @property
+    def device_name(self) -> str:
+        device = self.device
+        if device is not None and device.name:
+            return device.name
+        return self.name
+
+    @property
+    def manufacturer(self) -> Optional[str]:
+        return self.device.manufacturer if self.device is not None else None
+
+    @property
+    def model(self) -> Optional[str]:
+        return self.device.model if self.device is not None else None
+
+    @property
+    def area(self) -> Optional[AreaMetadata]:
+        """The entity's own area if set, otherwise its device's area."""
+        if self.area_override is not None:
+            return self.area_override
+        return self.device.area if self.device is not None else None
+
+    @property
+    def area_name(self) -> Optional[str]:
+        area = self.area
+        return area.name if area is not None else None
+
+    @property
+    def is_binary(self) -> bool:
+        """True for a binary battery sensor, which has no level."""
+        return self.entity_id.startswith(BINARY_SENSOR_PREFIX)
+
+    @property
+    def level(self) -> Optional[float]:
+        """The reported battery level; None for a binary sensor."""
+        return None if self.is_binary else self.battery_level
+
+    @property
+    def margin(self) -> float:
+        """Battery level relative to the threshold; negative means low."""
+        return self.battery_level - self.threshold
+
     def _parse_battery_level(self, state_value: str) -> float:
+        if self.is_binary:
+            # No level; low/ok comes from the on/off state (see _is_low)
+            return -1.0
         if state_value in (STATE_UNAVAILABLE, STATE_UNKNOWN):
             _LOGGER.debug(
                 "_parse_battery_level: entity_id=%s state=%s result=-1.0 (unavailable/unknown)",
@@ -79,157 +228,1212 @@ class BatteryEntity:
             )
             return -1.0
 
-    def to_dict(self) -> Dict[str, Any]:
-        state = self.state
+    def allowed_attributes(self) -> Dict[str, Any]:
+        """Return the state attributes on the DEFAULT_ATTRIBUTES allow-list."""
+        attributes = self.attributes
+        return {
+            key: attributes[key] for key in DEFAULT_ATTRIBUTES if key in attributes
+        }
+
+    def to_dict(self, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Return the row payload, optionally projected onto fields."""
         result = {
-            "entity_id": self.entity_id,
-            "state": state.state,
-            "attributes": dict(state.attributes),
-            "last_changed": (
-                state.last_changed.isoformat() if state.last_changed else None
-            ),
-            "last_updated": (
-                state.last_updated.isoformat() if state.last_updated else None
-            ),
-            "device_name": self.device_name,
-            "battery_level": self.battery_level,
-            "status": STATUS_CRITICAL,
-            "manufacturer": self.manufacturer,
-            "model": self.model,
-            "area_name": self.area_name,
+            field: _FIELD_GETTERS[field](self)
+            for field in (fields or ENTITY_FIELDS)
         }
         _LOGGER.debug(
-            "BatteryEntity.to_dict: entity_id=%s battery_level=%.1f "
-            "manufacturer=%s model=%s area_name=%s",
-            self.entity_id, self.battery_level,
-            self.manufacturer, self.model, self.area_name,
+            "BatteryEntity.to_dict: entity_id=%s battery_level=%.1f fields=%s",
+            self.entity_id, self.battery_level, fields or "all",
         )
         return result
 
+    def to_row(self, fields: Sequence[str]) -> Tuple[Any, ...]:
+        """Return the values of fields as a tuple, in order."""
+        return tuple(_FIELD_GETTERS[field](self) for field in fields)
+
+    def encoded(self) -> bytes:
+        """Return to_dict() as cached, pre-encoded JSON bytes.
+
+        Our row schema differs from State.as_dict(), so HA's own
+        State.json_fragment cache can't be reused; this mirrors it per row.
+        """
+        encoded = self._encoded
+        if encoded is None:
+            encoded = self._encoded = json_bytes(self.to_dict())
+        return encoded
+
+    def as_fragment(self) -> json_fragment:
+        """Return the cached encoding as a JSON fragment for a larger payload."""
+        return json_fragment(self.encoded())
+
+    def invalidate(self) -> None:
+        """Drop the cached encoding after shared metadata changed."""
+        self._encoded = None
+
+    def to_snapshot(self) -> List[Any]:
+        """Return a compact positional record for the persisted index snapshot.
+
+        Layout: [entity_id, state, last_changed, last_updated, name,
+        device_id, area_id] with timestamps as POSIX seconds; device and area
+        records are stored once in the snapshot's metadata tables.
+        """
+        return [
+            self.entity_id,
+            self.state,
+            self.last_changed.timestamp() if self.last_changed else None,
+            self.last_updated.timestamp() if self.last_updated else None,
+            self.name,
+            self.device.device_id if self.device is not None else None,
+            (
+                self.area_override.area_id
+                if self.area_override is not None else None
+            ),
+        ]
+
+    @classmethod
+    def from_snapshot(
+        cls, record: List[Any], metadata: MetadataTable
+    ) -> "BatteryEntity":
+        """Rebuild an entity from a record produced by to_snapshot.
+
+        Attributes are not persisted; they are filled in once the entity is
+        validated against its live state.
+        """
+        (
+            entity_id, state_value, last_changed, last_updated,
+            name, device_id, area_id,
+        ) = record
+        entity = cls.__new__(cls)
+        entity.entity_id = entity_id
+        entity.state = state_value
+        entity.last_changed = _from_timestamp(last_changed)
+        entity.last_updated = _from_timestamp(last_updated)
+        entity.attributes = {}
+        entity.name = name or entity_id
+        entity.device = metadata.devices.get(device_id) if device_id else None
+        entity.area_override = metadata.areas.get(area_id) if area_id else None
+        entity.slot = -1
+        entity.threshold = BATTERY_THRESHOLD
+        entity.tier = None
+        entity._encoded = None
+        entity.battery_level = entity._parse_battery_level(state_value)
+        return entity
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+# Builds each ENTITY_FIELDS column from a BatteryEntity
+_FIELD_GETTERS: Dict[str, Callable[[BatteryEntity], Any]] = {
+    "entity_id": lambda e: e.entity_id,
+    "state": lambda e: e.state,
+    "attributes": BatteryEntity.allowed_attributes,
+    "last_changed": lambda e: _isoformat(e.last_changed),
+    "last_updated": lambda e: _isoformat(e.last_updated),
+    "device_name": lambda e: e.device_name,
+    "battery_level": lambda e: e.level,
+    "status": lambda e: e.tier,
+    "manufacturer": lambda e: e.manufacturer,
+    "model": lambda e: e.model,
+    "area_name": lambda e: e.area_name,
+}
+
+
+def _level_rank(entity: BatteryEntity) -> Tuple[bool, float]:
+    """Level part of a sort key; binary sensors (no level) sort first."""
+    if entity.is_binary:
+        return (False, 0.0)
+    return (True, entity.battery_level)
+
+
+def _low_list_order(entity: BatteryEntity) -> Tuple[bool, float, str, str]:
+    """Sort key of the low-battery list: level, then display name."""
+    return (
+        *_level_rank(entity),
+        entity.device_name or entity.entity_id,
+        entity.entity_id,
+    )
+
+
+# Index key of each supported sort order; every key ends with the entity id
+_SORT_KEYS: Dict[str, Callable[[BatteryEntity], Tuple[Any, ...]]] = {
+    SORT_LEVEL: _low_list_order,
+    SORT_NAME: lambda e: (
+        (e.device_name or e.entity_id).casefold(), e.entity_id
+    ),
+    # Entities without an area last
+    SORT_AREA: lambda e: (
+        e.area_name is None,
+        (e.area_name or "").casefold(),
+        *_level_rank(e),
+        e.entity_id,
+    ),
+    # Most recently changed first
+    SORT_LAST_CHANGED: lambda e: (
+        -(_timestamp(e.last_changed) or 0.0), e.entity_id
+    ),
+    # Furthest below its own threshold first; binary sensors have no margin
+    SORT_MARGIN: lambda e: (
+        not e.is_binary, 0.0 if e.is_binary else e.margin, e.entity_id
+    ),
+}
+
+
+def _search_text(
+    entity_id: str,
+    device_name: Optional[str],
+    area_name: Optional[str],
+    model: Optional[str],
+) -> str:
+    """Return the text an entity is found by in searches."""
+    return " ".join(
+        value for value in (device_name, entity_id, area_name, model) if value
+    )
+
+
+def _rollup_path(
+    entity_id: str,
+    device: Optional[DeviceMetadata],
+    area: Optional[AreaMetadata],
+) -> RollupPath:
+    """Return an entity's (floor, area, device) position in the rollup."""
+    return (
+        area.floor_id if area is not None else None,
+        area.area_id if area is not None else None,
+        device.device_id if device is not None else entity_id,
+    )
+
+
+def _battery_spec(attributes: Mapping[str, Any]) -> Optional[BatterySpec]:
+    """Return the (battery type, quantity) an entity's attributes name, if any."""
+    battery_type = attributes.get(ATTR_BATTERY_TYPE)
+    if not isinstance(battery_type, str) or not battery_type.strip():
+        return None
+    try:
+        quantity = int(attributes.get(ATTR_BATTERY_QUANTITY, 1))
+    except (TypeError, ValueError):
+        quantity = 1
+    return battery_type.strip(), max(quantity, 1)
+
+
+class _SnapshotStore(Store):
+    """Store for the index snapshot.
+
+    The snapshot is only a cache, so older layouts are discarded instead of
+    migrated; the next discovery pass rebuilds it.
+    """
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: Any
+    ) -> Dict[str, Any]:
+        _LOGGER.debug(
+            "_SnapshotStore: discarding snapshot version=%d.%d",
+            old_major_version, old_minor_version,
+        )
+        return {}
+
 
 class BatteryMonitor:
-    """Discovers battery entities and returns those below the fixed threshold."""
+    """Discovers battery entities and returns those below their threshold."""
 
     hass: HomeAssistant
     entities: Dict[str, BatteryEntity]
+    metadata: MetadataTable
+    levels: LevelStore
+    version: int
+    epoch: str
+    changes: ChangeLog
+    low_count: int
+    unavailable: Set[str]
+    histogram: LevelHistogram
+    thresholds: ThresholdPolicy
+    sort_indexes: Dict[str, SortedIndex]
+    tier_indexes: Dict[str, SortedIndex]
+    unavailable_index: SortedIndex
+    search_index: TrigramIndex
+    device_groups: Dict[str, DeviceGroup]
+    group_index: SortedIndex
+    rollup: RollupTree
+    label_index: LabelIndex
+    inventory: BatteryInventory
+    filter_plans: PlanCache
+    exclusions: ExclusionRules
+    excluded: Set[str]
+    binary_sensors: Set[str]
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        thresholds: Optional[ThresholdPolicy] = None,
+        exclusions: Optional[ExclusionRules] = None,
+    ) -> None:
         self.hass = hass
+        self.thresholds = thresholds or ThresholdPolicy()
+        self.exclusions = exclusions or ExclusionRules()
+        # Battery entities matched by an exclusion rule; never tracked, and
+        # their state events are dropped with a single set lookup
+        self.excluded = set()
+        # Registered binary battery sensors; other binary_sensor.* state
+        # events (motion, doors, ...) are dropped with a single set lookup
+        self.binary_sensors = set()
         self.entities = {}
+        self.metadata = MetadataTable(hass)
+        # Columnar mirror of every tracked entity's level and threshold,
+        # for the fleet-wide scans of set_thresholds and "below" filters
+        self.levels = LevelStore()
+        # Monotonic sequence number, bumped on every change to the index and
+        # persisted with the snapshot so it keeps increasing across restarts.
+        self.version = 0
+        # Random id of this process's index. The snapshot is saved with a
+        # delay, so after a crash a restored version can repeat numbers
+        # already handed out; a version is only meaningful with its epoch.
+        self.epoch = uuid.uuid4().hex[:12]
+        # Recent low-list changes by version, for query_changes
+        self.changes = ChangeLog(CHANGE_LOG_SIZE)
+        # (entity_id, was_low, is_low) awaiting the next version bump
+        self._pending_changes: List[Tuple[str, bool, bool]] = []
+        # O(1) summary aggregates, kept current by _track/_untrack
+        self.low_count = 0
+        self._min_level = MinTracker()
+        self.histogram = LevelHistogram(HISTOGRAM_BUCKET_WIDTH, HISTOGRAM_FACETS)
+        # Low-battery list in every supported sort order, kept by _reindex
+        self.sort_indexes = {order: SortedIndex() for order in SORT_ORDERS}
+        # Every tracked entity bucketed by severity tier, in level order;
+        # bucket sizes are the tier counts
+        self.tier_indexes = {tier: SortedIndex() for tier in STATUS_TIERS}
+        # Battery entities whose state is unavailable/unknown (not tracked),
+        # with the same ids ordered by last_changed, most recent first
+        self.unavailable = set()
+        self.unavailable_index = SortedIndex()
+        # Trigrams of every tracked and unavailable entity's name, id, area
+        # and model, for the query commands' "search" parameter
+        self.search_index = TrigramIndex()
+        # Tracked entities by device (entity_id for device-less ones), and
+        # the groups with a low member ordered by lowest level
+        self.device_groups = {}
+        self._entity_groups: Dict[str, str] = {}
+        self.group_index = SortedIndex()
+        # Floor -> area -> device aggregates over tracked and unavailable
+        # entities, for the rollup overview
+        self.rollup = RollupTree()
+        # Registry labels (entity and device) of every tracked and
+        # unavailable entity, for the "labels" filter
+        self.label_index = LabelIndex()
+        # Devices with a low or critical member by battery type and
+        # quantity, kept with the device groups
+        self.inventory = BatteryInventory()
+        # Compiled filter expressions, reused across requests
+        self.filter_plans = PlanCache(FILTER_PLAN_CACHE_SIZE)
+        # Callbacks run after every committed index change
+        self._listeners: List[Callable[[], None]] = []
+        self._store: Store = _SnapshotStore(hass, STORAGE_VERSION, STORAGE_KEY)
+        # Entity ids served from the snapshot but not yet confirmed live
+        self._restored: Set[str] = set()
         _LOGGER.debug(
-            "BatteryMonitor.__init__: threshold=%d%% device_class=%s",
-            BATTERY_THRESHOLD, BATTERY_DEVICE_CLASS,
+            "BatteryMonitor.__init__: default_threshold=%.0f%% overrides=%d "
+            "device_class=%s",
+            self.thresholds.default,
+            len(self.thresholds.entities) + len(self.thresholds.models)
+            + len(self.thresholds.areas),
+            BATTERY_DEVICE_CLASS,
         )
 
-    def _resolve_device_info(
-        self,
-        entity_id: str,
-        device_id: Optional[str],
-        entity_area_id: Optional[str],
-        device_registry: DeviceRegistry,
-        area_registry: AreaRegistry,
-    ) -> DeviceInfo:
-        """Resolve device name, manufacturer, model, and area name from registries.
+    def _is_excluded(
+        self, entity_id: str, entry: Optional[RegistryEntry]
+    ) -> bool:
+        """Return True if an exclusion rule matches the entity.
 
-        Returns (device_name, manufacturer, model, area_name).
+        Called once when an entity is first seen, not per state event.
         """
-        device_name: Optional[str] = None
-        manufacturer: Optional[str] = None
-        model: Optional[str] = None
-        area_id: Optional[str] = entity_area_id
+        exclusions = self.exclusions
+        if not exclusions:
+            return False
+        if entry is None:
+            return exclusions.matches(entity_id)
+        area_id = entry.area_id
+        if area_id is None:
+            device = self.metadata.get_device(entry.device_id)
+            if device is not None and device.area is not None:
+                area_id = device.area.area_id
+        labels = self._registry_labels(entry) if exclusions.labels else ()
+        return exclusions.matches(
+            entity_id, entry.platform, entry.device_id, area_id, labels
+        )
 
-        if device_id:
-            device = device_registry.async_get(device_id)
-            if device:
-                device_name = device.name
-                manufacturer = device.manufacturer
-                model = device.model
-                if not area_id:
-                    area_id = device.area_id
+    def _registry_labels(self, entry: RegistryEntry) -> Set[str]:
+        """Return the labels of an entity registry entry and its device."""
+        labels = set(entry.labels)
+        if entry.device_id:
+            device_entry = dr.async_get(self.hass).async_get(entry.device_id)
+            if device_entry is not None:
+                labels.update(device_entry.labels)
+        return labels
+
+    def _index_labels(self, entity_id: str) -> bool:
+        """Re-resolve an entity's labels; returns True if they changed.
+
+        Runs when the entity is first indexed and on registry updates.
+        """
+        entry = er.async_get(self.hass).entities.get(entity_id)
+        return self.label_index.set(
+            entity_id, self._registry_labels(entry) if entry is not None else ()
+        )
+
+    def _ingest(self, entity_id: str, entry: Optional[RegistryEntry]) -> bool:
+        """Track an entity from its live state; returns True if anything changed."""
+        unavailable_changed = self._update_unavailable(
+            entity_id, self.hass.states.get(entity_id)
+        )
+        state = self._get_valid_battery_state(entity_id)
+        if state is None:
+            return unavailable_changed
+        device, area_override = (
+            self._resolve_metadata(entry) if entry is not None else (None, None)
+        )
+        self._track(BatteryEntity(entity_id, state, device, area_override))
+        return True
+
+    def _apply_exclusion(self, entity_id: str) -> bool:
+        """Drop or re-admit an entity whose exclusion may have changed.
+
+        Returns True if the index changed.
+        """
+        entry = er.async_get(self.hass).entities.get(entity_id)
+        if self._is_excluded(entity_id, entry):
+            if entity_id in self.excluded:
+                return False
+            self.excluded.add(entity_id)
+            was_unavailable = self._update_unavailable(entity_id, None)
+            return self._untrack(entity_id) is not None or was_unavailable
+        if entity_id not in self.excluded:
+            return False
+        self.excluded.discard(entity_id)
+        return self._ingest(entity_id, entry)
+
+    def set_exclusions(self, exclusions: ExclusionRules) -> None:
+        """Apply edited exclusion rules to the live index.
+
+        Only tracked, unavailable and previously excluded entities are
+        re-checked; no discovery pass is needed.
+        """
+        if exclusions == self.exclusions:
+            return
+        self.exclusions = exclusions
+        candidates = set(self.entities) | self.unavailable | self.excluded
+        changed = [
+            entity_id for entity_id in candidates
+            if self._apply_exclusion(entity_id)
+        ]
+        _LOGGER.info(
+            "set_exclusions: changed=%d excluded=%d tracked=%d",
+            len(changed), len(self.excluded), len(self.entities),
+        )
+        if changed:
+            self._mark_changed()
+
+    async def async_load_snapshot(self) -> bool:
+        """Populate the index from the persisted snapshot in a single read.
+
+        Returns True if any entities were restored. Restored entities are
+        served immediately and reconciled later by async_validate_snapshot.
+        """
+        try:
+            data = await self._store.async_load()
+        except Exception as e:
+            _LOGGER.warning("async_load_snapshot: load=failed error=%s", e)
+            return False
+
+        if not data:
+            _LOGGER.debug("async_load_snapshot: snapshot=none")
+            return False
+
+        self.version = int(data.get("version", 0))
+        self.metadata.load_snapshot(data)
+        registry = er.async_get(self.hass)
+        for entity_id in data.get("unavailable", []):
+            if self._is_excluded(entity_id, registry.entities.get(entity_id)):
+                self.excluded.add(entity_id)
+                continue
+            # last_changed isn't persisted; validation re-keys these entries
+            self.unavailable.add(entity_id)
+            self.unavailable_index.set(entity_id, (0.0, entity_id))
+            self._index_unavailable(entity_id)
+        for record in data.get("entities", []):
+            try:
+                entity = BatteryEntity.from_snapshot(record, self.metadata)
+            except Exception as e:
                 _LOGGER.debug(
-                    "_resolve_device_info: entity_id=%s device_id=%s "
-                    "device_name=%s manufacturer=%s model=%s area_id=%s",
-                    entity_id, device_id, device_name, manufacturer, model, area_id,
+                    "async_load_snapshot: record=invalid error=%s", e
                 )
+                continue
+            # Rules may have been edited while Home Assistant was down
+            if self._is_excluded(
+                entity.entity_id, registry.entities.get(entity.entity_id)
+            ):
+                self.excluded.add(entity.entity_id)
+                continue
+            self._track(entity)
+            self._restored.add(entity.entity_id)
+        # Changes from before the restart weren't logged
+        self._pending_changes.clear()
+        self.changes.reset(self.version)
+
+        _LOGGER.info(
+            "async_load_snapshot: restored=%d version=%d",
+            len(self._restored), self.version,
+        )
+        return bool(self._restored)
+
+    async def async_validate_snapshot(self) -> None:
+        """Reconcile restored entities against live state and the registries.
+
+        Runs a batched discovery pass; restored entities that discovery does
+        not confirm (removed, unavailable, or no longer a battery) are dropped.
+        """
+        restored_count = len(self._restored)
+        _LOGGER.debug(
+            "async_validate_snapshot: starting restored=%d", restored_count
+        )
+        await self.discover_entities()
+
+        stale = list(self._restored)
+        for entity_id in stale:
+            self._untrack(entity_id)
+        if stale:
+            self._mark_changed()
+
+        _LOGGER.info(
+            "async_validate_snapshot: complete restored=%d confirmed=%d dropped=%d",
+            restored_count, restored_count - len(stale), len(stale),
+        )
+
+    async def async_reconcile_states(self) -> None:
+        """Catch up on everything missed while the index was handed off.
+
+        Used after an in-memory handoff across a reload. Registry events
+        and state changes between unload and setup were not seen, so the
+        shared device and area records are re-read and a discovery pass
+        re-checks every battery entity: ones that appeared or recovered
+        during the gap are tracked, and tracked ones it doesn't confirm
+        are dropped, as in async_validate_snapshot.
+        """
+        for device_id in list(self.metadata.devices):
+            self.metadata.refresh_device(device_id)
+        for area_id in list(self.metadata.areas):
+            self.metadata.refresh_area(area_id)
+        # Rebuilt by discovery, dropping sensors removed during the gap
+        self.binary_sensors.clear()
+        self._restored.update(self.entities)
+        await self.async_validate_snapshot()
+        self._reindex_unavailable()
+        _LOGGER.debug(
+            "async_reconcile_states: tracked=%d unavailable=%d",
+            len(self.entities), len(self.unavailable),
+        )
+
+    @staticmethod
+    def _is_low(entity: BatteryEntity) -> bool:
+        """Return True if the entity belongs on the low-battery list.
+
+        A binary sensor is low while it reports "on", whatever the
+        threshold.
+        """
+        if entity.is_binary:
+            return entity.state == STATE_ON
+        return entity.battery_level >= 0 and entity.margin < 0
+
+    def _threshold_for(self, entity: BatteryEntity) -> float:
+        """Return the entity's effective threshold under the current policy."""
+        area = entity.area
+        return self.thresholds.threshold(
+            entity.entity_id, entity.model, area.area_id if area else None
+        )
+
+    def _set_threshold(self, entity: BatteryEntity) -> None:
+        """Resolve the entity's effective threshold and mirror its row."""
+        area = entity.area
+        override = self.thresholds.override(
+            entity.entity_id, entity.model, area.area_id if area else None
+        )
+        entity.threshold = self.thresholds.default if override is None else override
+        self.levels.set(
+            entity.slot, entity.level, entity.threshold, override is not None
+        )
+
+    def _note_change(self, entity_id: str, was_low: bool, is_low: bool) -> None:
+        """Queue a low-list change for the change log's next version."""
+        if was_low or is_low:
+            self._pending_changes.append((entity_id, was_low, is_low))
+
+    def _track(self, entity: BatteryEntity) -> None:
+        """Insert or replace a tracked entity, keeping its LevelStore slot."""
+        existing = self.entities.get(entity.entity_id)
+        was_low = existing is not None and self._is_low(existing)
+        entity.slot = (
+            existing.slot if existing is not None
+            else self.levels.allocate(entity.entity_id)
+        )
+        self._set_threshold(entity)
+        is_low = self._is_low(entity)
+        self._note_change(entity.entity_id, was_low, is_low)
+        self.low_count += is_low - was_low
+        if entity.battery_level >= 0:
+            self._min_level.set(entity.entity_id, entity.battery_level)
+        else:
+            self._min_level.discard(entity.entity_id)
+        self._reindex(entity)
+        if entity.entity_id not in self.label_index:
+            self._index_labels(entity.entity_id)
+        self.entities[entity.entity_id] = entity
+        self._restored.discard(entity.entity_id)
+
+    def _untrack(self, entity_id: str) -> Optional[BatteryEntity]:
+        """Remove a tracked entity from every index and free its slot."""
+        entity = self.entities.pop(entity_id, None)
+        if entity is not None:
+            self.levels.release(entity.slot)
+            was_low = self._is_low(entity)
+            self._note_change(entity_id, was_low, False)
+            self.low_count -= was_low
+            self._min_level.discard(entity_id)
+            self.histogram.discard(entity_id)
+            for index in self.sort_indexes.values():
+                index.discard(entity_id)
+            for index in self.tier_indexes.values():
+                index.discard(entity_id)
+            if entity_id in self.unavailable:
+                self._index_unavailable(entity_id)
             else:
-                _LOGGER.debug(
-                    "_resolve_device_info: entity_id=%s device_id=%s device=not_found",
-                    entity_id, device_id,
+                self.search_index.discard(entity_id)
+                self.rollup.discard(entity_id)
+                self.label_index.discard(entity_id)
+            self._leave_group(entity_id)
+        self._restored.discard(entity_id)
+        return entity
+
+    def _refresh(self, entity: BatteryEntity) -> None:
+        """Re-derive a tracked entity's threshold and index keys in place.
+
+        Called after its device/area metadata or the threshold policy
+        changed; the row is logged as changed either way.
+        """
+        was_low = self._is_low(entity)
+        self._set_threshold(entity)
+        is_low = self._is_low(entity)
+        self._note_change(entity.entity_id, was_low, is_low)
+        self.low_count += is_low - was_low
+        entity.invalidate()
+        self._reindex(entity)
+
+    def set_thresholds(self, thresholds: ThresholdPolicy) -> None:
+        """Apply a new threshold policy to the live index.
+
+        Runs once per options change, not per query: only entities whose
+        effective threshold or severity tier moved are re-keyed, and the
+        margin-ordered index stays the single source of the low list.
+        When only the default or the tier bounds changed, the moved
+        entities come from one vectorized pass over the LevelStore;
+        edited overrides fall back to resolving every entity.
+        """
+        if thresholds == self.thresholds:
+            return
+        previous = self.thresholds
+        self.thresholds = thresholds
+        scanned = previous.same_overrides(thresholds)
+        if scanned:
+            moved = [
+                self.entities[entity_id]
+                for entity_id in self.levels.moved(
+                    thresholds.default, previous.tier_bounds, thresholds.tier_bounds
                 )
+            ]
         else:
-            _LOGGER.debug(
-                "_resolve_device_info: entity_id=%s device_id=none (standalone entity)",
-                entity_id,
+            moved = [
+                entity for entity in self.entities.values()
+                if self._threshold_for(entity) != entity.threshold
+                or self._tier_for(entity) != entity.tier
+            ]
+        for entity in moved:
+            self._refresh(entity)
+        refreshed = len(moved)
+        _LOGGER.info(
+            "set_thresholds: default_threshold=%.0f%% scanned=%s refreshed=%d low=%d",
+            thresholds.default, scanned, refreshed, self.low_count,
+        )
+        if refreshed:
+            self._mark_changed()
+
+    def _tier_for(self, entity: BatteryEntity) -> Optional[str]:
+        """Return the entity's severity tier; None without a valid level.
+
+        A binary sensor gets STATUS_LOW ("on", outside the level tiers) or
+        STATUS_OK ("off").
+        """
+        if entity.is_binary:
+            return STATUS_LOW if entity.state == STATE_ON else STATUS_OK
+        if entity.battery_level < 0:
+            return None
+        return self.thresholds.tier(entity.battery_level)
+
+    def tier_of(self, entity_id: str) -> Optional[str]:
+        """Return a tracked entity's current severity tier, if any."""
+        entity = self.entities.get(entity_id)
+        return entity.tier if entity is not None else None
+
+    def tier_counts(self) -> Dict[str, int]:
+        """Return the number of tracked entities in each tier, in O(tiers)."""
+        return {tier: len(index) for tier, index in self.tier_indexes.items()}
+
+    def _reindex(self, entity: BatteryEntity) -> None:
+        """Re-key an entity in the metadata-dependent indexes.
+
+        Called when the entity is tracked and again when its device or area
+        metadata changes.
+        """
+        if entity.battery_level >= 0:
+            self.histogram.set(
+                entity.entity_id,
+                entity.battery_level,
+                (entity.area_name, entity.manufacturer),
             )
+        else:
+            self.histogram.discard(entity.entity_id)
+        if self._is_low(entity):
+            for order, index in self.sort_indexes.items():
+                index.set(entity.entity_id, _SORT_KEYS[order](entity))
+        else:
+            for index in self.sort_indexes.values():
+                index.discard(entity.entity_id)
+        entity.tier = self._tier_for(entity)
+        for tier, index in self.tier_indexes.items():
+            if tier == entity.tier:
+                index.set(entity.entity_id, _low_list_order(entity))
+            else:
+                index.discard(entity.entity_id)
+        self.search_index.set(
+            entity.entity_id,
+            _search_text(
+                entity.entity_id, entity.device_name, entity.area_name,
+                entity.model,
+            ),
+        )
+        self.rollup.set(
+            entity.entity_id,
+            _rollup_path(entity.entity_id, entity.device, entity.area),
+            entity.battery_level,
+            self._is_low(entity),
+        )
+        self._regroup(entity)
 
-        area_name = None
-        if area_id:
-            area = area_registry.async_get_area(area_id)
-            if area:
-                area_name = area.name
-                _LOGGER.debug(
-                    "_resolve_device_info: entity_id=%s area_id=%s area_name=%s",
-                    entity_id, area_id, area_name,
-                )
+    def _regroup(self, entity: BatteryEntity) -> None:
+        """Update the entity's device group and that group's rollup."""
+        entity_id = entity.entity_id
+        group_id = (
+            entity.device.device_id if entity.device is not None else entity_id
+        )
+        if self._entity_groups.get(entity_id, group_id) != group_id:
+            # Re-pointed at another device
+            self._leave_group(entity_id)
+        group = self.device_groups.get(group_id)
+        if group is None:
+            group = self.device_groups[group_id] = DeviceGroup(group_id)
+        group.set(entity_id, entity.battery_level, self._is_low(entity))
+        self._entity_groups[entity_id] = group_id
+        self._reindex_group(group, entity.device_name)
+        self._reinventory(group, entity)
+
+    def _leave_group(self, entity_id: str) -> None:
+        group_id = self._entity_groups.pop(entity_id, None)
+        if group_id is None:
+            return
+        group = self.device_groups[group_id]
+        group.discard(entity_id)
+        if not group:
+            del self.device_groups[group_id]
+            self.group_index.discard(group_id)
+            self.inventory.discard(group_id)
+            return
+        member = self.entities.get(next(iter(group.entity_ids)))
+        self._reindex_group(group, member.device_name if member else group_id)
+        self._reinventory(group)
+
+    def _reindex_group(self, group: DeviceGroup, name: str) -> None:
+        """Key a group with a low member by (lowest level, name).
+
+        Groups with a low member that has no level (a binary sensor that
+        is on) sort first, like that member does in the low list.
+        """
+        lowest = group.min_level()
+        if group.low:
+            if group.flagged or lowest is None:
+                rank: Tuple[bool, float] = (False, 0.0)
             else:
-                _LOGGER.debug(
-                    "_resolve_device_info: entity_id=%s area_id=%s area=not_found",
-                    entity_id, area_id,
-                )
+                rank = (True, lowest)
+            self.group_index.set(
+                group.group_id, (*rank, name.casefold(), group.group_id)
+            )
+        else:
+            self.group_index.discard(group.group_id)
 
-        return device_name, manufacturer, model, area_name
+    def _reinventory(
+        self, group: DeviceGroup, current: Optional[BatteryEntity] = None
+    ) -> None:
+        """Re-count a device group in the battery inventory.
 
-    def _get_cached_or_lookup_device_info(self, entity_id: str) -> DeviceInfo:
-        """Return (device_name, manufacturer, model, area_name) for an entity.
+        current is a member being tracked but not yet in self.entities.
+        The battery type is that of the first annotated member, so only
+        the device's own members are read (a handful), never the fleet.
+        """
+        critical = self.tier_indexes[STATUS_CRITICAL]
+        is_critical = any(entity_id in critical for entity_id in group.entity_ids)
+        if not (group.low or is_critical):
+            self.inventory.discard(group.group_id)
+            return
+        spec: BatterySpec = (None, None)
+        for entity_id in sorted(group.entity_ids):
+            member = (
+                current if current is not None and current.entity_id == entity_id
+                else self.entities.get(entity_id)
+            )
+            found = _battery_spec(member.attributes) if member is not None else None
+            if found is not None:
+                spec = found
+                break
+        self.inventory.set(group.group_id, spec, bool(group.low), is_critical)
+
+    def level_histogram(self, facet: Optional[str] = None) -> Dict[str, Any]:
+        """Return the maintained level histogram, optionally by facet.
+
+        {"bucket_width", "buckets": [count per bucket], "total"}, plus
+        "facets": [{"value", "buckets"}] when facet ("area" or
+        "manufacturer") is given. Reads counters only; nothing is scanned.
+        """
+        histogram = self.histogram
+        result: Dict[str, Any] = {
+            "bucket_width": histogram.bucket_width,
+            "buckets": list(histogram.counts),
+            "total": len(histogram),
+        }
+        if facet is not None:
+            result["facets"] = sorted(
+                (
+                    {"value": value, "buckets": list(counts)}
+                    for value, counts in histogram.facet_counts[facet].items()
+                ),
+                key=lambda item: (item["value"] is None, item["value"] or ""),
+            )
+        return result
 
-        Uses the cached BatteryEntity if already tracked, otherwise performs a
-        fresh registry lookup for newly seen entities.
+    def _mark_changed(self) -> None:
+        """Bump the index version and schedule a debounced snapshot save.
+
+        Low-list changes queued since the last bump are logged at the new
+        version.
         """
-        if entity_id in self.entities:
-            existing = self.entities[entity_id]
-            _LOGGER.debug(
-                "_get_cached_or_lookup_device_info: entity_id=%s source=cache "
-                "device_name=%s manufacturer=%s model=%s area_name=%s",
-                entity_id, existing.device_name, existing.manufacturer,
-                existing.model, existing.area_name,
+        self.version += 1
+        for entity_id, was_low, is_low in self._pending_changes:
+            self.changes.record(self.version, entity_id, was_low, is_low)
+        self._pending_changes.clear()
+        for listener in self._listeners:
+            listener()
+        self._store.async_delay_save(self._snapshot_data, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call listener after every index change; returns a remover."""
+        self._listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove_listener
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the badge summary from the maintained aggregates, in O(1).
+
+        Keys: low (entities on the low list), tiers (tracked entities per
+        severity tier; binary sensors that are on are in none), unavailable,
+        tracked, min_level and lowest (entity id) over the tracked entities
+        with a level, and the index version.
+        """
+        lowest = self._min_level.min()
+        return {
+            "low": self.low_count,
+            "tiers": self.tier_counts(),
+            "unavailable": len(self.unavailable),
+            "tracked": len(self.entities),
+            "min_level": lowest[0] if lowest else None,
+            "lowest": lowest[1] if lowest else None,
+            "version": self.version,
+        }
+
+    def battery_types(self) -> Dict[str, Any]:
+        """Return the devices needing batteries by type, in O(types).
+
+        Each row counts the devices (with a low or critical member) whose
+        batteries are battery_quantity x battery_type, of them the low and
+        the critical ones, and the batteries they take. Devices without a
+        battery_type attribute form one row with both set to None. Rows
+        are ordered by batteries needed, most first.
+        """
+        types = []
+        for (battery_type, quantity), (devices, low, critical) in (
+            self.inventory.counts.items()
+        ):
+            types.append({
+                "battery_type": battery_type,
+                "battery_quantity": quantity,
+                "devices": devices,
+                "low": low,
+                "critical": critical,
+                "batteries": devices * quantity if quantity else None,
+            })
+        types.sort(key=lambda row: (
+            row["battery_type"] is None,
+            -(row["batteries"] or 0),
+            row["battery_type"] or "",
+            row["battery_quantity"] or 0,
+        ))
+        return {
+            "types": types,
+            "devices": len(self.inventory),
+            "batteries": sum(row["batteries"] or 0 for row in types),
+            "version": self.version,
+        }
+
+    def rollup_tree(self, depth: int = 2) -> Dict[str, Any]:
+        """Return the floor -> area -> device rollup, down to depth levels.
+
+        Every node has tracked, low, unavailable and min_level; the root
+        lists "floors" (depth >= 1), floors list "areas" (depth >= 2) and
+        areas list "devices" (depth 3), each child with its id and name.
+        Reads the maintained node aggregates; only names are looked up.
+        """
+        floor_registry = fr.async_get(self.hass)
+
+        def floor_child(node: RollupNode) -> Tuple[Dict[str, Any], Tuple[Any, ...]]:
+            floor = (
+                floor_registry.async_get_floor(node.node_id)
+                if node.node_id is not None else None
             )
+            name = floor.name if floor is not None else None
+            level = getattr(floor, "level", None)
+            # Unassigned last, then by floor level and name
             return (
-                existing.device_name, existing.manufacturer,
-                existing.model, existing.area_name,
+                {"floor_id": node.node_id, "name": name},
+                (floor is None, level is None, level or 0, (name or "").casefold()),
             )
 
+        def area_child(node: RollupNode) -> Tuple[Dict[str, Any], Tuple[Any, ...]]:
+            area = self.metadata.areas.get(node.node_id) if node.node_id else None
+            name = area.name if area is not None else None
+            return (
+                {"area_id": node.node_id, "name": name},
+                (node.node_id is None, (name or "").casefold()),
+            )
+
+        def device_child(node: RollupNode) -> Tuple[Dict[str, Any], Tuple[Any, ...]]:
+            device = self.metadata.devices.get(node.node_id)
+            entity = self.entities.get(node.node_id)
+            name = (
+                device.name if device is not None
+                else entity.device_name if entity is not None
+                else None
+            ) or node.node_id
+            # Lowest first, like the low list
+            lowest = node.min_level()
+            return (
+                {"device_id": node.node_id, "name": name},
+                (lowest is None, lowest or 0.0, name.casefold()),
+            )
+
+        children = (
+            ("floors", floor_child), ("areas", area_child),
+            ("devices", device_child),
+        )
+
+        def build(node: RollupNode, level: int) -> Dict[str, Any]:
+            row: Dict[str, Any] = {
+                "tracked": node.tracked,
+                "low": node.low,
+                "unavailable": node.unavailable,
+                "min_level": node.min_level(),
+            }
+            if level < depth:
+                key, describe = children[level]
+                rows = []
+                for child in node.children.values():
+                    head, order = describe(child)
+                    rows.append((order, head, child))
+                rows.sort(key=lambda item: item[0])
+                row[key] = [
+                    {**head, **build(child, level + 1)}
+                    for _, head, child in rows
+                ]
+            return row
+
+        return {**build(self.rollup.root, 0), "version": self.version}
+
+    @callback
+    def _snapshot_data(self) -> Dict[str, Any]:
+        """Return the snapshot payload written by the Store."""
+        return {
+            "version": self.version,
+            **self.metadata.to_snapshot(),
+            "unavailable": list(self.unavailable),
+            "entities": [
+                entity.to_snapshot() for entity in self.entities.values()
+            ],
+        }
+
+    def _resolve_metadata(
+        self, entry: RegistryEntry
+    ) -> Tuple[Optional[DeviceMetadata], Optional[AreaMetadata]]:
+        """Return the shared (device, area_override) records for an entry."""
+        device = self.metadata.get_device(entry.device_id)
+        area_override = self.metadata.get_area(entry.area_id)
         _LOGGER.debug(
-            "_get_cached_or_lookup_device_info: entity_id=%s source=registry_lookup",
-            entity_id,
+            "_resolve_metadata: entity_id=%s device_id=%s area_id=%s "
+            "device=%s area_override=%s",
+            entry.entity_id, entry.device_id, entry.area_id,
+            "found" if device else "none",
+            area_override.name if area_override else None,
         )
-        entity_registry = er.async_get(self.hass)
-        entry = entity_registry.entities.get(entity_id)
+        return device, area_override
+
+    def _get_cached_or_lookup_metadata(
+        self, entity_id: str
+    ) -> Tuple[Optional[DeviceMetadata], Optional[AreaMetadata]]:
+        """Return the (device, area_override) records for an entity.
+
+        Reuses the tracked BatteryEntity's references if already tracked,
+        otherwise resolves them through the entity registry.
+        """
+        existing = self.entities.get(entity_id)
+        if existing is not None:
+            return existing.device, existing.area_override
+
+        entry = er.async_get(self.hass).entities.get(entity_id)
         if not entry:
             _LOGGER.debug(
-                "_get_cached_or_lookup_device_info: entity_id=%s registry_entry=not_found",
+                "_get_cached_or_lookup_metadata: entity_id=%s registry_entry=not_found",
                 entity_id,
             )
-            return None, None, None, None
+            return None, None
+        return self._resolve_metadata(entry)
+
+    @callback
+    def async_on_device_registry_updated(self, event: Event) -> None:
+        """Refresh a shared device record after a device registry change."""
+        device_id = event.data.get("device_id")
+        if device_id:
+            registry = er.async_get(self.hass)
+            members = {
+                entry.entity_id
+                for entry in er.async_entries_for_device(registry, device_id)
+            }
+            changed = False
+            if self.exclusions:
+                # Device area or labels may have moved entities across a rule
+                for entity_id in members & (
+                    set(self.entities) | self.unavailable | self.excluded
+                ):
+                    changed |= self._apply_exclusion(entity_id)
+            # Device labels are inherited by its entities
+            for entity_id in members:
+                if entity_id in self.label_index:
+                    changed |= self._index_labels(entity_id)
+            if changed:
+                self._mark_changed()
+        record = self.metadata.devices.get(device_id) if device_id else None
+        if record is not None and self.metadata.refresh_device(device_id):
+            removed = device_id not in self.metadata.devices
+            for entity in self.entities.values():
+                if entity.device is record:
+                    if removed:
+                        entity.device = None
+                    self._refresh(entity)
+            self._reindex_unavailable()
+            # Names aren't part of a node's counts
+            self.rollup.touch()
+            _LOGGER.debug(
+                "async_on_device_registry_updated: device_id=%s action=%s refreshed=true",
+                device_id, event.data.get("action"),
+            )
+            self._mark_changed()
+
+    @callback
+    def async_on_area_registry_updated(self, event: Event) -> None:
+        """Refresh a shared area record after an area registry change."""
+        area_id = event.data.get("area_id")
+        record = self.metadata.areas.get(area_id) if area_id else None
+        if record is not None and self.metadata.refresh_area(area_id):
+            removed = area_id not in self.metadata.areas
+            # Device records may have been re-pointed too; areas change rarely
+            for entity in self.entities.values():
+                if removed and entity.area_override is record:
+                    entity.area_override = None
+                self._refresh(entity)
+            self._reindex_unavailable()
+            self.rollup.touch()
+            _LOGGER.debug(
+                "async_on_area_registry_updated: area_id=%s action=%s refreshed=true",
+                area_id, event.data.get("action"),
+            )
+            self._mark_changed()
+
+    @callback
+    def async_on_floor_registry_updated(self, event: Event) -> None:
+        """Let rollup streams pick up a floor rename or reorder.
+
+        Floor names aren't part of the index, so the version is unchanged.
+        """
+        _LOGGER.debug(
+            "async_on_floor_registry_updated: floor_id=%s action=%s",
+            event.data.get("floor_id"), event.data.get("action"),
+        )
+        self.rollup.touch()
+        for listener in self._listeners:
+            listener()
+
+    @callback
+    def async_on_entity_registry_updated(self, event: Event) -> None:
+        """Re-point a tracked entity at its device/area after a registry change."""
+        entity_id = event.data.get("entity_id")
+        action = event.data.get("action")
+        if action == "remove":
+            self.excluded.discard(entity_id)
+            self.binary_sensors.discard(entity_id)
+            was_unavailable = self._update_unavailable(entity_id, None)
+            if self._untrack(entity_id) is not None or was_unavailable:
+                self._mark_changed()
+            return
+        if entity_id.startswith(BINARY_SENSOR_PREFIX) and self._index_binary_sensor(
+            entity_id
+        ):
+            self._mark_changed()
+            return
+        if (
+            entity_id in self.entities
+            or entity_id in self.unavailable
+            or entity_id in self.excluded
+        ) and self._apply_exclusion(entity_id):
+            # Labels, area or platform moved it across an exclusion rule
+            self._mark_changed()
+            return
+        entity = self.entities.get(entity_id)
+        if entity is None:
+            if entity_id in self.unavailable:
+                # Area override may have moved it in the rollup
+                self._index_unavailable(entity_id)
+                self._index_labels(entity_id)
+                self._mark_changed()
+            return
+        entry = er.async_get(self.hass).entities.get(entity_id)
+        if entry is None:
+            return
+        entity.device, entity.area_override = self._resolve_metadata(entry)
+        self.label_index.set(entity_id, self._registry_labels(entry))
+        self._refresh(entity)
+        self._mark_changed()
 
-        return self._resolve_device_info(
+    def _index_binary_sensor(self, entity_id: str) -> bool:
+        """Keep binary_sensors in step with a registry create or update.
+
+        A sensor that gains or loses the battery device class is tracked
+        from its current state or dropped. Returns True if the index changed.
+        """
+        entry = er.async_get(self.hass).entities.get(entity_id)
+        is_battery = entry is not None and (
+            entry.device_class or entry.original_device_class
+        ) == BATTERY_DEVICE_CLASS
+        if is_battery == (entity_id in self.binary_sensors):
+            return False
+        if not is_battery:
+            self.binary_sensors.discard(entity_id)
+            self.excluded.discard(entity_id)
+            was_unavailable = self._update_unavailable(entity_id, None)
+            return self._untrack(entity_id) is not None or was_unavailable
+        self.binary_sensors.add(entity_id)
+        if self._is_excluded(entity_id, entry):
+            self.excluded.add(entity_id)
+            return False
+        changed = self._ingest(entity_id, entry)
+        _LOGGER.debug(
+            "_index_binary_sensor: entity_id=%s tracked=%s",
+            entity_id, entity_id in self.entities,
+        )
+        return changed
+
+    def _update_unavailable(self, entity_id: str, state: Optional[State]) -> bool:
+        """Keep self.unavailable and its index in step with an entity's state.
+
+        Returns True if membership changed.
+        """
+        is_unavailable = (
+            state is not None
+            and state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN)
+        )
+        if is_unavailable:
+            self.unavailable_index.set(
+                entity_id, (-(_timestamp(state.last_changed) or 0.0), entity_id)
+            )
+        else:
+            self.unavailable_index.discard(entity_id)
+        if is_unavailable == (entity_id in self.unavailable):
+            return False
+        if is_unavailable:
+            self.unavailable.add(entity_id)
+            if entity_id not in self.entities:
+                self._index_unavailable(entity_id)
+        else:
+            self.unavailable.discard(entity_id)
+            if entity_id not in self.entities:
+                self.search_index.discard(entity_id)
+                self.rollup.discard(entity_id)
+                self.label_index.discard(entity_id)
+        return True
+
+    def _index_unavailable(self, entity_id: str) -> None:
+        """Index an untracked unavailable entity's search text and rollup path.
+
+        Runs once per transition (and after registry changes), never per
+        state event.
+        """
+        device, area_override = self._get_cached_or_lookup_metadata(entity_id)
+        area = area_override or (device.area if device else None)
+        state = self.hass.states.get(entity_id)
+        name = (device.name if device else None) or (
+            state.attributes.get("friendly_name") if state else None
+        )
+        self.search_index.set(
             entity_id,
-            entry.device_id,
-            entry.area_id,
-            dr.async_get(self.hass),
-            ar.async_get(self.hass),
+            _search_text(
+                entity_id, name, area.name if area else None,
+                device.model if device else None,
+            ),
+        )
+        self.rollup.set(
+            entity_id, _rollup_path(entity_id, device, area), -1.0, False, True
         )
+        if entity_id not in self.label_index:
+            self._index_labels(entity_id)
+
+    def _reindex_unavailable(self) -> None:
+        """Re-resolve every untracked unavailable entity after a registry change."""
+        for entity_id in self.unavailable:
+            if entity_id not in self.entities:
+                self._index_unavailable(entity_id)
 
     def _get_valid_battery_state(self, entity_id: str) -> Optional[State]:
-        """Return a state object for entity_id if it is a valid numeric battery entity.
+        """Return a state object for entity_id if it is a valid battery entity.
 
+        Numeric sensors need a numeric state, binary sensors "on" or "off".
         Returns None (and logs the reason) if the entity should be skipped.
         """
-        if entity_id.startswith("binary_sensor."):
-            _LOGGER.debug(
-                "_get_valid_battery_state: entity_id=%s skip=binary_sensor", entity_id
-            )
-            return None
-
         state = self.hass.states.get(entity_id)
         if state is None:
             _LOGGER.debug(
@@ -244,6 +1448,15 @@ class BatteryMonitor:
             )
             return None
 
+        if entity_id.startswith(BINARY_SENSOR_PREFIX):
+            if state.state not in (STATE_ON, STATE_OFF):
+                _LOGGER.debug(
+                    "_get_valid_battery_state: entity_id=%s skip=binary_state state=%s",
+                    entity_id, state.state,
+                )
+                return None
+            return state
+
         try:
             float(state.state)
         except (ValueError, TypeError):
@@ -260,15 +1473,18 @@ class BatteryMonitor:
         _LOGGER.debug("discover_entities: starting entity discovery")
         try:
             entity_registry = er.async_get(self.hass)
-            device_registry = dr.async_get(self.hass)
-            area_registry = ar.async_get(self.hass)
 
             total_checked = 0
             skipped_device_class = 0
+            skipped_excluded = 0
             accepted = 0
+            battery_ids: Set[str] = set()
 
-            for entity_entry in entity_registry.entities.values():
+            for entity_entry in list(entity_registry.entities.values()):
                 total_checked += 1
+                if total_checked % DISCOVERY_BATCH_SIZE == 0:
+                    # Yield so large registries don't monopolize the loop
+                    await asyncio.sleep(0)
                 device_class = (
                     entity_entry.device_class
                     or entity_entry.original_device_class
@@ -278,26 +1494,26 @@ class BatteryMonitor:
                     continue
 
                 entity_id = entity_entry.entity_id
+                if entity_id.startswith(BINARY_SENSOR_PREFIX):
+                    self.binary_sensors.add(entity_id)
+                if self._is_excluded(entity_id, entity_entry):
+                    self.excluded.add(entity_id)
+                    skipped_excluded += 1
+                    continue
+                self.excluded.discard(entity_id)
+                battery_ids.add(entity_id)
+                self._update_unavailable(entity_id, self.hass.states.get(entity_id))
                 state = self._get_valid_battery_state(entity_id)
                 if state is None:
                     continue
 
-                device_name, manufacturer, model, area_name = (
-                    self._resolve_device_info(
-                        entity_id,
-                        entity_entry.device_id,
-                        entity_entry.area_id,
-                        device_registry,
-                        area_registry,
-                    )
-                )
+                device, area_override = self._resolve_metadata(entity_entry)
 
                 try:
                     entity = BatteryEntity(
-                        entity_id, state, device_name,
-                        manufacturer, model, area_name,
+                        entity_id, state, device, area_override
                     )
-                    self.entities[entity_id] = entity
+                    self._track(entity)
                     accepted += 1
                 except Exception as e:
                     _LOGGER.warning(
@@ -305,11 +1521,18 @@ class BatteryMonitor:
                         entity_id, e,
                     )
 
-            skipped = total_checked - skipped_device_class - accepted
+            # Drop unavailable entries for entities no longer registered
+            for entity_id in self.unavailable - battery_ids:
+                self._update_unavailable(entity_id, None)
+            self._mark_changed()
+            skipped = (
+                total_checked - skipped_device_class - skipped_excluded - accepted
+            )
             _LOGGER.info(
                 "discover_entities: complete total_checked=%d accepted=%d "
-                "skipped_device_class=%d skipped_other=%d",
-                total_checked, accepted, skipped_device_class, skipped,
+                "skipped_device_class=%d skipped_excluded=%d skipped_other=%d",
+                total_checked, accepted, skipped_device_class,
+                skipped_excluded, skipped,
             )
         except Exception as e:
             _LOGGER.error(
@@ -333,9 +1556,12 @@ class BatteryMonitor:
             )
             return
 
+        unavailable_changed = self._update_unavailable(entity_id, new_state)
+
         if new_state is None:
-            was_tracked = entity_id in self.entities
-            self.entities.pop(entity_id, None)
+            was_tracked = self._untrack(entity_id) is not None
+            if was_tracked or unavailable_changed:
+                self._mark_changed()
             _LOGGER.debug(
                 "on_state_changed: entity_id=%s new_state=None was_tracked=%s removed=%s",
                 entity_id, was_tracked, was_tracked,
@@ -344,24 +1570,21 @@ class BatteryMonitor:
 
         # Skip unavailable entities
         if new_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
-            was_tracked = entity_id in self.entities
-            self.entities.pop(entity_id, None)
+            was_tracked = self._untrack(entity_id) is not None
+            if was_tracked or unavailable_changed:
+                self._mark_changed()
             _LOGGER.debug(
                 "on_state_changed: entity_id=%s state=%s was_tracked=%s removed=%s",
                 entity_id, new_state.state, was_tracked, was_tracked,
             )
             return
 
-        device_name, manufacturer, model, area_name = (
-            self._get_cached_or_lookup_device_info(entity_id)
-        )
+        device, area_override = self._get_cached_or_lookup_metadata(entity_id)
 
         try:
-            entity = BatteryEntity(
-                entity_id, new_state, device_name,
-                manufacturer, model, area_name,
-            )
-            self.entities[entity_id] = entity
+            entity = BatteryEntity(entity_id, new_state, device, area_override)
+            self._track(entity)
+            self._mark_changed()
             _LOGGER.debug(
                 "on_state_changed: entity_id=%s updated battery_level=%.1f%%",
                 entity_id, entity.battery_level,
@@ -380,18 +1603,26 @@ class BatteryMonitor:
                 entity_id,
             )
             return True
-        if entity_id.startswith("binary_sensor."):
+        if entity_id in self.excluded:
+            return False
+        if entity_id.startswith(BINARY_SENSOR_PREFIX):
+            # Membership kept by discovery and entity registry events, so
+            # no registry lookup per binary_sensor state event
+            result = entity_id in self.binary_sensors
             _LOGGER.debug(
-                "_is_battery_entity: entity_id=%s result=false reason=binary_sensor",
-                entity_id,
+                "_is_battery_entity: entity_id=%s result=%s source=binary_sensors",
+                entity_id, result,
             )
-            return False
+            return result
         try:
             entity_registry = er.async_get(self.hass)
             entry = entity_registry.entities.get(entity_id)
             if entry:
                 dc = entry.device_class or entry.original_device_class
                 result = dc == BATTERY_DEVICE_CLASS
+                if result and self._is_excluded(entity_id, entry):
+                    self.excluded.add(entity_id)
+                    result = False
                 _LOGGER.debug(
                     "_is_battery_entity: entity_id=%s device_class=%s result=%s source=entity_registry",
                     entity_id, dc, result,
@@ -402,6 +1633,9 @@ class BatteryMonitor:
                 state is not None
                 and state.attributes.get("device_class") == BATTERY_DEVICE_CLASS
             )
+            if result and self._is_excluded(entity_id, None):
+                self.excluded.add(entity_id)
+                result = False
             _LOGGER.debug(
                 "_is_battery_entity: entity_id=%s result=%s source=state_attributes",
                 entity_id, result,
@@ -414,185 +1648,401 @@ class BatteryMonitor:
             )
             return False
 
-    async def query_entities(self) -> Dict[str, Any]:
-        """Return all battery entities below the fixed threshold.
+    def _list_index(self, sort: str, tier: Optional[str]) -> SortedIndex:
+        """Return the index serving a list: a tier bucket or the low list."""
+        if tier is not None:
+            # Tier buckets are kept in level order only
+            return self.tier_indexes[tier]
+        return self.sort_indexes[sort]
 
-        For each entity selected below the threshold, performs a fresh lookup
-        against the device, entity, and area registries to attach the owning
-        device's manufacturer, model, and area name to the response payload.
-
-        Sorted by battery level ascending (lowest first).
+    def _page(
+        self,
+        index: SortedIndex,
+        sort: str,
+        limit: Optional[int],
+        cursor: Optional[str],
+        search: Optional[str],
+        where: Optional[FilterPlan] = None,
+    ) -> Tuple[List[str], Optional[str], int]:
+        """Return (ids, next_cursor, total) for one page of a list index.
+
+        With search, the list is narrowed to the search index's matches,
+        ranked best first. With where, it is narrowed to the plan's
+        matches. total counts what is left.
         """
-        _LOGGER.debug(
-            "query_entities: starting threshold=%d%% tracked_total=%d",
-            BATTERY_THRESHOLD, len(self.entities),
+        ranked = self.search_index.search(search) if search else None
+        matched = where.select(self, index) if where is not None else None
+        if ranked is None and matched is None:
+            after = decode_cursor(cursor, sort) if cursor else None
+            entity_ids, last = index.page(after, limit)
+            total = len(index)
+        else:
+            if ranked is None:
+                keys = index.keys_for(matched)
+            else:
+                sort = SORT_RELEVANCE
+                keys = [
+                    key for key in ranked
+                    if key[-1] in (index if matched is None else matched)
+                ]
+            after = decode_cursor(cursor, sort) if cursor else None
+            entity_ids, last = page_keys(keys, after, limit)
+            total = len(keys)
+        next_cursor = encode_cursor(sort, last) if last is not None else None
+        return entity_ids, next_cursor, total
+
+    def low_battery_entities(
+        self,
+        sort: str = SORT_LEVEL,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        tier: Optional[str] = None,
+        search: Optional[str] = None,
+        where: Optional[FilterPlan] = None,
+    ) -> Tuple[List[BatteryEntity], Optional[str], int]:
+        """Return a page of entities below the threshold in the given order.
+
+        With tier, the page comes from that severity tier's bucket instead
+        (level order, low or not). With search, only matching entities are
+        returned, best match first; with where, only entities matching the
+        filter plan. Returns (entities, next_cursor, total);
+        next_cursor is None on the last page. Reads maintained indexes, so
+        a page costs O(log n + limit) plus the search's candidates. Raises
+        InvalidCursor for an invalid cursor.
+        """
+        entity_ids, next_cursor, total = self._page(
+            self._list_index(sort, tier), sort, limit, cursor, search, where
+        )
+        return (
+            [self.entities[entity_id] for entity_id in entity_ids],
+            next_cursor,
+            total,
         )
 
-        entity_registry = er.async_get(self.hass)
-        device_registry = dr.async_get(self.hass)
-        area_registry = ar.async_get(self.hass)
-
-        low_battery: List[Dict[str, Any]] = []
-
-        for entity in self.entities.values():
-            if not (0 <= entity.battery_level < BATTERY_THRESHOLD):
-                _LOGGER.debug(
-                    "query_entities: entity_id=%s battery_level=%.1f%% above_threshold=true skipping",
-                    entity.entity_id, entity.battery_level,
-                )
-                continue
-
-            data = entity.to_dict()
+    @staticmethod
+    def encoded_rows(
+        entities: Sequence[BatteryEntity],
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[bytes]:
+        """Lazily yield each entity's row as encoded JSON.
 
-            # Fresh device registry lookup for each selected entity
-            entry = entity_registry.entities.get(entity.entity_id)
-            if entry:
-                area_id = entry.area_id
-                if entry.device_id:
-                    device = device_registry.async_get(entry.device_id)
-                    if device:
-                        if device.name:
-                            data["device_name"] = device.name
-                        data["manufacturer"] = device.manufacturer
-                        data["model"] = device.model
-                        if not area_id:
-                            area_id = device.area_id
-                        _LOGGER.debug(
-                            "query_entities: entity_id=%s device_id=%s "
-                            "manufacturer=%s model=%s area_id=%s",
-                            entity.entity_id, entry.device_id,
-                            device.manufacturer, device.model, area_id,
-                        )
-                    else:
-                        _LOGGER.debug(
-                            "query_entities: entity_id=%s device_id=%s device=not_found",
-                            entity.entity_id, entry.device_id,
-                        )
-                if area_id:
-                    area = area_registry.async_get_area(area_id)
-                    if area:
-                        data["area_name"] = area.name
-                        _LOGGER.debug(
-                            "query_entities: entity_id=%s area_id=%s area_name=%s",
-                            entity.entity_id, area_id, area.name,
-                        )
-            else:
-                _LOGGER.debug(
-                    "query_entities: entity_id=%s registry_entry=not_found "
-                    "using_cached_device_info=true",
-                    entity.entity_id,
-                )
+        Full rows come from the per-entity cache; projected rows are
+        encoded on demand, one at a time as the consumer pulls them.
+        """
+        for entity in entities:
+            yield json_bytes(entity.to_dict(fields)) if fields else entity.encoded()
 
-            low_battery.append(data)
+    async def query_entities(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        result_format: str = FORMAT_ROWS,
+        sort: str = SORT_LEVEL,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        tier: Optional[str] = None,
+        search: Optional[str] = None,
+        group_by: Optional[str] = None,
+        where: Optional[FilterPlan] = None,
+    ) -> Dict[str, Any]:
+        """Return battery entities below their effective threshold.
+
+        Device manufacturer, model, and area name come from the shared
+        metadata records, which registry update events keep current; no
+        registry lookups happen at query time. Without fields each row is
+        the entity's cached JSON fragment, so unchanged entities cost no
+        serialization; with fields only those columns are built.
+        result_format="columnar" returns parallel per-field arrays instead
+        of a list of rows (see serialization.encode_columnar).
+
+        Rows come in the requested sort order (default: battery level
+        ascending). With limit, one page is returned along with
+        "has_more" and "next_cursor", which is passed back as cursor for
+        the following page. "total" always counts the whole list.
+        With tier, the rows are that severity tier's entities instead, in
+        level order. With search, only entities whose name, entity id, area
+        or model match are returned, ranked best match first, and "total"
+        counts the matches. With where (a compiled filter, see filters.py),
+        only matching entities are returned. group_by="device" returns device groups
+        instead (see query_device_groups).
+        """
+        if group_by == GROUP_BY_DEVICE:
+            return self.query_device_groups(fields, limit, cursor)
+        _LOGGER.debug(
+            "query_entities: starting default_threshold=%.0f%% tracked_total=%d "
+            "sort=%s tier=%s limit=%s cursor=%s search=%s where=%s",
+            self.thresholds.default, len(self.entities), sort, tier, limit,
+            bool(cursor), search, where.canonical if where else None,
+        )
 
-        low_battery.sort(
-            key=lambda d: (d["battery_level"], d.get("device_name") or d["entity_id"])
+        low_battery, next_cursor, result_count = self.low_battery_entities(
+            sort, limit, cursor, tier, search, where
         )
 
-        result_count = len(low_battery)
         _LOGGER.info(
-            "query_entities: complete below_threshold=%d tracked_total=%d threshold=%d%%",
-            result_count, len(self.entities), BATTERY_THRESHOLD,
+            "query_entities: complete below_threshold=%d returned=%d "
+            "tracked_total=%d",
+            result_count, len(low_battery), len(self.entities),
         )
         _LOGGER.debug(
             "query_entities: result entity_ids=%s",
-            [d["entity_id"] for d in low_battery],
+            [entity.entity_id for entity in low_battery],
         )
 
-        return {
-            "entities": low_battery,
-            "total": result_count,
+        if result_format == FORMAT_COLUMNAR:
+            fields = fields or ENTITY_FIELDS
+            result = {
+                **encode_columnar(
+                    [entity.to_row(fields) for entity in low_battery], fields
+                ),
+                "total": result_count,
+            }
+        else:
+            result = {
+                "entities": (
+                    encode_rows(
+                        [entity.to_row(fields) for entity in low_battery],
+                        fields,
+                    )
+                    if fields else
+                    [entity.as_fragment() for entity in low_battery]
+                ),
+                "total": result_count,
+            }
+        if limit is not None:
+            result["has_more"] = next_cursor is not None
+            result["next_cursor"] = next_cursor
+        return result
+
+    def query_device_groups(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Return the devices with a low entity, lowest level first.
+
+        Each group is {"device_id" (None for an entity without a device),
+        "device_name", "area_name", "min_level", "status" (tier of
+        min_level; "low" when a binary sensor member is on or no member
+        has a level), "low" (members on the low list), "entities": rows
+        of every tracked member, level ascending}. Groups and their rollups
+        are maintained per state change, so only the page is built. limit
+        and cursor page through groups as in query_entities.
+        """
+        after = decode_cursor(cursor, GROUP_BY_DEVICE) if cursor else None
+        group_ids, last = self.group_index.page(after, limit)
+        groups = [
+            self._group_row(self.device_groups[group_id], fields)
+            for group_id in group_ids
+        ]
+        _LOGGER.debug(
+            "query_device_groups: groups=%d returned=%d",
+            len(self.group_index), len(groups),
+        )
+        result: Dict[str, Any] = {
+            "groups": groups,
+            "total": len(self.group_index),
         }
+        if limit is not None:
+            result["has_more"] = last is not None
+            result["next_cursor"] = (
+                encode_cursor(GROUP_BY_DEVICE, last) if last is not None else None
+            )
+        return result
 
-    async def get_unavailable_entities(self) -> Dict[str, Any]:
-        """Return all battery entities whose state is unavailable or unknown.
+    def _group_row(
+        self, group: DeviceGroup, fields: Optional[Sequence[str]]
+    ) -> Dict[str, Any]:
+        members = sorted(
+            (self.entities[entity_id] for entity_id in group.entity_ids),
+            key=_low_list_order,
+        )
+        first = members[0]
+        device = first.device
+        area = device.area if device is not None else None
+        min_level = group.min_level()
+        return {
+            "device_id": device.device_id if device is not None else None,
+            "device_name": first.device_name,
+            "area_name": area.name if area is not None else first.area_name,
+            "min_level": min_level,
+            "status": (
+                STATUS_LOW if group.flagged or min_level is None
+                else self.thresholds.tier(min_level)
+            ),
+            "low": len(group.low),
+            "entities": [
+                entity.to_dict(fields) if fields else entity.as_fragment()
+                for entity in members
+            ],
+        }
 
-        Queries the entity registry directly (not self.entities, which only
-        contains numeric entities). Skips binary_sensor.* entities.
-        Sorts by last_changed descending (most recently changed first).
+    async def query_changes(
+        self,
+        since: int,
+        fields: Optional[Sequence[str]] = None,
+        epoch: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Return how the low-battery list changed after version since.
+
+        Result: {"version", "epoch", "full": false, "entered": [rows],
+        "changed": [rows], "left": [entity_ids]}, rows sorted like
+        query_entities. If since is older than the change log, newer than
+        the current version, or was issued under another epoch, the full
+        low-battery list is returned instead, as query_entities would, with
+        "full": true.
         """
-        _LOGGER.debug("get_unavailable_entities: starting unavailable entity query")
+        changes = (
+            self.changes.since(since)
+            if since <= self.version and epoch in (None, self.epoch)
+            else None
+        )
+        if changes is None:
+            _LOGGER.info(
+                "query_changes: since=%d version=%d log_floor=%d "
+                "epoch_match=%s full=true",
+                since, self.version, self.changes.floor,
+                epoch in (None, self.epoch),
+            )
+            result = await self.query_entities(fields)
+            return {
+                "version": self.version, "epoch": self.epoch, "full": True,
+                **result,
+            }
 
-        entity_registry = er.async_get(self.hass)
-        device_registry = dr.async_get(self.hass)
-        area_registry = ar.async_get(self.hass)
+        entered: List[BatteryEntity] = []
+        changed: List[BatteryEntity] = []
+        left: List[str] = []
+        for entity_id, (was_low, _) in changes.items():
+            entity = self.entities.get(entity_id)
+            if entity is not None and self._is_low(entity):
+                (changed if was_low else entered).append(entity)
+            elif was_low:
+                left.append(entity_id)
+
+        entered.sort(key=_low_list_order)
+        changed.sort(key=_low_list_order)
+        _LOGGER.info(
+            "query_changes: since=%d version=%d entered=%d changed=%d left=%d",
+            since, self.version, len(entered), len(changed), len(left),
+        )
 
-        unavailable: List[Dict[str, Any]] = []
+        def rows(entities: List[BatteryEntity]) -> List[Any]:
+            if fields:
+                return [entity.to_dict(fields) for entity in entities]
+            return [entity.as_fragment() for entity in entities]
 
-        for entity_entry in entity_registry.entities.values():
-            device_class = (
-                entity_entry.device_class
-                or entity_entry.original_device_class
-            )
-            if device_class != BATTERY_DEVICE_CLASS:
-                continue
+        return {
+            "version": self.version,
+            "epoch": self.epoch,
+            "full": False,
+            "entered": rows(entered),
+            "changed": rows(changed),
+            "left": sorted(left),
+        }
 
-            entity_id = entity_entry.entity_id
+    def _unavailable_row(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        """Build a query_unavailable row from the entity's live state."""
+        state = self.hass.states.get(entity_id)
+        if state is None:
+            _LOGGER.debug(
+                "get_unavailable_entities: entity_id=%s skip=no_state", entity_id
+            )
+            return None
 
-            if entity_id.startswith("binary_sensor."):
-                _LOGGER.debug(
-                    "get_unavailable_entities: entity_id=%s skip=binary_sensor",
-                    entity_id,
-                )
-                continue
+        entry = er.async_get(self.hass).entities.get(entity_id)
+        device, area_override = (
+            self._resolve_metadata(entry) if entry is not None else (None, None)
+        )
+        area = area_override or (device.area if device else None)
 
-            state = self.hass.states.get(entity_id)
-            if state is None:
-                _LOGGER.debug(
-                    "get_unavailable_entities: entity_id=%s skip=no_state", entity_id
-                )
-                continue
+        friendly_name: Optional[str] = (
+            device.name if device and device.name else None
+        ) or state.attributes.get("friendly_name", entity_id)
 
-            if state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN):
-                continue
+        return {
+            "entity_id": entity_id,
+            "state": state.state,
+            "battery_level": None,
+            "device_name": friendly_name or entity_id,
+            "manufacturer": device.manufacturer if device else None,
+            "model": device.model if device else None,
+            "area_name": area.name if area else None,
+            "last_changed": (
+                state.last_changed.isoformat() if state.last_changed else None
+            ),
+            "last_updated": (
+                state.last_updated.isoformat() if state.last_updated else None
+            ),
+        }
 
-            device_name, manufacturer, model, area_name = self._resolve_device_info(
-                entity_id,
-                entity_entry.device_id,
-                entity_entry.area_id,
-                device_registry,
-                area_registry,
-            )
-
-            friendly_name: Optional[str] = device_name or state.attributes.get(
-                "friendly_name", entity_id
-            )
-
-            data: Dict[str, Any] = {
-                "entity_id": entity_id,
-                "state": state.state,
-                "battery_level": None,
-                "device_name": friendly_name or entity_id,
-                "manufacturer": manufacturer,
-                "model": model,
-                "area_name": area_name,
-                "last_changed": (
-                    state.last_changed.isoformat() if state.last_changed else None
-                ),
-                "last_updated": (
-                    state.last_updated.isoformat() if state.last_updated else None
-                ),
-            }
-            unavailable.append(data)
-            _LOGGER.debug(
-                "get_unavailable_entities: entity_id=%s state=%s accepted=true",
-                entity_id, state.state,
-            )
+    async def get_unavailable_entities(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        result_format: str = FORMAT_ROWS,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        search: Optional[str] = None,
+        where: Optional[FilterPlan] = None,
+    ) -> Dict[str, Any]:
+        """Return battery entities whose state is unavailable or unknown.
+
+        Reads self.unavailable_index (kept current by state and registry
+        events), so only the returned page's rows are built. Sorted by last_changed descending (most
+        recently changed first). If fields is given, rows are projected onto
+        those of its keys an unavailable row has (the caller rejects a list
+        with none of them); result_format="columnar" encodes them as per-field
+        arrays. limit, cursor, search and where work as in query_entities.
+        """
+        _LOGGER.debug(
+            "get_unavailable_entities: starting limit=%s cursor=%s search=%s",
+            limit, bool(cursor), search,
+        )
 
-        # Sort by last_changed descending (most recently changed first).
-        # Entities with no last_changed timestamp sort to the end.
-        unavailable.sort(
-            key=lambda d: d["last_changed"] or "",
-            reverse=True,
+        entity_ids, next_cursor, result_count = self._page(
+            self.unavailable_index, SORT_LAST_CHANGED, limit, cursor, search,
+            where,
         )
+        unavailable = [
+            row for row in map(self._unavailable_row, entity_ids)
+            if row is not None
+        ]
 
-        result_count = len(unavailable)
         _LOGGER.info(
-            "get_unavailable_entities: complete unavailable_count=%d",
-            result_count,
+            "get_unavailable_entities: complete unavailable_count=%d returned=%d",
+            result_count, len(unavailable),
         )
 
-        return {
-            "entities": unavailable,
-            "total": result_count,
-        }
+        if result_format == FORMAT_COLUMNAR or fields:
+            fields = [
+                key for key in (fields or ENTITY_FIELDS)
+                if key in UNAVAILABLE_FIELDS
+            ]
+            rows = [tuple(row[key] for key in fields) for row in unavailable]
+        if result_format == FORMAT_COLUMNAR:
+            result = {**encode_columnar(rows, fields), "total": result_count}
+        else:
+            result = {
+                "entities": encode_rows(rows, fields) if fields else unavailable,
+                "total": result_count,
+            }
+        if limit is not None:
+            result["has_more"] = next_cursor is not None
+            result["next_cursor"] = next_cursor
+        return result
+
+
+async def async_remove_snapshot(
+    hass: HomeAssistant, battery_monitor: Optional[BatteryMonitor] = None
+) -> None:
+    """Delete the persisted snapshot once the integration is removed.
+
+    Goes through battery_monitor's store when there is one, so a save it
+    still has pending is cancelled instead of writing the file back.
+    """
+    store = (
+        battery_monitor._store if battery_monitor is not None
+        else _SnapshotStore(hass, STORAGE_VERSION, STORAGE_KEY)
+    )
+    await store.async_remove()
+    _LOGGER.debug("async_remove_snapshot: key=%s removed=true", STORAGE_KEY)
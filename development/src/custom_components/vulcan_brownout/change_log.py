@@ -0,0 +1,69 @@
+"""Bounded log of low-battery list changes for delta queries.
+
+Each entry records that an entity's low-list row changed at an index
+version, and whether it was on the low list just before that change and
+after it. Only changes touching the low list are logged. The log keeps the
+most recent entries; once older ones are evicted, a "since" before the
+evicted range can't be answered and the caller falls back to a full
+snapshot.
+"""
+
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+
+
+class Change(NamedTuple):
+    """One logged change to an entity's low-list row."""
+
+    version: int
+    entity_id: str
+    was_low: bool
+    is_low: bool
+
+
+class ChangeLog:
+    """Fixed-size, version-ordered log of low-list changes."""
+
+    def __init__(self, max_entries: int, version: int = 0) -> None:
+        self.max_entries = max_entries
+        self._entries: Deque[Change] = deque()
+        # Changes after this version are all still in the log
+        self.floor = version
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def reset(self, version: int) -> None:
+        """Forget all entries; only changes after version can be answered."""
+        self._entries.clear()
+        self.floor = version
+
+    def record(
+        self, version: int, entity_id: str, was_low: bool, is_low: bool
+    ) -> None:
+        """Append a change, evicting the oldest entry when full."""
+        if len(self._entries) >= self.max_entries:
+            self.floor = self._entries.popleft().version
+        self._entries.append(Change(version, entity_id, was_low, is_low))
+
+    def since(self, version: int) -> Optional[Dict[str, Tuple[bool, bool]]]:
+        """Return {entity_id: (was_low, is_low)} over changes after version.
+
+        was_low is taken from the entity's first change in the range and
+        is_low from its last. Returns None if the range is no longer fully
+        covered by the log.
+        """
+        if version < self.floor:
+            return None
+        newest_first: List[Change] = []
+        for change in reversed(self._entries):
+            if change.version <= version:
+                break
+            newest_first.append(change)
+
+        result: Dict[str, Tuple[bool, bool]] = {}
+        for change in reversed(newest_first):
+            first = result.get(change.entity_id)
+            was_low = first[0] if first is not None else change.was_low
+            result[change.entity_id] = (was_low, change.is_low)
+        return result
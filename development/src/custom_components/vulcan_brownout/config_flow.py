@@ -4,10 +4,28 @@ import logging
 from typing import Any, Dict, Optional
 
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import selector
 import voluptuous as vol
 
-from .const import DOMAIN
+from .const import (
+    BATTERY_THRESHOLD,
+    CONF_AREA_THRESHOLDS,
+    CONF_ENTITY_THRESHOLDS,
+    CONF_EXCLUDE_AREAS,
+    CONF_EXCLUDE_DEVICES,
+    CONF_EXCLUDE_ENTITIES,
+    CONF_EXCLUDE_LABELS,
+    CONF_EXCLUDE_PLATFORMS,
+    CONF_GLOBAL_THRESHOLD,
+    CONF_MODEL_THRESHOLDS,
+    CONF_SEVERITY_TIERS,
+    DEFAULT_SEVERITY_TIERS,
+    DOMAIN,
+)
+from .exclusions import OPTIONS_SCHEMA as EXCLUSION_OPTIONS_SCHEMA
+from .thresholds import OPTIONS_SCHEMA
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -41,3 +59,81 @@ class VulcanBrownoutConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     ) -> FlowResult:
         """Import from YAML configuration."""
         return await self.async_step_user(import_data)
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> "VulcanBrownoutOptionsFlow":
+        """Return the options flow for threshold settings."""
+        return VulcanBrownoutOptionsFlow()
+
+
+class VulcanBrownoutOptionsFlow(config_entries.OptionsFlow):
+    """Edit thresholds, overrides, severity tiers and exclusion rules.
+
+    Saved options are applied to the running index by the entry's update
+    listener; no reload is needed.
+    """
+
+    async def async_step_init(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """Show and validate the threshold form.
+
+        The submission replaces the options as a whole: a field the user
+        cleared is absent from user_input and must stay cleared, so the
+        current options only prefill the form (as suggested values) and
+        are never merged back in.
+        """
+        errors: Dict[str, str] = {}
+        if user_input is not None:
+            try:
+                options = EXCLUSION_OPTIONS_SCHEMA(OPTIONS_SCHEMA(dict(user_input)))
+            except vol.Invalid as err:
+                _LOGGER.debug("async_step_init: options=invalid error=%s", err)
+                errors["base"] = "invalid_threshold"
+            else:
+                return self.async_create_entry(title="", data=options)
+
+        overrides = selector.ObjectSelector()
+        text_list = selector.TextSelector(
+            selector.TextSelectorConfig(multiple=True)
+        )
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_GLOBAL_THRESHOLD): selector.NumberSelector(
+                    # Same bounds as thresholds.THRESHOLD_VALUE
+                    selector.NumberSelectorConfig(
+                        min=0, max=100, step=1, unit_of_measurement="%",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Optional(CONF_ENTITY_THRESHOLDS): overrides,
+                vol.Optional(CONF_MODEL_THRESHOLDS): overrides,
+                vol.Optional(CONF_AREA_THRESHOLDS): overrides,
+                vol.Optional(CONF_SEVERITY_TIERS): selector.ObjectSelector(),
+                vol.Optional(CONF_EXCLUDE_ENTITIES): text_list,
+                vol.Optional(CONF_EXCLUDE_PLATFORMS): text_list,
+                vol.Optional(CONF_EXCLUDE_DEVICES): selector.DeviceSelector(
+                    selector.DeviceSelectorConfig(multiple=True)
+                ),
+                vol.Optional(CONF_EXCLUDE_AREAS): selector.AreaSelector(
+                    selector.AreaSelectorConfig(multiple=True)
+                ),
+                vol.Optional(CONF_EXCLUDE_LABELS): selector.LabelSelector(
+                    selector.LabelSelectorConfig(multiple=True)
+                ),
+            }
+        )
+        # A rejected submission is shown again as the user left it
+        suggested = user_input if user_input is not None else {
+            CONF_GLOBAL_THRESHOLD: BATTERY_THRESHOLD,
+            CONF_SEVERITY_TIERS: DEFAULT_SEVERITY_TIERS,
+            **self.config_entry.options,
+        }
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(schema, suggested),
+            errors=errors,
+        )
@@ -3,16 +3,128 @@
 DOMAIN: str = "vulcan_brownout"
 VERSION: str = "6.0.0"
 
-# Fixed battery threshold — entities below this level are shown
+# Default battery threshold — entities below this level are shown unless
+# an override in the config entry options applies
 BATTERY_THRESHOLD: int = 15
 
+# Config entry option keys for thresholds (see thresholds.py)
+CONF_GLOBAL_THRESHOLD: str = "global_threshold"
+CONF_ENTITY_THRESHOLDS: str = "entity_thresholds"  # entity_id -> percent
+CONF_MODEL_THRESHOLDS: str = "model_thresholds"  # device model -> percent
+CONF_AREA_THRESHOLDS: str = "area_thresholds"  # area_id -> percent
+CONF_SEVERITY_TIERS: str = "severity_tiers"  # tier -> upper bound percent
+
+# Config entry option keys for exclusion rules (see exclusions.py)
+CONF_EXCLUDE_ENTITIES: str = "exclude_entities"  # entity_id globs
+CONF_EXCLUDE_PLATFORMS: str = "exclude_platforms"  # integration domains
+CONF_EXCLUDE_DEVICES: str = "exclude_devices"  # device_ids
+CONF_EXCLUDE_AREAS: str = "exclude_areas"  # area_ids
+CONF_EXCLUDE_LABELS: str = "exclude_labels"  # label_ids
+
 # Device class to filter by
 BATTERY_DEVICE_CLASS: str = "battery"
 
+# Binary battery sensors (device class battery, "on" means low) have no
+# level: "on" is on the low list whatever the threshold, with status
+# STATUS_LOW, and "off" has status STATUS_OK. They are kept out of every
+# level aggregate (histogram, minimums, level-ordered keys).
+BINARY_SENSOR_PREFIX: str = "binary_sensor."
+
 # WebSocket command types
 COMMAND_QUERY_ENTITIES: str = "vulcan-brownout/query_entities"
 COMMAND_QUERY_UNAVAILABLE: str = "vulcan-brownout/query_unavailable"
 COMMAND_SUBSCRIBE: str = "vulcan-brownout/subscribe"
+COMMAND_STREAM_ENTITIES: str = "vulcan-brownout/stream_entities"
+COMMAND_BATCH: str = "vulcan-brownout/batch"
+COMMAND_QUERY_CHANGES: str = "vulcan-brownout/query_changes"
+COMMAND_SUMMARY: str = "vulcan-brownout/summary"
+COMMAND_SUBSCRIBE_SUMMARY: str = "vulcan-brownout/subscribe_summary"
+COMMAND_HISTOGRAM: str = "vulcan-brownout/histogram"
+COMMAND_ROLLUP: str = "vulcan-brownout/rollup"
+COMMAND_SUBSCRIBE_ROLLUP: str = "vulcan-brownout/subscribe_rollup"
+COMMAND_BATTERY_TYPES: str = "vulcan-brownout/battery_types"
+COMMAND_SUBSCRIBE_BATTERY_TYPES: str = "vulcan-brownout/subscribe_battery_types"
+
+# Row fields a client may request via the "fields" parameter of the query
+# and subscribe commands (default: all of them)
+ENTITY_FIELDS: tuple = (
+    "entity_id",
+    "state",
+    "attributes",
+    "last_changed",
+    "last_updated",
+    "device_name",
+    "battery_level",
+    "status",
+    "manufacturer",
+    "model",
+    "area_name",
+)
+
+# The ENTITY_FIELDS a query_unavailable row has
+UNAVAILABLE_FIELDS: frozenset = frozenset({
+    "entity_id", "state", "battery_level", "device_name", "manufacturer",
+    "model", "area_name", "last_changed", "last_updated",
+})
+
+# State attributes forwarded to clients; large vendor attributes are dropped
+DEFAULT_ATTRIBUTES: tuple = (
+    "friendly_name",
+    "device_class",
+    "unit_of_measurement",
+    "icon",
+)
+
+# Result encodings for the query commands' "format" parameter
+FORMAT_ROWS: str = "rows"
+FORMAT_COLUMNAR: str = "columnar"
+RESULT_FORMATS: tuple = (FORMAT_ROWS, FORMAT_COLUMNAR)
+
+# Sort orders of the low-battery list, each kept as a maintained index;
+# the query commands' "sort" parameter picks one
+SORT_LEVEL: str = "level"
+SORT_NAME: str = "name"
+SORT_AREA: str = "area"
+SORT_LAST_CHANGED: str = "last_changed"
+SORT_MARGIN: str = "margin"  # level minus the entity's threshold, ascending
+SORT_ORDERS: tuple = (
+    SORT_LEVEL, SORT_NAME, SORT_AREA, SORT_LAST_CHANGED, SORT_MARGIN,
+)
+# Best match first; implied by the "search" parameter, not a sort option
+SORT_RELEVANCE: str = "relevance"
+
+# Row grouping for query_entities' "group_by" parameter; device groups are
+# ordered by their lowest level and paged with cursors of their own
+GROUP_BY_DEVICE: str = "device"
+GROUP_BY_OPTIONS: tuple = (GROUP_BY_DEVICE,)
+
+# Longest accepted "search" string on the query commands
+SEARCH_MAX_LENGTH: int = 100
+
+# Filter expressions (filters.py): nesting and term limits, and the number
+# of compiled plans kept
+FILTER_MAX_DEPTH: int = 8
+FILTER_MAX_TERMS: int = 32
+FILTER_PLAN_CACHE_SIZE: int = 64
+
+# Fleet level histogram: bucket width (percent) and supported facets
+HISTOGRAM_BUCKET_WIDTH: float = 5.0
+HISTOGRAM_FACETS: tuple = ("area", "manufacturer")
+
+# Floor -> area -> device rollup: levels of the tree a client may request
+# (1 = floors, 2 = areas, 3 = devices)
+ROLLUP_DEPTHS: tuple = (1, 2, 3)
+ROLLUP_DEFAULT_DEPTH: int = 2
+
+# Entity attributes naming a device's batteries (the battery_notes
+# convention); a missing quantity means one battery
+ATTR_BATTERY_TYPE: str = "battery_type"
+ATTR_BATTERY_QUANTITY: str = "battery_quantity"
+
+# Subscription manager topics for aggregate streams
+TOPIC_SUMMARY: str = "summary"
+TOPIC_ROLLUP: str = "rollup"  # one topic per depth: "rollup/<depth>"
+TOPIC_BATTERY_TYPES: str = "battery_types"
 
 # WebSocket event types
 EVENT_ENTITY_CHANGED: str = "vulcan-brownout/entity_changed"
@@ -29,5 +141,48 @@ PANEL_ICON: str = "mdi:battery-alert"
 # WebSocket subscription limits
 MAX_SUBSCRIPTIONS: int = 100
 
-# Status — only "critical" exists now (all shown entities are below threshold)
+# Streamed snapshots (stream_entities): encoded bytes per chunk message; the
+# loop is yielded between chunks. Clients may pick a size within the bounds.
+STREAM_CHUNK_BYTES: int = 64 * 1024
+STREAM_CHUNK_BYTES_MIN: int = 1024
+STREAM_CHUNK_BYTES_MAX: int = 1024 * 1024
+
+# Query results with at least this many rows are JSON-encoded in the
+# executor instead of on the event loop
+EXECUTOR_ENCODE_MIN_ROWS: int = 500
+
+# Sub-commands accepted in one vulcan-brownout/batch request
+BATCH_MAX_COMMANDS: int = 10
+
+# Low-list changes kept for query_changes; polls older than the log's
+# oldest entry get a full snapshot instead
+CHANGE_LOG_SIZE: int = 2000
+
+# Persistent index snapshot (warm start across restarts)
+STORAGE_KEY: str = f"{DOMAIN}.index"
+STORAGE_VERSION: int = 2
+SNAPSHOT_SAVE_DELAY: int = 30  # seconds — debounces bursts of state changes
+
+# In-memory handoff of the built index across entry reloads; a handoff older
+# than this (seconds) is discarded and the next setup rediscovers.
+HANDOFF_MAX_AGE: int = 60
+
+# Registry entries walked per event-loop yield during discovery/validation
+DISCOVERY_BATCH_SIZE: int = 200
+
+# Severity tiers, most severe first; the "status" of a row. Each tier but
+# the last covers levels below its upper bound (configurable through
+# CONF_SEVERITY_TIERS) and at or above the previous tier's bound.
 STATUS_CRITICAL: str = "critical"
+STATUS_WARNING: str = "warning"
+STATUS_WATCH: str = "watch"
+STATUS_OK: str = "ok"
+STATUS_TIERS: tuple = (STATUS_CRITICAL, STATUS_WARNING, STATUS_WATCH, STATUS_OK)
+# Status of a binary battery sensor reporting low; it has no level, so it
+# belongs to none of the level tiers
+STATUS_LOW: str = "low"
+DEFAULT_SEVERITY_TIERS: dict = {
+    STATUS_CRITICAL: 5,
+    STATUS_WARNING: 15,
+    STATUS_WATCH: 30,
+}
@@ -0,0 +1,105 @@
+"""Entity exclusion rules for Vulcan Brownout.
+
+Rules come from the config entry options and are compiled once: entity id
+globs into a single regular expression, the other rule kinds into sets.
+The monitor applies them when an entity is first seen (discovery or a
+state event), so excluded entities are never tracked, indexed or
+broadcast.
+"""
+
+import fnmatch
+import re
+from typing import Any, Collection, FrozenSet, Mapping, Optional, Pattern
+
+import voluptuous as vol
+
+from .const import (
+    CONF_EXCLUDE_AREAS,
+    CONF_EXCLUDE_DEVICES,
+    CONF_EXCLUDE_ENTITIES,
+    CONF_EXCLUDE_LABELS,
+    CONF_EXCLUDE_PLATFORMS,
+)
+
+_RULE_KEYS = (
+    CONF_EXCLUDE_ENTITIES,
+    CONF_EXCLUDE_PLATFORMS,
+    CONF_EXCLUDE_DEVICES,
+    CONF_EXCLUDE_AREAS,
+    CONF_EXCLUDE_LABELS,
+)
+
+# Validates the exclusion keys of the config entry options
+OPTIONS_SCHEMA = vol.Schema(
+    {vol.Optional(key, default=list): [str] for key in _RULE_KEYS},
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+class ExclusionRules:
+    """Compiled exclusion rules; an entity matching any rule is excluded."""
+
+    __slots__ = ("globs", "platforms", "devices", "areas", "labels", "_pattern")
+
+    def __init__(
+        self,
+        globs: Collection[str] = (),
+        platforms: Collection[str] = (),
+        devices: Collection[str] = (),
+        areas: Collection[str] = (),
+        labels: Collection[str] = (),
+    ) -> None:
+        self.globs: FrozenSet[str] = frozenset(globs)
+        self.platforms: FrozenSet[str] = frozenset(platforms)
+        self.devices: FrozenSet[str] = frozenset(devices)
+        self.areas: FrozenSet[str] = frozenset(areas)
+        self.labels: FrozenSet[str] = frozenset(labels)
+        self._pattern: Optional[Pattern[str]] = (
+            re.compile(
+                "|".join(fnmatch.translate(glob) for glob in sorted(self.globs))
+            )
+            if self.globs else None
+        )
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> "ExclusionRules":
+        """Compile the rules in config entry options.
+
+        Raises vol.Invalid if the exclusion options are malformed.
+        """
+        options = OPTIONS_SCHEMA(dict(options))
+        return cls(*(options[key] for key in _RULE_KEYS))
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.globs or self.platforms or self.devices or self.areas
+            or self.labels
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ExclusionRules):
+            return NotImplemented
+        return (
+            self.globs == other.globs
+            and self.platforms == other.platforms
+            and self.devices == other.devices
+            and self.areas == other.areas
+            and self.labels == other.labels
+        )
+
+    def matches(
+        self,
+        entity_id: str,
+        platform: Optional[str] = None,
+        device_id: Optional[str] = None,
+        area_id: Optional[str] = None,
+        labels: Collection[str] = (),
+    ) -> bool:
+        """Return True if any rule excludes the entity."""
+        return (
+            (self._pattern is not None and self._pattern.match(entity_id) is not None)
+            or platform in self.platforms
+            or device_id in self.devices
+            or area_id in self.areas
+            or not self.labels.isdisjoint(labels)
+        )
@@ -0,0 +1,394 @@
+"""Filter expressions for Vulcan Brownout queries and subscriptions.
+
+A filter is a small JSON expression: {"and": [...]}, {"or": [...]} and
+{"not": expr} over single-key leaves:
+
+    {"tier": "critical"}   severity tier (tier bucket index)
+    {"label": "outdoor"}   entity or device label (label index)
+    {"low": true}          on the low list (level-ordered low index)
+    {"search": "hall"}     search text matches (trigram index)
+    {"area": "kitchen"}    area id (checked per candidate)
+    {"floor": "upstairs"}  floor id (checked per candidate)
+    {"below": 20}          level below a percent (level store scan)
+
+An expression is compiled once into a plan of nodes. Running a plan
+within a list starts from whichever indexed term is most selective
+right now (smallest posting set, an O(1) size read) and tests the other
+terms per candidate, most selective first, so cost follows the smallest
+set rather than the fleet size. Compiled plans are kept in an LRU cache
+keyed by the expression's canonical JSON, so equivalent expressions
+share one plan.
+"""
+
+import json
+import math
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Collection, Dict, List, Mapping, Optional, Sequence, Set
+
+from .const import (
+    FILTER_MAX_DEPTH,
+    FILTER_MAX_TERMS,
+    SEARCH_MAX_LENGTH,
+    SORT_LEVEL,
+    STATUS_TIERS,
+)
+from .search_index import query_trigrams
+
+# Estimate of a term that can only be tested per candidate
+_UNBOUNDED = math.inf
+
+
+class InvalidFilter(ValueError):
+    """A filter expression that doesn't follow the grammar."""
+
+
+class _Node(ABC):
+    """One term of a compiled plan.
+
+    estimate() is an upper bound on the matching ids, read in O(1);
+    contains() tests one id. A term that can only be tested per
+    candidate keeps the unbounded estimate.
+    """
+
+    def estimate(self, monitor: Any) -> float:
+        return _UNBOUNDED
+
+    @abstractmethod
+    def contains(self, monitor: Any, entity_id: str) -> bool:
+        """Return True if entity_id matches the term."""
+
+
+class _Selectable(_Node):
+    """A term that can also list its matching ids.
+
+    select() is only called when estimate() is finite.
+    """
+
+    @abstractmethod
+    def estimate(self, monitor: Any) -> float:
+        """Return an upper bound on the matching ids, in O(1)."""
+
+    @abstractmethod
+    def select(self, monitor: Any) -> Collection[str]:
+        """Return the matching ids."""
+
+
+class _Scope(_Selectable):
+    """The list a plan runs within (a SortedIndex)."""
+
+    def __init__(self, index: Any) -> None:
+        self.index = index
+
+    def estimate(self, monitor: Any) -> float:
+        return len(self.index)
+
+    def select(self, monitor: Any) -> Collection[str]:
+        return self.index.ids()
+
+    def contains(self, monitor: Any, entity_id: str) -> bool:
+        return entity_id in self.index
+
+
+class _Tier(_Selectable):
+    def __init__(self, tier: str) -> None:
+        self.tier = tier
+
+    def estimate(self, monitor: Any) -> float:
+        return len(monitor.tier_indexes[self.tier])
+
+    def select(self, monitor: Any) -> Collection[str]:
+        return monitor.tier_indexes[self.tier].ids()
+
+    def contains(self, monitor: Any, entity_id: str) -> bool:
+        return entity_id in monitor.tier_indexes[self.tier]
+
+
+class _Low(_Selectable):
+    def estimate(self, monitor: Any) -> float:
+        return len(monitor.sort_indexes[SORT_LEVEL])
+
+    def select(self, monitor: Any) -> Collection[str]:
+        return monitor.sort_indexes[SORT_LEVEL].ids()
+
+    def contains(self, monitor: Any, entity_id: str) -> bool:
+        return entity_id in monitor.sort_indexes[SORT_LEVEL]
+
+
+class _Label(_Selectable):
+    def __init__(self, label_id: str) -> None:
+        self.label_id = label_id
+
+    def estimate(self, monitor: Any) -> float:
+        return monitor.label_index.count(self.label_id)
+
+    def select(self, monitor: Any) -> Collection[str]:
+        return monitor.label_index.members(self.label_id)
+
+    def contains(self, monitor: Any, entity_id: str) -> bool:
+        return self.label_id in monitor.label_index.labels_of(entity_id)
+
+
+class _Search(_Selectable):
+    def __init__(self, text: str) -> None:
+        # Query trigrams are computed once, at compile time
+        self.grams = query_trigrams(text)
+
+    def estimate(self, monitor: Any) -> float:
+        return monitor.search_index.estimate(self.grams)
+
+    def select(self, monitor: Any) -> Collection[str]:
+        return monitor.search_index.matching(self.grams)
+
+    def contains(self, monitor: Any, entity_id: str) -> bool:
+        return monitor.search_index.has_trigrams(entity_id, self.grams)
+
+
+class _Place(_Node):
+    """Area (depth 1) or floor (depth 0) of the entity's rollup path."""
+
+    def __init__(self, depth: int, place_id: str) -> None:
+        self.depth = depth
+        self.place_id = place_id
+
+    def contains(self, monitor: Any, entity_id: str) -> bool:
+        path = monitor.rollup.path_of(entity_id)
+        return path is not None and path[self.depth] == self.place_id
+
+
+class _Below(_Selectable):
+    def __init__(self, percent: float) -> None:
+        self.percent = percent
+
+    def estimate(self, monitor: Any) -> float:
+        # The histogram buckets covering [0, percent) bound the matches
+        histogram = monitor.histogram
+        return sum(histogram.counts[:math.ceil(self.percent / histogram.bucket_width)])
+
+    def select(self, monitor: Any) -> Collection[str]:
+        return monitor.levels.below(self.percent)
+
+    def contains(self, monitor: Any, entity_id: str) -> bool:
+        entity = monitor.entities.get(entity_id)
+        return entity is not None and 0 <= entity.battery_level < self.percent
+
+
+class _And(_Selectable):
+    def __init__(self, terms: List[_Node]) -> None:
+        self.terms = terms
+
+    def estimate(self, monitor: Any) -> float:
+        return min(term.estimate(monitor) for term in self.terms)
+
+    def select(self, monitor: Any) -> Collection[str]:
+        ranked = sorted(self.terms, key=lambda term: term.estimate(monitor))
+        # The estimate is finite, so the most selective term is selectable
+        first, rest = ranked[0], ranked[1:]
+        return {
+            entity_id for entity_id in first.select(monitor)
+            if all(term.contains(monitor, entity_id) for term in rest)
+        }
+
+    def contains(self, monitor: Any, entity_id: str) -> bool:
+        return all(term.contains(monitor, entity_id) for term in self.terms)
+
+
+class _Or(_Selectable):
+    def __init__(self, terms: List[_Node]) -> None:
+        self.terms = terms
+
+    def estimate(self, monitor: Any) -> float:
+        return sum(term.estimate(monitor) for term in self.terms)
+
+    def select(self, monitor: Any) -> Collection[str]:
+        result: Set[str] = set()
+        for term in self.terms:
+            # The estimate is finite, so every operand is selectable
+            result.update(term.select(monitor))
+        return result
+
+    def contains(self, monitor: Any, entity_id: str) -> bool:
+        return any(term.contains(monitor, entity_id) for term in self.terms)
+
+
+class _Not(_Node):
+    def __init__(self, term: _Node) -> None:
+        self.term = term
+
+    def contains(self, monitor: Any, entity_id: str) -> bool:
+        return not self.term.contains(monitor, entity_id)
+
+
+class FilterPlan:
+    """A compiled filter expression."""
+
+    __slots__ = ("canonical", "_root")
+
+    def __init__(self, canonical: str, root: _Node) -> None:
+        self.canonical = canonical
+        self._root = root
+
+    def select(self, monitor: Any, index: Any) -> Collection[str]:
+        """Return the ids of index (a SortedIndex) that match."""
+        return _And([_Scope(index), self._root]).select(monitor)
+
+    def contains(self, monitor: Any, entity_id: str) -> bool:
+        """Return True if entity_id matches; O(terms), no scans."""
+        return self._root.contains(monitor, entity_id)
+
+
+def _leaf(key: str, value: Any) -> _Node:
+    if key == "tier":
+        if value not in STATUS_TIERS:
+            raise InvalidFilter(f"unknown tier: {value!r}")
+        return _Tier(value)
+    if key == "low":
+        if value is not True:
+            raise InvalidFilter("low only takes true")
+        return _Low()
+    if key == "below":
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise InvalidFilter("below takes a number")
+        if not 0 <= value <= 100:
+            raise InvalidFilter("below must be between 0 and 100")
+        return _Below(float(value))
+    if key not in ("label", "area", "floor", "search"):
+        raise InvalidFilter(f"unknown filter term: {key!r}")
+    if not isinstance(value, str) or not value:
+        raise InvalidFilter(f"{key} takes a non-empty string")
+    if key == "label":
+        return _Label(value)
+    if key == "area":
+        return _Place(1, value)
+    if key == "floor":
+        return _Place(0, value)
+    if len(value) > SEARCH_MAX_LENGTH:
+        raise InvalidFilter("search is too long")
+    if not query_trigrams(value):
+        raise InvalidFilter("search has no words")
+    return _Search(value)
+
+
+def _normalize(expression: Any, depth: int, terms: List[int]) -> Any:
+    """Validate an expression and return its canonical form.
+
+    and/or operands are flattened, deduplicated and sorted; double
+    negation and single-operand and/or are removed.
+    """
+    if depth > FILTER_MAX_DEPTH:
+        raise InvalidFilter(f"filter nests deeper than {FILTER_MAX_DEPTH}")
+    if not isinstance(expression, Mapping) or len(expression) != 1:
+        raise InvalidFilter("each filter term is an object with one key")
+    ((key, value),) = expression.items()
+    if key in ("and", "or"):
+        if not isinstance(value, list) or not value:
+            raise InvalidFilter(f"{key} takes a non-empty list")
+        operands: Dict[str, Any] = {}
+        for operand in value:
+            operand = _normalize(operand, depth + 1, terms)
+            # Flatten nested and/and, or/or
+            for item in operand[key] if key in operand else (operand,):
+                operands[_dumps(item)] = item
+        if len(operands) == 1:
+            return next(iter(operands.values()))
+        return {key: [operands[canonical] for canonical in sorted(operands)]}
+    if key == "not":
+        operand = _normalize(value, depth + 1, terms)
+        return operand["not"] if "not" in operand else {"not": operand}
+    terms[0] += 1
+    if terms[0] > FILTER_MAX_TERMS:
+        raise InvalidFilter(f"filter has more than {FILTER_MAX_TERMS} terms")
+    _leaf(key, value)
+    return {key: value}
+
+
+def _build(expression: Mapping[str, Any]) -> _Node:
+    ((key, value),) = expression.items()
+    if key == "and":
+        return _And([_build(operand) for operand in value])
+    if key == "or":
+        return _Or([_build(operand) for operand in value])
+    if key == "not":
+        return _Not(_build(value))
+    return _leaf(key, value)
+
+
+def _dumps(expression: Any) -> str:
+    return json.dumps(expression, sort_keys=True, separators=(",", ":"))
+
+
+def compile_filter(expression: Mapping[str, Any]) -> FilterPlan:
+    """Validate and compile an expression; raises InvalidFilter."""
+    canonical = _normalize(expression, 0, [0])
+    return FilterPlan(_dumps(canonical), _build(canonical))
+
+
+def legacy_filter(
+    where: Optional[Mapping[str, Any]] = None,
+    labels: Optional[Sequence[str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Return the expression for a command's "filter" and "labels" params.
+
+    labels (any of them) becomes an "or" of label terms, and-ed with the
+    filter; None when neither is given.
+    """
+    terms: List[Any] = [dict(where)] if where else []
+    if labels:
+        terms.append({"or": [{"label": label} for label in labels]})
+    if not terms:
+        return None
+    return terms[0] if len(terms) == 1 else {"and": terms}
+
+
+class PlanCache:
+    """Compiled plans by the expression's canonical JSON, LRU-evicted.
+
+    A map from the expression as sent to its canonical JSON sits in
+    front, so a repeated dashboard query skips validation and
+    normalization; both are bounded by size.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._plans: "OrderedDict[str, FilterPlan]" = OrderedDict()
+        # Expression as sent (keys sorted) -> its canonical JSON
+        self._canonical: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def get(self, expression: Mapping[str, Any]) -> FilterPlan:
+        """Return the plan for expression, compiling it on a miss.
+
+        Equivalent expressions (operand order, nesting, duplicates) share
+        one plan. Raises InvalidFilter.
+        """
+        try:
+            key = _dumps(expression)
+        except (TypeError, ValueError) as err:
+            raise InvalidFilter("filter is not JSON") from err
+        canonical = self._canonical.get(key)
+        if canonical is None:
+            normalized = _normalize(expression, 0, [0])
+            canonical = _dumps(normalized)
+            self._canonical[key] = canonical
+            if len(self._canonical) > self.size:
+                self._canonical.popitem(last=False)
+        else:
+            self._canonical.move_to_end(key)
+            normalized = None
+        plan = self._plans.get(canonical)
+        if plan is not None:
+            self._plans.move_to_end(canonical)
+            self.hits += 1
+            return plan
+        if normalized is None:
+            normalized = json.loads(canonical)
+        plan = FilterPlan(canonical, _build(normalized))
+        self.misses += 1
+        self._plans[canonical] = plan
+        if len(self._plans) > self.size:
+            self._plans.popitem(last=False)
+        return plan
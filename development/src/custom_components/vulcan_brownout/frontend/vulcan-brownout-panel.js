@@ -13,8 +13,43 @@ import { LitElement, html, css } from "https://unpkg.com/lit@3.1.0?module";
 const QUERY_ENTITIES_COMMAND = "vulcan-brownout/query_entities";
 const QUERY_UNAVAILABLE_COMMAND = "vulcan-brownout/query_unavailable";
 const SUBSCRIBE_COMMAND = "vulcan-brownout/subscribe";
+const STREAM_ENTITIES_COMMAND = "vulcan-brownout/stream_entities";
+const BATCH_COMMAND = "vulcan-brownout/batch";
+
+// Columns the tables render; requested in compact columnar form
+const LOW_BATTERY_FIELDS = [
+  "entity_id",
+  "last_updated",
+  "device_name",
+  "area_name",
+  "manufacturer",
+  "model",
+  "battery_level",
+  "status",
+];
+const UNAVAILABLE_FIELDS = [
+  "entity_id",
+  "state",
+  "last_updated",
+  "device_name",
+  "area_name",
+  "manufacturer",
+  "model",
+];
+const FORMAT_COLUMNAR = "columnar";
 
 const SESSION_STORAGE_KEY = "vulcan_brownout_active_tab";
+const SORT_STORAGE_KEY = "vulcan_brownout_sort";
+
+// Low Battery column headers backed by a server-side sort order
+const SORT_LEVEL = "level";
+const SORT_NAME = "name";
+const SORT_AREA = "area";
+const SORT_ORDERS = [SORT_LEVEL, SORT_NAME, SORT_AREA];
+
+// Filter bar: server-side search, sent once typing pauses
+const SEARCH_DEBOUNCE_MS = 250;
+const SEARCH_MAX_LENGTH = 100;
 
 const TAB_LOW_BATTERY = "low-battery";
 const TAB_UNAVAILABLE = "unavailable";
@@ -36,6 +71,8 @@ class VulcanBrownoutPanel extends LitElement {
     subscription_id: { state: true },
     current_theme: { state: true },
     _activeTab: { state: true },
+    _sort: { state: true },
+    _search: { state: true },
     _unavailableEntities: { state: true },
     _unavailableTotal: { state: true },
     _unavailableLoading: { state: true },
@@ -52,6 +89,8 @@ class VulcanBrownoutPanel extends LitElement {
     this.subscription_id = null;
     this.current_theme = "light";
     this._activeTab = TAB_LOW_BATTERY;
+    this._sort = SORT_LEVEL;
+    this._search = "";
     this._unavailableEntities = null; // null = not yet loaded (lazy-load guard)
     this._unavailableTotal = 0;
     this._unavailableLoading = false;
@@ -60,7 +99,9 @@ class VulcanBrownoutPanel extends LitElement {
 
   reconnect_attempt = 0;
   reconnect_timer = null;
+  _searchTimer = null;
   _themeListener = null;
+  _streamGeneration = 0;
 
   updated(changedProperties) {
     super.updated(changedProperties);
@@ -74,18 +115,23 @@ class VulcanBrownoutPanel extends LitElement {
     super.connectedCallback();
     this._apply_theme(this._detect_theme());
 
-    // Restore tab from session storage before first data fetch
+    // Restore tab and sort from session storage before first data fetch
     const savedTab = sessionStorage.getItem(SESSION_STORAGE_KEY);
     if (savedTab === TAB_LOW_BATTERY || savedTab === TAB_UNAVAILABLE) {
       this._activeTab = savedTab;
     }
+    const savedSort = sessionStorage.getItem(SORT_STORAGE_KEY);
+    if (SORT_ORDERS.includes(savedSort)) {
+      this._sort = savedSort;
+    }
 
-    this._load_devices();
+    this._load_initial();
   }
 
   disconnectedCallback() {
     super.disconnectedCallback();
     this._clear_reconnect_timer();
+    clearTimeout(this._searchTimer);
     if (this._themeListener && this.hass?.connection) {
       this.hass.connection.removeEventListener(
         "hass_themes_updated",
@@ -105,6 +151,7 @@ class VulcanBrownoutPanel extends LitElement {
       --vb-text-secondary: var(--secondary-text-color, #727272);
       --vb-text-disabled: var(--disabled-text-color, #bdbdbd);
       --vb-color-critical: var(--error-color, #db4437);
+      --vb-color-warning: var(--warning-color, #ffa600);
       --vb-color-primary-action: var(--primary-color, #03a9f4);
       --vb-shadow: var(--ha-card-box-shadow, 0 2px 8px rgba(0, 0, 0, 0.1));
     }
@@ -216,6 +263,27 @@ class VulcanBrownoutPanel extends LitElement {
       outline-offset: 2px;
     }
 
+    .filter-bar {
+      display: flex;
+      padding: 8px 0;
+    }
+
+    .filter-input {
+      flex: 1;
+      max-width: 320px;
+      padding: 6px 10px;
+      font-size: 13px;
+      color: var(--vb-text-primary);
+      background-color: var(--vb-bg-card);
+      border: 1px solid var(--vb-border-color);
+      border-radius: 4px;
+    }
+
+    .filter-input:focus-visible {
+      outline: 2px solid var(--vb-color-primary-action);
+      outline-offset: 1px;
+    }
+
     .tab-panel {
       flex: 1;
       display: flex;
@@ -253,6 +321,15 @@ class VulcanBrownoutPanel extends LitElement {
       text-align: right;
     }
 
+    .battery-table thead th.sortable {
+      cursor: pointer;
+      user-select: none;
+    }
+
+    .battery-table thead th[aria-sort="ascending"] {
+      color: var(--vb-text-primary);
+    }
+
     .battery-table tbody td {
       padding: 6px 10px;
       border-bottom: 1px solid var(--vb-bg-divider);
@@ -271,6 +348,16 @@ class VulcanBrownoutPanel extends LitElement {
       white-space: nowrap;
     }
 
+    /* Severity tiers above "critical" (threshold overrides can list them) */
+    .battery-table .level-cell.warning,
+    .battery-table .level-cell.watch {
+      color: var(--vb-color-warning);
+    }
+
+    .battery-table .level-cell.ok {
+      color: var(--vb-text-primary);
+    }
+
     .battery-table .status-cell {
       text-align: right;
       white-space: nowrap;
@@ -391,6 +478,18 @@ class VulcanBrownoutPanel extends LitElement {
           </button>
         </div>
 
+        <div class="filter-bar">
+          <input
+            class="filter-input"
+            type="search"
+            placeholder="Filter by name, area or model"
+            aria-label="Filter devices"
+            maxlength=${SEARCH_MAX_LENGTH}
+            .value=${this._search}
+            @input=${this._onSearchInput}
+          />
+        </div>
+
         ${this._activeTab === TAB_LOW_BATTERY
           ? this._renderLowBatteryPanel()
           : this._renderUnavailablePanel()}
@@ -416,7 +515,11 @@ class VulcanBrownoutPanel extends LitElement {
         ${this.battery_devices.length === 0 && !this.isLoading
           ? html`<div class="empty-state">
               <div class="empty-state-icon">🔋</div>
-              <div class="empty-state-text">All batteries above 15%</div>
+              <div class="empty-state-text">
+                ${this._search
+                  ? "No low batteries match the filter"
+                  : "All batteries above 15%"}
+              </div>
               <button class="button" @click=${this._load_devices}>
                 Refresh
               </button>
@@ -426,10 +529,10 @@ class VulcanBrownoutPanel extends LitElement {
                 <thead>
                   <tr>
                     <th>Last Seen</th>
-                    <th>Entity Name</th>
-                    <th>Area</th>
+                    ${this._sortableHeader(SORT_NAME, "Entity Name")}
+                    ${this._sortableHeader(SORT_AREA, "Area")}
                     <th>Manufacturer &amp; Model</th>
-                    <th>% Remaining</th>
+                    ${this._sortableHeader(SORT_LEVEL, "% Remaining")}
                   </tr>
                 </thead>
                 <tbody>
@@ -453,8 +556,10 @@ class VulcanBrownoutPanel extends LitElement {
                             .filter(Boolean)
                             .join(" ") || "\u2014"}
                         </td>
-                        <td class="level-cell">
-                          ${Math.round(device.battery_level)}%
+                        <td class="level-cell ${device.status || ""}">
+                          ${device.battery_level == null
+                            ? "Low"
+                            : `${Math.round(device.battery_level)}%`}
                         </td>
                       </tr>
                     `
@@ -512,7 +617,9 @@ class VulcanBrownoutPanel extends LitElement {
           <div class="empty-state">
             <div class="empty-state-icon">✅</div>
             <div class="empty-state-text">
-              No unavailable devices. All monitored devices are responding.
+              ${this._search
+                ? "No unavailable devices match the filter"
+                : "No unavailable devices. All monitored devices are responding."}
             </div>
           </div>
         </div>
@@ -571,6 +678,46 @@ class VulcanBrownoutPanel extends LitElement {
     `;
   }
 
+  _sortableHeader(sort, label) {
+    return html`<th
+      class="sortable"
+      aria-sort=${this._sort === sort ? "ascending" : "none"}
+      @click=${() => this._setSort(sort)}
+    >
+      ${label}${this._sort === sort ? " \u25B2" : ""}
+    </th>`;
+  }
+
+  /**
+   * Reload the Low Battery list in another order. The server keeps every
+   * order as a maintained index, so the panel never sorts rows itself.
+   */
+  _setSort(sort) {
+    if (this._sort === sort) return;
+    this._sort = sort;
+    sessionStorage.setItem(SORT_STORAGE_KEY, sort);
+    this._load_devices();
+  }
+
+  /**
+   * Re-query both lists once typing pauses. Matching and ranking happen
+   * server-side against a maintained trigram index.
+   */
+  _onSearchInput(event) {
+    const search = event.target.value.trim();
+    clearTimeout(this._searchTimer);
+    this._searchTimer = setTimeout(() => {
+      if (search === this._search) return;
+      this._search = search;
+      this._load_devices();
+      if (this._unavailableEntities !== null) this._load_unavailable();
+    }, SEARCH_DEBOUNCE_MS);
+  }
+
+  _searchParams() {
+    return this._search ? { search: this._search } : {};
+  }
+
   _switchTab(tab) {
     if (this._activeTab === tab) return;
     this._activeTab = tab;
@@ -599,13 +746,84 @@ class VulcanBrownoutPanel extends LitElement {
     }
   }
 
+  /**
+   * First render in one round trip: the Low Battery list, the live-update
+   * subscription and, if that tab was restored, the Unavailable list are
+   * requested together in a single batch.
+   */
+  async _load_initial() {
+    this.isLoading = true;
+    this.error = null;
+
+    const commands = [
+      {
+        type: QUERY_ENTITIES_COMMAND,
+        fields: LOW_BATTERY_FIELDS,
+        format: FORMAT_COLUMNAR,
+        sort: this._sort,
+        ...this._searchParams(),
+      },
+      { type: SUBSCRIBE_COMMAND },
+    ];
+    if (this._activeTab === TAB_UNAVAILABLE) {
+      this._unavailableLoading = true;
+      commands.push({
+        type: QUERY_UNAVAILABLE_COMMAND,
+        fields: UNAVAILABLE_FIELDS,
+        format: FORMAT_COLUMNAR,
+        ...this._searchParams(),
+      });
+    }
+
+    try {
+      const { results } = await this._call_ws({ type: BATCH_COMMAND, commands });
+      const [entities, subscription, unavailable] = results;
+
+      if (!entities.success) throw new Error(entities.error.message);
+      this.battery_devices = this._decode_entities(entities.result);
+
+      if (subscription.success) {
+        this._on_subscribed(subscription.result);
+      } else {
+        console.error("Subscription failed:", subscription.error);
+        this.connection_status = CONNECTION_OFFLINE;
+        this._schedule_reconnect();
+      }
+
+      if (unavailable?.success) {
+        this._unavailableEntities = this._decode_entities(unavailable.result);
+        this._unavailableTotal = unavailable.result.total || 0;
+      } else if (unavailable) {
+        this._unavailableError = unavailable.error.message;
+      }
+    } catch (err) {
+      console.error("Failed to load battery devices:", err);
+      this.error = err.message || "Failed to load battery devices";
+      this.battery_devices = [];
+      this.connection_status = CONNECTION_OFFLINE;
+    } finally {
+      this.isLoading = false;
+      this._unavailableLoading = false;
+    }
+  }
+
   async _load_devices() {
     this.isLoading = true;
     this.error = null;
 
     try {
-      const result = await this._call_ws({ type: QUERY_ENTITIES_COMMAND });
-      this.battery_devices = result.entities || [];
+      if (this.hass?.connection?.subscribeMessage) {
+        await this._stream_devices();
+      } else {
+        const result = await this._call_ws({
+          type: QUERY_ENTITIES_COMMAND,
+          fields: LOW_BATTERY_FIELDS,
+          format: FORMAT_COLUMNAR,
+          sort: this._sort,
+          ...this._searchParams(),
+        });
+        this.battery_devices = this._decode_entities(result);
+      }
       this.error = null;
 
       await this._subscribe_to_updates();
@@ -619,13 +837,69 @@ class VulcanBrownoutPanel extends LitElement {
     }
   }
 
+  /**
+   * Load the low-battery list as a chunked stream, rendering each chunk as
+   * it arrives. Resolves on the end marker, or rejects if it carries an
+   * error. A newer load supersedes an in-flight one; the stale stream is
+   * unsubscribed and its chunks dropped.
+   */
+  async _stream_devices() {
+    const generation = ++this._streamGeneration;
+    let rows = null;
+    let finish;
+    let fail;
+    const done = new Promise((resolve, reject) => {
+      finish = resolve;
+      fail = reject;
+    });
+
+    const unsubscribe = await this.hass.connection.subscribeMessage(
+      (event) => {
+        if (generation !== this._streamGeneration) {
+          finish();
+          return;
+        }
+        if (event.end) {
+          if (event.error) {
+            fail(new Error(event.error.message));
+            return;
+          }
+          if (rows === null) this.battery_devices = [];
+          finish();
+          return;
+        }
+        // The first chunk replaces the previous list; later ones append
+        rows = rows === null ? event.entities : rows.concat(event.entities);
+        this.battery_devices = rows;
+        this.isLoading = false;
+      },
+      {
+        type: STREAM_ENTITIES_COMMAND,
+        fields: LOW_BATTERY_FIELDS,
+        sort: this._sort,
+        ...this._searchParams(),
+      }
+    );
+
+    try {
+      await done;
+    } finally {
+      unsubscribe().catch(() => {});
+    }
+  }
+
   async _load_unavailable() {
     this._unavailableLoading = true;
     this._unavailableError = null;
 
     try {
-      const result = await this._call_ws({ type: QUERY_UNAVAILABLE_COMMAND });
-      this._unavailableEntities = result.entities || [];
+      const result = await this._call_ws({
+        type: QUERY_UNAVAILABLE_COMMAND,
+        fields: UNAVAILABLE_FIELDS,
+        format: FORMAT_COLUMNAR,
+        ...this._searchParams(),
+      });
+      this._unavailableEntities = this._decode_entities(result);
       this._unavailableTotal = result.total || 0;
     } catch (err) {
       console.error("Failed to load unavailable devices:", err);
@@ -640,10 +914,7 @@ class VulcanBrownoutPanel extends LitElement {
   async _subscribe_to_updates() {
     try {
       const result = await this._call_ws({ type: SUBSCRIBE_COMMAND });
-      this.subscription_id = result.subscription_id;
-      this.connection_status = CONNECTION_CONNECTED;
-      this.reconnect_attempt = 0;
-      this._setup_message_listeners();
+      this._on_subscribed(result);
     } catch (err) {
       console.error("Subscription failed:", err);
       this.connection_status = CONNECTION_OFFLINE;
@@ -651,6 +922,13 @@ class VulcanBrownoutPanel extends LitElement {
     }
   }
 
+  _on_subscribed(result) {
+    this.subscription_id = result.subscription_id;
+    this.connection_status = CONNECTION_CONNECTED;
+    this.reconnect_attempt = 0;
+    this._setup_message_listeners();
+  }
+
   _setup_message_listeners() {
     if (!this.hass?.connection) return;
 
@@ -757,6 +1035,28 @@ class VulcanBrownoutPanel extends LitElement {
     return `${diffDay} day${diffDay > 1 ? "s" : ""} ago`;
   }
 
+  /**
+   * Turn a query result into row objects. Columnar results carry one array
+   * per field; dictionary-encoded fields hold indexes into a lookup table.
+   */
+  _decode_entities(result) {
+    if (result?.format !== FORMAT_COLUMNAR) {
+      return result?.entities || [];
+    }
+    const { fields, columns, dictionaries } = result;
+    const rows = new Array(result.total);
+    for (let i = 0; i < result.total; i++) {
+      const row = {};
+      for (const field of fields) {
+        const lookup = dictionaries[field];
+        const value = columns[field][i];
+        row[field] = lookup ? lookup[value] : value;
+      }
+      rows[i] = row;
+    }
+    return rows;
+  }
+
   async _call_ws(message) {
     if (!this.hass?.callWS) {
       throw new Error("Home Assistant WebSocket not available");
@@ -0,0 +1,62 @@
+"""Label → entity index for Vulcan Brownout queries.
+
+An entity's labels are those of its entity registry entry plus those of
+its device. They are resolved when the entity is first indexed and again
+on registry update events, never per state change, so a "labels" filter
+is answered from the posting sets of the requested labels (see
+filters.py).
+"""
+
+from typing import Collection, Dict, FrozenSet, Set
+
+
+class LabelIndex:
+    """Label postings over a changing set of entity ids."""
+
+    def __init__(self) -> None:
+        self._members: Dict[str, Set[str]] = {}
+        # entity_id -> its labels (possibly none)
+        self._labels: Dict[str, FrozenSet[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self._labels
+
+    def set(self, entity_id: str, labels: Collection[str]) -> bool:
+        """Index entity_id under labels; returns True if they changed."""
+        labels = frozenset(labels)
+        old = self._labels.get(entity_id)
+        if old == labels:
+            return False
+        old = old or frozenset()
+        for label in old - labels:
+            self._remove_member(label, entity_id)
+        for label in labels - old:
+            self._members.setdefault(label, set()).add(entity_id)
+        self._labels[entity_id] = labels
+        return True
+
+    def discard(self, entity_id: str) -> None:
+        """Remove entity_id; a no-op if it isn't indexed."""
+        for label in self._labels.pop(entity_id, ()):
+            self._remove_member(label, entity_id)
+
+    def _remove_member(self, label: str, entity_id: str) -> None:
+        members = self._members[label]
+        members.discard(entity_id)
+        if not members:
+            del self._members[label]
+
+    def labels_of(self, entity_id: str) -> FrozenSet[str]:
+        """Return entity_id's labels; empty if it isn't indexed."""
+        return self._labels.get(entity_id, frozenset())
+
+    def members(self, label_id: str) -> FrozenSet[str]:
+        """Return the entities carrying label_id."""
+        return frozenset(self._members.get(label_id, ()))
+
+    def count(self, label_id: str) -> int:
+        """Return the number of entities carrying label_id, in O(1)."""
+        return len(self._members.get(label_id, ()))
@@ -0,0 +1,127 @@
+"""Columnar battery level store for fleet-wide scans.
+
+Every tracked entity's level and effective threshold live in contiguous
+typed arrays indexed by a dense slot id, so bulk questions ("all below
+T", "which entities move when the threshold policy changes") are single
+passes over a column instead of walks over BatteryEntity objects.
+NumPy is used for those passes when it is importable; otherwise the same
+scans run over the arrays in pure Python.
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with HA core
+    np = None
+
+_NAN = float("nan")
+
+
+class LevelStore:
+    """Dense slot-indexed columns of level, threshold and override flag.
+
+    Levels are doubles so scans agree exactly with the Python floats the
+    other indexes compare. Free slots and entities without a level
+    (binary sensors, unparsable states) hold NaN, which every comparison
+    treats as "not present", so scans need no separate occupancy mask.
+    """
+
+    def __init__(self) -> None:
+        self.levels = array("d")
+        self.thresholds = array("d")
+        # 1 where an entity/model/area override sets the threshold
+        self.pinned = array("b")
+        self.entity_ids: List[Optional[str]] = []
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.entity_ids) - len(self._free)
+
+    def allocate(self, entity_id: str) -> int:
+        """Return a slot for entity_id, reusing a freed one if possible."""
+        if self._free:
+            slot = self._free.pop()
+            self.entity_ids[slot] = entity_id
+            return slot
+        self.levels.append(_NAN)
+        self.thresholds.append(_NAN)
+        self.pinned.append(0)
+        self.entity_ids.append(entity_id)
+        return len(self.entity_ids) - 1
+
+    def release(self, slot: int) -> None:
+        """Free a slot so it drops out of every scan."""
+        self.levels[slot] = _NAN
+        self.thresholds[slot] = _NAN
+        self.pinned[slot] = 0
+        self.entity_ids[slot] = None
+        self._free.append(slot)
+
+    def set(
+        self, slot: int, level: Optional[float], threshold: float, pinned: bool
+    ) -> None:
+        """Write one entity's row; None or negative means "no level"."""
+        self.levels[slot] = level if level is not None and level >= 0 else _NAN
+        self.thresholds[slot] = threshold
+        self.pinned[slot] = pinned
+
+    def below(self, percent: float) -> List[str]:
+        """Return the entity ids whose level is in [0, percent)."""
+        entity_ids = self.entity_ids
+        if np is not None:
+            levels = np.frombuffer(self.levels, dtype=np.float64)
+            slots = np.flatnonzero((levels >= 0) & (levels < percent)).tolist()
+            del levels  # release the buffer export so the array can grow
+        else:
+            slots = [
+                slot for slot, level in enumerate(self.levels)
+                if 0 <= level < percent
+            ]
+        return [entity_ids[slot] for slot in slots]
+
+    def moved(
+        self,
+        default: float,
+        old_bounds: Sequence[float],
+        new_bounds: Sequence[float],
+    ) -> List[str]:
+        """Return the entity ids a new default threshold or tier bounds move.
+
+        An entity moves when it isn't pinned by an override and its
+        threshold differs from the new default, or when its level falls in
+        a different tier under new_bounds than under old_bounds. Only valid
+        while the overrides themselves are unchanged.
+        """
+        entity_ids = self.entity_ids
+        if np is not None:
+            levels = np.frombuffer(self.levels, dtype=np.float64)
+            thresholds = np.frombuffer(self.thresholds, dtype=np.float64)
+            pinned = np.frombuffer(self.pinned, dtype=np.int8)
+            present = levels >= 0
+            moved = (pinned == 0) & (thresholds != default)
+            if tuple(old_bounds) != tuple(new_bounds):
+                moved |= present & (
+                    np.searchsorted(old_bounds, levels, side="right")
+                    != np.searchsorted(new_bounds, levels, side="right")
+                )
+            slots = np.flatnonzero(moved).tolist()
+            del levels, thresholds, pinned, present, moved
+        else:
+            slots = [
+                slot
+                for slot, (level, threshold, pinned) in enumerate(
+                    zip(self.levels, self.thresholds, self.pinned)
+                )
+                if (not pinned and threshold != default)
+                or (
+                    level >= 0
+                    and bisect_right(old_bounds, level)
+                    != bisect_right(new_bounds, level)
+                )
+            ]
+        return [
+            entity_ids[slot] for slot in slots if entity_ids[slot] is not None
+        ]
@@ -0,0 +1,188 @@
+"""Shared device and area metadata records for Vulcan Brownout.
+
+Battery entities reference one DeviceMetadata per device (and one
+AreaMetadata per area) instead of carrying their own copies of the
+name/manufacturer/model/area strings. Records are refreshed in place from
+registry update events, so every entity sees the change at once.
+"""
+
+import logging
+import sys
+from typing import Any, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern a metadata string so repeated values share one object."""
+    return sys.intern(value) if value is not None else None
+
+
+class AreaMetadata:
+    """Shared record for one HA area."""
+
+    __slots__ = ("area_id", "name", "floor_id")
+
+    def __init__(
+        self, area_id: str, name: Optional[str], floor_id: Optional[str]
+    ) -> None:
+        self.area_id = area_id
+        self.name = _intern(name)
+        self.floor_id = floor_id
+
+
+class DeviceMetadata:
+    """Shared record for one HA device."""
+
+    __slots__ = ("device_id", "name", "manufacturer", "model", "area")
+
+    def __init__(
+        self,
+        device_id: str,
+        name: Optional[str],
+        manufacturer: Optional[str],
+        model: Optional[str],
+        area: Optional[AreaMetadata],
+    ) -> None:
+        self.device_id = device_id
+        self.name = _intern(name)
+        self.manufacturer = _intern(manufacturer)
+        self.model = _intern(model)
+        self.area = area
+
+
+class MetadataTable:
+    """Flyweight table of device and area records keyed by registry id."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.devices: Dict[str, DeviceMetadata] = {}
+        self.areas: Dict[str, AreaMetadata] = {}
+
+    def get_area(self, area_id: Optional[str]) -> Optional[AreaMetadata]:
+        """Return the shared record for area_id, resolving it on first use."""
+        if not area_id:
+            return None
+        record = self.areas.get(area_id)
+        if record is not None:
+            return record
+        area = ar.async_get(self.hass).async_get_area(area_id)
+        if area is None:
+            _LOGGER.debug("get_area: area_id=%s area=not_found", area_id)
+            return None
+        record = AreaMetadata(area_id, area.name, getattr(area, "floor_id", None))
+        self.areas[area_id] = record
+        return record
+
+    def get_device(self, device_id: Optional[str]) -> Optional[DeviceMetadata]:
+        """Return the shared record for device_id, resolving it on first use."""
+        if not device_id:
+            return None
+        record = self.devices.get(device_id)
+        if record is not None:
+            return record
+        device = dr.async_get(self.hass).async_get(device_id)
+        if device is None:
+            _LOGGER.debug("get_device: device_id=%s device=not_found", device_id)
+            return None
+        record = DeviceMetadata(
+            device_id,
+            device.name,
+            device.manufacturer,
+            device.model,
+            self.get_area(device.area_id),
+        )
+        self.devices[device_id] = record
+        _LOGGER.debug(
+            "get_device: device_id=%s device_name=%s manufacturer=%s model=%s area=%s",
+            device_id, record.name, record.manufacturer, record.model,
+            record.area.name if record.area else None,
+        )
+        return record
+
+    def refresh_device(self, device_id: str) -> bool:
+        """Re-read a tracked device from the registry, updating it in place.
+
+        Returns True if a field rows use (name, manufacturer, model, area)
+        changed or the device was removed; a removed device's record is
+        dropped from the table and callers must detach it.
+        """
+        record = self.devices.get(device_id)
+        if record is None:
+            return False
+        device = dr.async_get(self.hass).async_get(device_id)
+        if device is None:
+            self.devices.pop(device_id, None)
+            return True
+        new = (
+            device.name, device.manufacturer, device.model,
+            self.get_area(device.area_id),
+        )
+        if new == (record.name, record.manufacturer, record.model, record.area):
+            return False
+        record.name = _intern(device.name)
+        record.manufacturer = _intern(device.manufacturer)
+        record.model = _intern(device.model)
+        record.area = new[3]
+        return True
+
+    def refresh_area(self, area_id: str) -> bool:
+        """Re-read a tracked area from the registry, updating it in place.
+
+        Returns True if its name or floor changed or the area was removed;
+        a removed area is detached from device records here, but callers
+        must detach it from entity overrides.
+        """
+        record = self.areas.get(area_id)
+        if record is None:
+            return False
+        area = ar.async_get(self.hass).async_get_area(area_id)
+        if area is None:
+            self.areas.pop(area_id, None)
+            record.name = None
+            record.floor_id = None
+            for device in self.devices.values():
+                if device.area is record:
+                    device.area = None
+            return True
+        floor_id = getattr(area, "floor_id", None)
+        if (area.name, floor_id) == (record.name, record.floor_id):
+            return False
+        record.name = _intern(area.name)
+        record.floor_id = floor_id
+        return True
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        """Return the tables in the compact snapshot layout."""
+        return {
+            "areas": {
+                area_id: [area.name, area.floor_id]
+                for area_id, area in self.areas.items()
+            },
+            "devices": {
+                device_id: [
+                    device.name,
+                    device.manufacturer,
+                    device.model,
+                    device.area.area_id if device.area else None,
+                ]
+                for device_id, device in self.devices.items()
+            },
+        }
+
+    def load_snapshot(self, data: Dict[str, Any]) -> None:
+        """Populate the tables from a to_snapshot payload."""
+        for area_id, (name, floor_id) in data.get("areas", {}).items():
+            self.areas[area_id] = AreaMetadata(area_id, name, floor_id)
+        devices: Dict[str, List[Any]] = data.get("devices", {})
+        for device_id, (name, manufacturer, model, area_id) in devices.items():
+            self.devices[device_id] = DeviceMetadata(
+                device_id, name, manufacturer, model,
+                self.areas.get(area_id) if area_id else None,
+            )
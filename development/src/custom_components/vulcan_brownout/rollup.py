@@ -0,0 +1,144 @@
+"""Floor → area → device rollup of the battery fleet.
+
+Every tracked or unavailable entity sits under one root-to-leaf path:
+its floor, its area and its device (the entity itself when it has no
+device). Each node keeps the counts and lowest level of the entities
+below it, and the number of distinct devices with an unavailable entity, so a change only walks that one path, O(depth), and an
+overview reads node counters instead of aggregating the entity list.
+Entities without an area (or areas without a floor) sit under a None
+node at that depth.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from .aggregates import MinTracker
+
+# (floor_id, area_id, device_id or entity_id)
+RollupPath = Tuple[Optional[str], Optional[str], str]
+
+
+class RollupNode:
+    """Aggregates over the entities below one node of the tree."""
+
+    __slots__ = ("node_id", "children", "tracked", "low", "_unavailable", "_levels")
+
+    def __init__(self, node_id: Optional[str]) -> None:
+        self.node_id = node_id
+        self.children: Dict[Optional[str], "RollupNode"] = {}
+        self.tracked = 0
+        self.low = 0
+        # device (or entity) id -> its unavailable entities below this node
+        self._unavailable: Dict[str, int] = {}
+        self._levels = MinTracker()
+
+    def __bool__(self) -> bool:
+        return bool(self.tracked or self._unavailable)
+
+    @property
+    def unavailable(self) -> int:
+        """Return the number of devices below with an unavailable entity."""
+        return len(self._unavailable)
+
+    def min_level(self) -> Optional[float]:
+        """Return the lowest valid level below this node, or None."""
+        lowest = self._levels.min()
+        return lowest[0] if lowest else None
+
+
+class RollupTree:
+    """Rollup tree kept current one entity change at a time.
+
+    revision is bumped whenever any node's aggregates may have changed,
+    so streams can skip publishing an unchanged tree.
+    """
+
+    def __init__(self) -> None:
+        self.root = RollupNode(None)
+        self.revision = 0
+        # entity_id -> (path, level, is_low, is_unavailable) it contributes
+        self._entries: Dict[str, Tuple[RollupPath, float, bool, bool]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self._entries
+
+    def set(
+        self,
+        entity_id: str,
+        path: RollupPath,
+        level: float,
+        is_low: bool,
+        is_unavailable: bool = False,
+    ) -> None:
+        """Place entity_id at path with its current contribution.
+
+        A negative level counts the entity without a minimum. Re-setting
+        the same contribution is a no-op.
+        """
+        entry = (path, level, is_low, is_unavailable)
+        old = self._entries.get(entity_id)
+        if old == entry:
+            return
+        if old is not None:
+            self._apply(entity_id, old, -1)
+        self._apply(entity_id, entry, 1)
+        self._entries[entity_id] = entry
+        self.revision += 1
+
+    def discard(self, entity_id: str) -> None:
+        """Remove entity_id's contribution; a no-op if it isn't present."""
+        old = self._entries.pop(entity_id, None)
+        if old is not None:
+            self._apply(entity_id, old, -1)
+            self.revision += 1
+
+    def path_of(self, entity_id: str) -> Optional[RollupPath]:
+        """Return entity_id's (floor, area, device) path, if present."""
+        entry = self._entries.get(entity_id)
+        return entry[0] if entry is not None else None
+
+    def touch(self) -> None:
+        """Mark the tree changed without an entity change (e.g. a rename)."""
+        self.revision += 1
+
+    def _apply(
+        self,
+        entity_id: str,
+        entry: Tuple[RollupPath, float, bool, bool],
+        sign: int,
+    ) -> None:
+        """Add (sign=1) or remove (sign=-1) a contribution along its path."""
+        path, level, is_low, is_unavailable = entry
+        nodes: List[RollupNode] = [self.root]
+        for key in path:
+            parent = nodes[-1]
+            node = parent.children.get(key)
+            if node is None:
+                node = parent.children[key] = RollupNode(key)
+            nodes.append(node)
+        for node in nodes:
+            node.tracked += sign * (not is_unavailable)
+            node.low += sign * is_low
+            if is_unavailable:
+                _count(node._unavailable, path[-1], sign)
+            if sign > 0 and level >= 0:
+                node._levels.set(entity_id, level)
+            else:
+                node._levels.discard(entity_id)
+        if sign < 0:
+            # Prune nodes left empty, deepest first
+            for parent, node in zip(reversed(nodes[:-1]), reversed(nodes[1:])):
+                if node:
+                    break
+                del parent.children[node.node_id]
+
+
+def _count(counts: Dict[str, int], key: str, sign: int) -> None:
+    """Add sign to counts[key], dropping the key when it reaches zero."""
+    count = counts.get(key, 0) + sign
+    if count:
+        counts[key] = count
+    else:
+        del counts[key]
@@ -0,0 +1,126 @@
+"""Trigram search index for Vulcan Brownout queries.
+
+Each entity's searchable text (device name, entity id, area and model) is
+split into words, and every word padded with two leading spaces and one
+trailing space is indexed by its trigrams: "hall" yields "  h", " ha",
+"hal", "all" and "ll ". A query word is padded on the left only, so it
+matches any word it is a prefix of ("hall motion" finds "Hallway Motion
+Sensor").
+
+A search intersects the posting sets of the query trigrams, rarest first,
+so its cost follows the number of candidates rather than the number of
+indexed entities. Updates only touch the trigrams that changed.
+"""
+
+import re
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+# Words are runs of letters and digits; "_" and "." separate them too
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _trigrams(text: str, prefix: bool = False) -> FrozenSet[str]:
+    """Return the trigrams of every word in text.
+
+    With prefix, words aren't padded on the right, so they match as
+    prefixes of indexed words.
+    """
+    grams: Set[str] = set()
+    tail = "" if prefix else " "
+    for word in _WORD.findall(text.casefold()):
+        padded = f"  {word}{tail}"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def query_trigrams(query: str) -> FrozenSet[str]:
+    """Return the trigrams a search for query requires."""
+    return _trigrams(query, prefix=True)
+
+
+class TrigramIndex:
+    """Trigram postings over a changing set of ids."""
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Set[str]] = {}
+        # item_id -> (indexed text, its trigrams)
+        self._docs: Dict[str, Tuple[str, FrozenSet[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._docs
+
+    def set(self, item_id: str, text: str) -> None:
+        """Index item_id under text, replacing its previous text."""
+        old = self._docs.get(item_id)
+        if old is not None and old[0] == text:
+            return
+        grams = _trigrams(text)
+        old_grams = old[1] if old is not None else frozenset()
+        postings = self._postings
+        for gram in old_grams - grams:
+            self._remove_posting(gram, item_id)
+        for gram in grams - old_grams:
+            postings.setdefault(gram, set()).add(item_id)
+        self._docs[item_id] = (text, grams)
+
+    def discard(self, item_id: str) -> None:
+        """Remove item_id; a no-op if it isn't indexed."""
+        old = self._docs.pop(item_id, None)
+        if old is not None:
+            for gram in old[1]:
+                self._remove_posting(gram, item_id)
+
+    def _remove_posting(self, gram: str, item_id: str) -> None:
+        posting = self._postings[gram]
+        posting.discard(item_id)
+        if not posting:
+            del self._postings[gram]
+
+    def estimate(self, grams: FrozenSet[str]) -> int:
+        """Return an upper bound on the ids having all of grams."""
+        return min(
+            (len(self._postings.get(gram, ())) for gram in grams), default=0
+        )
+
+    def has_trigrams(self, item_id: str, grams: FrozenSet[str]) -> bool:
+        """Return True if item_id is indexed with every one of grams."""
+        doc = self._docs.get(item_id)
+        return doc is not None and grams <= doc[1]
+
+    def matching(self, grams: FrozenSet[str]) -> Set[str]:
+        """Return the ids having every one of grams, rarest posting first."""
+        postings = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            matches &= posting
+            if not matches:
+                break
+        return matches
+
+    def search(self, query: str) -> Optional[List[Tuple[float, str]]]:
+        """Return ranked (negated score, id) keys of the ids matching query.
+
+        An id matches when it has every trigram of the query, which in
+        practice means every query word starts one of its words. The
+        score is the share of the id's trigrams the query covers, so
+        tighter matches rank first; ties go by id. The keys sort in rank
+        order. Returns None for a query without any words.
+        """
+        grams = query_trigrams(query)
+        if not grams:
+            return None
+        matches = self.matching(grams)
+        count = len(grams)
+        return sorted(
+            (-round(count / len(self._docs[item_id][1]), 6), item_id)
+            for item_id in matches
+        )
@@ -0,0 +1,75 @@
+"""Result encodings for Vulcan Brownout query responses.
+
+Rows are plain tuples ordered like the requested field list. The default
+"rows" format turns them into one dict per entity; the opt-in "columnar"
+format returns one array per field instead, with repeated strings
+(manufacturer, model, area, ...) dictionary-encoded into small lookup
+tables, so a large snapshot doesn't repeat every key and value per row.
+
+Streamed snapshots are cut from already-encoded rows into chunks of
+bounded byte size (see iter_chunks).
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+# Fields whose values repeat heavily across rows and are dictionary-encoded
+DICTIONARY_FIELDS = frozenset(
+    {"state", "status", "manufacturer", "model", "area_name"}
+)
+
+
+def encode_rows(
+    rows: Sequence[Sequence[Any]], fields: Sequence[str]
+) -> List[Dict[str, Any]]:
+    """Return one dict per row, keyed by fields."""
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def encode_columnar(
+    rows: Sequence[Sequence[Any]], fields: Sequence[str]
+) -> Dict[str, Any]:
+    """Return rows as parallel per-field arrays.
+
+    Layout::
+
+        {"format": "columnar", "fields": [...],
+         "columns": {field: [value | code, ...]},
+         "dictionaries": {field: [distinct values]}}
+
+    For a dictionary-encoded field the column holds integer codes into
+    dictionaries[field]; null is encoded like any other value.
+    """
+    columns: Dict[str, List[Any]] = {}
+    dictionaries: Dict[str, List[Any]] = {}
+    for index, field in enumerate(fields):
+        column = [row[index] for row in rows]
+        if field in DICTIONARY_FIELDS:
+            lookup: Dict[Any, int] = {}
+            column = [lookup.setdefault(value, len(lookup)) for value in column]
+            dictionaries[field] = list(lookup)
+        columns[field] = column
+    return {
+        "format": "columnar",
+        "fields": list(fields),
+        "columns": columns,
+        "dictionaries": dictionaries,
+    }
+
+
+def iter_chunks(encoded_rows: Iterable[bytes], max_bytes: int) -> Iterator[List[bytes]]:
+    """Group encoded rows into chunks of at most max_bytes.
+
+    A single row larger than max_bytes still goes out, alone in its chunk.
+    Rows are pulled lazily, so encoding work is spread across chunks.
+    """
+    chunk: List[bytes] = []
+    size = 0
+    for row in encoded_rows:
+        if chunk and size + len(row) > max_bytes:
+            yield chunk
+            chunk = []
+            size = 0
+        chunk.append(row)
+        size += len(row) + 1  # separating comma
+    if chunk:
+        yield chunk
@@ -0,0 +1,113 @@
+"""Incrementally maintained sort orders for Vulcan Brownout queries.
+
+A SortedIndex keeps one ordering of a set of entities as a sorted list of
+key tuples whose last element is the entity id, so keys are unique and map
+straight back to entities. Reading a page is a bisect plus a slice
+(O(log n + page)); an update is a bisect plus a list insert/delete, which
+moves pointers with a single memmove.
+
+Pages are addressed with opaque cursors holding the sort key of the last
+row served (ADR-009), so rows inserted or removed between page requests
+don't shift later pages.
+"""
+
+import base64
+import binascii
+import json
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+Key = Tuple[Any, ...]
+
+
+class InvalidCursor(ValueError):
+    """A cursor that is malformed or was issued for another sort order."""
+
+
+class SortedIndex:
+    """One sort order over a changing set of ids."""
+
+    def __init__(self) -> None:
+        self._keys: List[Key] = []
+        self._by_id: Dict[str, Key] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._by_id
+
+    def set(self, item_id: str, key: Key) -> None:
+        """Insert item_id, or move it if its key changed; key ends with item_id."""
+        old = self._by_id.get(item_id)
+        if old == key:
+            return
+        if old is not None:
+            del self._keys[bisect_left(self._keys, old)]
+        insort(self._keys, key)
+        self._by_id[item_id] = key
+
+    def discard(self, item_id: str) -> None:
+        """Remove item_id; a no-op if it isn't indexed."""
+        old = self._by_id.pop(item_id, None)
+        if old is not None:
+            del self._keys[bisect_left(self._keys, old)]
+
+    def page(
+        self, after: Optional[Key] = None, limit: Optional[int] = None
+    ) -> Tuple[List[str], Optional[Key]]:
+        """Return (ids, last key) for up to limit rows after key "after".
+
+        The last key is None when the page reaches the end of the index.
+        Raises InvalidCursor if "after" doesn't compare with the index keys.
+        """
+        return page_keys(self._keys, after, limit)
+
+    def ids(self) -> Collection[str]:
+        """Return a live view of the indexed ids, in no particular order."""
+        return self._by_id.keys()
+
+    def keys_for(self, item_ids: Collection[str]) -> List[Key]:
+        """Return the sorted keys of the indexed ids among item_ids.
+
+        Sorts the candidates' keys when they are fewer than the index,
+        otherwise filters the index in order.
+        """
+        by_id = self._by_id
+        if len(item_ids) < len(by_id):
+            return sorted(by_id[i] for i in item_ids if i in by_id)
+        return [key for key in self._keys if key[-1] in item_ids]
+
+
+def page_keys(
+    keys: List[Key], after: Optional[Key] = None, limit: Optional[int] = None
+) -> Tuple[List[str], Optional[Key]]:
+    """Page through an already sorted list of keys; see SortedIndex.page."""
+    try:
+        start = bisect_right(keys, after) if after is not None else 0
+    except TypeError as err:
+        raise InvalidCursor("cursor does not match this sort order") from err
+    end = len(keys) if limit is None else min(start + limit, len(keys))
+    rows = keys[start:end]
+    last = rows[-1] if rows and end < len(keys) else None
+    return [key[-1] for key in rows], last
+
+
+def encode_cursor(sort: str, key: Key) -> str:
+    """Return an opaque cursor for the row with the given sort key."""
+    raw = json.dumps([sort, list(key)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str, sort: str) -> Key:
+    """Return the sort key inside a cursor made for sort.
+
+    Raises InvalidCursor for malformed cursors or ones from another order.
+    """
+    try:
+        cursor_sort, key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as err:
+        raise InvalidCursor("malformed cursor") from err
+    if cursor_sort != sort or not isinstance(key, list):
+        raise InvalidCursor("cursor does not match this sort order")
+    return tuple(key)
@@ -1,10 +1,11 @@
 """WebSocket subscription manager for real-time battery updates."""
 
 import logging
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 
+from homeassistant.components import websocket_api
 from homeassistant.core import HomeAssistant
 
 from .const import MAX_SUBSCRIPTIONS, VERSION
@@ -18,10 +19,27 @@ class ClientSubscription:
 
     subscription_id: str
     connection: Any
+    # Entities to follow; empty means every battery entity, including
+    # ones tracked after the subscription was made
     entity_ids: Set[str] = field(default_factory=set)
+    # Columns to push in entity_changed events; None means all of them
+    fields: Optional[Tuple[str, ...]] = None
+    # Severity tier to follow; None means every change
+    tier: Optional[str] = None
+    # Compiled filter (filters.FilterPlan) to match; None means any entity
+    where: Optional[Any] = None
+    # Messages queued until release(); None sends them immediately
+    held: Optional[List[Dict[str, Any]]] = None
     created_at: datetime = field(default_factory=datetime.now)
 
 
+def _event_fields(fields: Optional[Sequence[str]]) -> Optional[Tuple[str, ...]]:
+    """Normalize a requested projection; entity_id is always included."""
+    if not fields:
+        return None
+    return ("entity_id",) + tuple(f for f in dict.fromkeys(fields) if f != "entity_id")
+
+
 class WebSocketSubscriptionManager:
     """Manages WebSocket subscriptions for real-time battery updates."""
 
@@ -29,6 +47,12 @@ class WebSocketSubscriptionManager:
         self.hass = hass
         self.subscribers: Dict[str, ClientSubscription] = {}
         self.entity_subscribers: Dict[str, Set[str]] = {}
+        # Subscriptions without entity_ids, which follow every entity
+        self.all_entity_subscribers: Set[str] = set()
+        # Aggregate streams (summary, ...): topic -> {(connection, msg_id)}
+        self.topic_subscribers: Dict[str, Set[Tuple[Any, int]]] = {}
+        # Dedupe key of the last payload published per topic
+        self._topic_last_key: Dict[str, Any] = {}
         _LOGGER.debug(
             "WebSocketSubscriptionManager.__init__: max_subscriptions=%d",
             MAX_SUBSCRIPTIONS,
@@ -39,12 +63,24 @@ class WebSocketSubscriptionManager:
         subscription_id: str,
         connection: Any,
         entity_ids: Optional[List[str]] = None,
+        fields: Optional[Sequence[str]] = None,
+        tier: Optional[str] = None,
+        where: Optional[Any] = None,
+        hold: bool = False,
     ) -> bool:
+        """Add a subscription; returns False at the subscription limit.
+
+        Without entity_ids the subscription follows every battery entity,
+        present or future; its tier and where are evaluated against each
+        changed entity. With hold, its messages are queued until release(subscription_id),
+        so a caller can send its own reply first.
+        """
         current_count = len(self.subscribers)
         _LOGGER.debug(
-            "subscribe: subscription_id=%s entity_count=%d "
+            "subscribe: subscription_id=%s entity_count=%d tier=%s where=%s "
             "current_subscribers=%d max_subscriptions=%d",
-            subscription_id, len(entity_ids) if entity_ids else 0,
+            subscription_id, len(entity_ids) if entity_ids else 0, tier,
+            where.canonical if where is not None else None,
             current_count, MAX_SUBSCRIPTIONS,
         )
 
@@ -61,6 +97,10 @@ class WebSocketSubscriptionManager:
             subscription_id=subscription_id,
             connection=connection,
             entity_ids=entity_set,
+            fields=_event_fields(fields),
+            tier=tier,
+            where=where,
+            held=[] if hold else None,
         )
         self.subscribers[subscription_id] = subscription
 
@@ -69,6 +109,8 @@ class WebSocketSubscriptionManager:
                 if entity_id not in self.entity_subscribers:
                     self.entity_subscribers[entity_id] = set()
                 self.entity_subscribers[entity_id].add(subscription_id)
+        else:
+            self.all_entity_subscribers.add(subscription_id)
 
         _LOGGER.info(
             "subscribe: subscription_id=%s result=accepted "
@@ -77,6 +119,26 @@ class WebSocketSubscriptionManager:
         )
         return True
 
+    def release(self, subscription_id: str) -> None:
+        """Send a held subscription's queued messages; later ones go out directly."""
+        subscription = self.subscribers.get(subscription_id)
+        if subscription is None or subscription.held is None:
+            return
+        held, subscription.held = subscription.held, None
+        _LOGGER.debug(
+            "release: subscription_id=%s held_messages=%d",
+            subscription_id, len(held),
+        )
+        for message in held:
+            subscription.connection.send_message(message)
+
+    @staticmethod
+    def _send(subscription: ClientSubscription, message: Dict[str, Any]) -> None:
+        if subscription.held is not None:
+            subscription.held.append(message)
+        else:
+            subscription.connection.send_message(message)
+
     def unsubscribe(self, subscription_id: str) -> None:
         _LOGGER.debug(
             "unsubscribe: subscription_id=%s", subscription_id
@@ -89,6 +151,7 @@ class WebSocketSubscriptionManager:
             )
             return
 
+        self.all_entity_subscribers.discard(subscription_id)
         removed_entity_mappings = 0
         for entity_id in subscription.entity_ids:
             if entity_id in self.entity_subscribers:
@@ -106,17 +169,30 @@ class WebSocketSubscriptionManager:
     def broadcast_entity_changed(
         self,
         entity_id: str,
-        battery_level: float,
+        battery_level: Optional[float],
         status: str,
         last_changed: Optional[str] = None,
         last_updated: Optional[str] = None,
         attributes: Optional[Dict[str, Any]] = None,
+        device_name: Optional[str] = None,
+        area_name: Optional[str] = None,
+        previous_status: Optional[str] = None,
+        matches: Optional[Callable[[Any], bool]] = None,
+        previous_matches: Optional[Set[str]] = None,
     ) -> None:
-        """Broadcast entity change to interested subscribers."""
-        subscription_ids = self.entity_subscribers.get(entity_id, set())
+        """Broadcast entity change to interested subscribers.
+
+        Subscribers that asked for a fields projection receive only those
+        keys of the event data. Tier-scoped subscribers only receive the
+        change if status or previous_status is their tier. Filtered
+        subscribers receive it if matches(their plan) is True, or with
+        "left": true if their plan's canonical form is in
+        previous_matches (see matching_plans), so they can drop the row.
+        """
+        subscription_ids = self._subscription_ids(entity_id)
         sub_count = len(subscription_ids)
         _LOGGER.debug(
-            "broadcast_entity_changed: entity_id=%s battery_level=%.1f%% "
+            "broadcast_entity_changed: entity_id=%s battery_level=%s "
             "status=%s subscriber_count=%d",
             entity_id, battery_level, status, sub_count,
         )
@@ -128,25 +204,48 @@ class WebSocketSubscriptionManager:
             )
             return
 
-        message = {
-            "type": "vulcan-brownout/entity_changed",
-            "data": {
-                "entity_id": entity_id,
-                "battery_level": battery_level,
-                "status": status,
-                "last_changed": last_changed,
-                "last_updated": last_updated,
-                "attributes": attributes or {},
-            },
+        data = {
+            "entity_id": entity_id,
+            "battery_level": battery_level,
+            "status": status,
+            "last_changed": last_changed,
+            "last_updated": last_updated,
+            "attributes": attributes or {},
+            "device_name": device_name,
+            "area_name": area_name,
         }
+        # One message per distinct (projection, left), shared by subscribers
+        messages: Dict[Tuple[Optional[Tuple[str, ...]], bool], Dict[str, Any]] = {}
 
         sent = 0
         dead = []
         for sid in subscription_ids:
             sub = self.subscribers.get(sid)
+            if sub and sub.tier is not None and sub.tier not in (
+                status, previous_status
+            ):
+                continue
+            left = False
+            if (
+                sub and sub.where is not None
+                and matches is not None and not matches(sub.where)
+            ):
+                if not previous_matches or sub.where.canonical not in previous_matches:
+                    continue
+                left = True
             if sub:
+                message = messages.get((sub.fields, left))
+                if message is None:
+                    payload = (
+                        data if sub.fields is None
+                        else {key: data[key] for key in sub.fields if key in data}
+                    )
+                    message = messages[(sub.fields, left)] = {
+                        "type": "vulcan-brownout/entity_changed",
+                        "data": {**payload, "left": True} if left else payload,
+                    }
                 try:
-                    sub.connection.send_message(message)
+                    self._send(sub, message)
                     sent += 1
                 except Exception as e:
                     _LOGGER.warning(
@@ -164,6 +263,81 @@ class WebSocketSubscriptionManager:
             entity_id, sent, len(dead),
         )
 
+    def broadcast_entity_left(
+        self,
+        entity_id: str,
+        previous_status: Optional[str],
+        previous_matches: Set[str],
+    ) -> None:
+        """Tell subscribers that an entity they could see is no longer tracked.
+
+        Called after a tracked entity went unavailable or was removed. Each
+        subscriber whose tier was previous_status (or that has none) and
+        whose plan's canonical form is in previous_matches (or that has
+        none) receives entity_changed data {"entity_id", "left": true}.
+        """
+        message = {
+            "type": "vulcan-brownout/entity_changed",
+            "data": {"entity_id": entity_id, "left": True},
+        }
+        sent = 0
+        dead = []
+        for sid in self._subscription_ids(entity_id):
+            sub = self.subscribers.get(sid)
+            if sub is None:
+                continue
+            if sub.tier is not None and sub.tier != previous_status:
+                continue
+            if sub.where is not None and sub.where.canonical not in previous_matches:
+                continue
+            try:
+                self._send(sub, message)
+                sent += 1
+            except Exception as e:
+                _LOGGER.warning(
+                    "broadcast_entity_left: entity_id=%s subscription_id=%s "
+                    "send=failed error=%s marking_dead=true",
+                    entity_id, sid, e,
+                )
+                dead.append(sid)
+
+        for sid in dead:
+            self.unsubscribe(sid)
+
+        _LOGGER.debug(
+            "broadcast_entity_left: entity_id=%s previous_status=%s sent=%d "
+            "dead_cleaned=%d",
+            entity_id, previous_status, sent, len(dead),
+        )
+
+    def _subscription_ids(self, entity_id: str) -> Set[str]:
+        """Return the subscriptions following entity_id."""
+        subscription_ids = self.entity_subscribers.get(entity_id)
+        if not subscription_ids:
+            return self.all_entity_subscribers
+        return subscription_ids | self.all_entity_subscribers
+
+    def matching_plans(
+        self, entity_id: str, matches: Callable[[Any], bool]
+    ) -> Set[str]:
+        """Return the canonical forms of entity_id's subscriber plans it matches.
+
+        Called before a change is applied, so broadcast_entity_changed can
+        tell filtered subscribers that the entity left their filter.
+        """
+        matched: Set[str] = set()
+        checked: Set[str] = set()
+        for sid in self._subscription_ids(entity_id):
+            sub = self.subscribers.get(sid)
+            if sub is None or sub.where is None:
+                continue
+            canonical = sub.where.canonical
+            if canonical not in checked:
+                checked.add(canonical)
+                if matches(sub.where):
+                    matched.add(canonical)
+        return matched
+
     def broadcast_status(self, status: str) -> None:
         """Broadcast status update to all subscribers."""
         sub_count = len(self.subscribers)
@@ -184,7 +358,7 @@ class WebSocketSubscriptionManager:
         dead = []
         for sid, sub in self.subscribers.items():
             try:
-                sub.connection.send_message(message)
+                self._send(sub, message)
                 sent += 1
             except Exception as e:
                 _LOGGER.warning(
@@ -201,6 +375,79 @@ class WebSocketSubscriptionManager:
             status, sent, len(dead),
         )
 
+    def subscribe_topic(self, topic: str, connection: Any, msg_id: int) -> bool:
+        """Add a topic subscriber; events go out as msg_id's subscription events.
+
+        Returns False if the topic already has MAX_SUBSCRIPTIONS subscribers.
+        """
+        subscribers = self.topic_subscribers.setdefault(topic, set())
+        if len(subscribers) >= MAX_SUBSCRIPTIONS:
+            _LOGGER.warning(
+                "subscribe_topic: topic=%s msg_id=%s result=rejected "
+                "reason=limit_exceeded max=%d",
+                topic, msg_id, MAX_SUBSCRIPTIONS,
+            )
+            return False
+        subscribers.add((connection, msg_id))
+        _LOGGER.debug(
+            "subscribe_topic: topic=%s msg_id=%s topic_subscribers=%d",
+            topic, msg_id, len(subscribers),
+        )
+        return True
+
+    def unsubscribe_topic(self, topic: str, connection: Any, msg_id: int) -> None:
+        """Remove a topic subscriber; a no-op if it is already gone."""
+        subscribers = self.topic_subscribers.get(topic)
+        if subscribers is None:
+            return
+        subscribers.discard((connection, msg_id))
+        if not subscribers:
+            del self.topic_subscribers[topic]
+            self._topic_last_key.pop(topic, None)
+        _LOGGER.debug(
+            "unsubscribe_topic: topic=%s msg_id=%s remaining=%d",
+            topic, msg_id, len(subscribers),
+        )
+
+    def has_topic_subscribers(self, topic: str) -> bool:
+        return bool(self.topic_subscribers.get(topic))
+
+    def publish(self, topic: str, payload: Dict[str, Any], key: Any = None) -> None:
+        """Send payload to every subscriber of topic.
+
+        If key is given and equals the key of the previous publish on this
+        topic, nothing is sent.
+        """
+        subscribers = self.topic_subscribers.get(topic)
+        if not subscribers:
+            return
+        if key is not None:
+            if self._topic_last_key.get(topic) == key:
+                return
+            self._topic_last_key[topic] = key
+
+        sent = 0
+        dead = []
+        for connection, msg_id in subscribers:
+            try:
+                connection.send_message(
+                    websocket_api.event_message(msg_id, payload)
+                )
+                sent += 1
+            except Exception as e:
+                _LOGGER.warning(
+                    "publish: topic=%s msg_id=%s send=failed error=%s marking_dead=true",
+                    topic, msg_id, e,
+                )
+                dead.append((connection, msg_id))
+
+        for connection, msg_id in dead:
+            self.unsubscribe_topic(topic, connection, msg_id)
+
+        _LOGGER.debug(
+            "publish: topic=%s sent=%d dead_cleaned=%d", topic, sent, len(dead)
+        )
+
     def get_subscription_count(self) -> int:
         count = len(self.subscribers)
         _LOGGER.debug("get_subscription_count: count=%d", count)
@@ -215,6 +462,9 @@ class WebSocketSubscriptionManager:
         )
         self.subscribers.clear()
         self.entity_subscribers.clear()
+        self.all_entity_subscribers.clear()
+        self.topic_subscribers.clear()
+        self._topic_last_key.clear()
         _LOGGER.info(
             "cleanup: complete subscribers_cleared=%d entity_mappings_cleared=%d",
             sub_count, entity_sub_count,
@@ -0,0 +1,142 @@
+"""Low-battery threshold and severity tier configuration for Vulcan Brownout.
+
+Thresholds live in the config entry options (ADR-007): a global default
+plus overrides per entity id, per device model and per area id. The most
+specific override wins: entity, then model, then area, then the default.
+
+Severity tiers classify every tracked level by fixed cut points (for
+example <5 critical, <15 warning, <30 watch, otherwise ok), independent
+of the low-list threshold.
+"""
+
+from bisect import bisect_right
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import voluptuous as vol
+
+from .const import (
+    BATTERY_THRESHOLD,
+    CONF_AREA_THRESHOLDS,
+    CONF_ENTITY_THRESHOLDS,
+    CONF_GLOBAL_THRESHOLD,
+    CONF_MODEL_THRESHOLDS,
+    CONF_SEVERITY_TIERS,
+    DEFAULT_SEVERITY_TIERS,
+    STATUS_TIERS,
+)
+
+THRESHOLD_VALUE = vol.All(vol.Coerce(float), vol.Range(min=0, max=100))
+OVERRIDES_SCHEMA = vol.Schema({str: THRESHOLD_VALUE})
+
+
+def _ascending_tiers(tiers: Dict[str, float]) -> Dict[str, float]:
+    bounds = [tiers[tier] for tier in STATUS_TIERS[:-1]]
+    if bounds != sorted(bounds):
+        raise vol.Invalid("severity tier bounds must be ascending")
+    return tiers
+
+
+# Upper bound of every tier but the last ("ok")
+TIERS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(tier, default=DEFAULT_SEVERITY_TIERS[tier]): (
+                THRESHOLD_VALUE
+            )
+            for tier in STATUS_TIERS[:-1]
+        }
+    ),
+    _ascending_tiers,
+)
+
+# Validates the threshold keys of the config entry options
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_GLOBAL_THRESHOLD, default=BATTERY_THRESHOLD): (
+            THRESHOLD_VALUE
+        ),
+        vol.Optional(CONF_ENTITY_THRESHOLDS, default=dict): OVERRIDES_SCHEMA,
+        vol.Optional(CONF_MODEL_THRESHOLDS, default=dict): OVERRIDES_SCHEMA,
+        vol.Optional(CONF_AREA_THRESHOLDS, default=dict): OVERRIDES_SCHEMA,
+        vol.Optional(CONF_SEVERITY_TIERS, default=dict): TIERS_SCHEMA,
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+class ThresholdPolicy:
+    """Resolves an entity's effective low threshold and severity tier."""
+
+    __slots__ = ("default", "entities", "models", "areas", "tier_bounds")
+
+    def __init__(
+        self,
+        default: float = BATTERY_THRESHOLD,
+        entities: Optional[Mapping[str, float]] = None,
+        models: Optional[Mapping[str, float]] = None,
+        areas: Optional[Mapping[str, float]] = None,
+        tiers: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        self.default = float(default)
+        self.entities: Dict[str, float] = dict(entities or {})
+        self.models: Dict[str, float] = dict(models or {})
+        self.areas: Dict[str, float] = dict(areas or {})
+        tiers = {**DEFAULT_SEVERITY_TIERS, **(tiers or {})}
+        # Ascending upper bounds, aligned with STATUS_TIERS[:-1]
+        self.tier_bounds: Tuple[float, ...] = tuple(
+            float(tiers[tier]) for tier in STATUS_TIERS[:-1]
+        )
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> "ThresholdPolicy":
+        """Build a policy from config entry options.
+
+        Raises vol.Invalid if the threshold options are malformed.
+        """
+        options = OPTIONS_SCHEMA(dict(options))
+        return cls(
+            options[CONF_GLOBAL_THRESHOLD],
+            options[CONF_ENTITY_THRESHOLDS],
+            options[CONF_MODEL_THRESHOLDS],
+            options[CONF_AREA_THRESHOLDS],
+            options[CONF_SEVERITY_TIERS],
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ThresholdPolicy):
+            return NotImplemented
+        return (
+            self.default == other.default
+            and self.same_overrides(other)
+            and self.tier_bounds == other.tier_bounds
+        )
+
+    def same_overrides(self, other: "ThresholdPolicy") -> bool:
+        """Return True if both policies have the same override tables."""
+        return (
+            self.entities == other.entities
+            and self.models == other.models
+            and self.areas == other.areas
+        )
+
+    def override(
+        self, entity_id: str, model: Optional[str], area_id: Optional[str]
+    ) -> Optional[float]:
+        """Return the most specific override, or None if the default applies."""
+        value = self.entities.get(entity_id)
+        if value is None and model is not None:
+            value = self.models.get(model)
+        if value is None and area_id is not None:
+            value = self.areas.get(area_id)
+        return value
+
+    def threshold(
+        self, entity_id: str, model: Optional[str], area_id: Optional[str]
+    ) -> float:
+        """Return the effective threshold; three dict lookups at most."""
+        value = self.override(entity_id, model, area_id)
+        return self.default if value is None else value
+
+    def tier(self, level: float) -> str:
+        """Return the severity tier of a battery level."""
+        return STATUS_TIERS[bisect_right(self.tier_bounds, level)]
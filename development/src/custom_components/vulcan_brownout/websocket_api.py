@@ -1,38 +1,224 @@
 """WebSocket API handlers for Vulcan Brownout integration."""
 
+import asyncio
 import logging
+import time
 import uuid
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.components import websocket_api
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.json import json_bytes, json_fragment
 import voluptuous as vol
 
-from .const import COMMAND_QUERY_ENTITIES, COMMAND_QUERY_UNAVAILABLE, COMMAND_SUBSCRIBE, DOMAIN
+from .const import (
+    BATCH_MAX_COMMANDS,
+    COMMAND_BATCH,
+    COMMAND_BATTERY_TYPES,
+    COMMAND_HISTOGRAM,
+    COMMAND_QUERY_CHANGES,
+    COMMAND_QUERY_ENTITIES,
+    COMMAND_QUERY_UNAVAILABLE,
+    COMMAND_ROLLUP,
+    COMMAND_STREAM_ENTITIES,
+    COMMAND_SUBSCRIBE,
+    COMMAND_SUBSCRIBE_BATTERY_TYPES,
+    COMMAND_SUBSCRIBE_ROLLUP,
+    COMMAND_SUBSCRIBE_SUMMARY,
+    COMMAND_SUMMARY,
+    DOMAIN,
+    ENTITY_FIELDS,
+    HISTOGRAM_FACETS,
+    EXECUTOR_ENCODE_MIN_ROWS,
+    FORMAT_ROWS,
+    GROUP_BY_OPTIONS,
+    RESULT_FORMATS,
+    ROLLUP_DEFAULT_DEPTH,
+    ROLLUP_DEPTHS,
+    SEARCH_MAX_LENGTH,
+    SORT_LEVEL,
+    SORT_ORDERS,
+    STATUS_TIERS,
+    STREAM_CHUNK_BYTES,
+    STREAM_CHUNK_BYTES_MAX,
+    STREAM_CHUNK_BYTES_MIN,
+    TOPIC_BATTERY_TYPES,
+    TOPIC_ROLLUP,
+    TOPIC_SUMMARY,
+    UNAVAILABLE_FIELDS,
+)
 from .battery_monitor import BatteryMonitor
+from .filters import FilterPlan, InvalidFilter, legacy_filter
+from .serialization import iter_chunks
+from .sorted_index import InvalidCursor
 from .subscription_manager import WebSocketSubscriptionManager
 
 _LOGGER = logging.getLogger(__name__)
 
+# Optional column projection shared by the query and subscribe commands
+FIELDS_SCHEMA = vol.All(cv.ensure_list, [vol.In(ENTITY_FIELDS)])
+
+# Parameters of the query and subscribe commands, shared with batch
+QUERY_PARAMS: Dict[Any, Any] = {
+    vol.Optional("fields"): FIELDS_SCHEMA,
+    vol.Optional("format", default=FORMAT_ROWS): vol.In(RESULT_FORMATS),
+}
+# Sort order of the low-battery list (query_entities, stream_entities)
+SORT_PARAMS: Dict[Any, Any] = {
+    vol.Optional("sort", default=SORT_LEVEL): vol.In(SORT_ORDERS),
+}
+# Severity tier targeted by a query or subscription
+TIER_PARAMS: Dict[Any, Any] = {
+    vol.Optional("tier"): vol.In(STATUS_TIERS),
+}
+# Cursor pagination (ADR-009) for the query commands
+PAGE_PARAMS: Dict[Any, Any] = {
+    vol.Optional("limit"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    vol.Optional("cursor"): str,
+}
+# Free-text search over name, entity id, area and model (search_index.py)
+SEARCH_PARAMS: Dict[Any, Any] = {
+    vol.Optional("search"): vol.All(str, vol.Length(max=SEARCH_MAX_LENGTH)),
+}
+# Filter expression (filters.py), and the legacy "labels" shorthand: entity
+# or device registry labels, any of which must match
+FILTER_PARAMS: Dict[Any, Any] = {
+    vol.Optional("filter"): dict,
+    vol.Optional("labels"): vol.All(cv.ensure_list, [str]),
+}
+# Grouped low list (query_entities only)
+GROUP_PARAMS: Dict[Any, Any] = {
+    vol.Optional("group_by"): vol.In(GROUP_BY_OPTIONS),
+}
+SUBSCRIBE_PARAMS: Dict[Any, Any] = {
+    vol.Optional("fields"): FIELDS_SCHEMA,
+    **TIER_PARAMS,
+    **FILTER_PARAMS,
+}
+HISTOGRAM_PARAMS: Dict[Any, Any] = {
+    vol.Optional("facet"): vol.In(HISTOGRAM_FACETS),
+}
+ROLLUP_PARAMS: Dict[Any, Any] = {
+    vol.Optional("depth", default=ROLLUP_DEFAULT_DEPTH): vol.In(ROLLUP_DEPTHS),
+}
+CHANGES_PARAMS: Dict[Any, Any] = {
+    vol.Required("since"): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    vol.Optional("epoch"): str,
+    vol.Optional("fields"): FIELDS_SCHEMA,
+}
+
+
+def rollup_topic(depth: int) -> str:
+    """Return the subscription topic of the rollup stream at depth."""
+    return f"{TOPIC_ROLLUP}/{depth}"
+
+
+def _encode_result(msg_id: int, result: Dict[str, Any]) -> Tuple[bytes, float]:
+    """Encode a result message; returns (payload, encode seconds).
+
+    Safe to run in the executor: result is built on the loop beforehand and
+    not touched again until it is sent.
+    """
+    start = time.perf_counter()
+    payload = json_bytes(websocket_api.result_message(msg_id, result))
+    return payload, time.perf_counter() - start
+
+
+def _row_count(result: Dict[str, Any]) -> int:
+    """Return the number of rows a result actually carries.
+
+    Counts the rows in the payload (not "total", which covers the whole
+    list); aggregate results such as summary or histogram carry none.
+    """
+    if "entities" in result:
+        return len(result["entities"])
+    if "columns" in result:
+        return len(next(iter(result["columns"].values()), ()))
+    if "groups" in result:
+        return sum(1 + len(group["entities"]) for group in result["groups"])
+    return len(result.get("entered", ())) + len(result.get("changed", ()))
+
+
+async def _async_send_query_result(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg_id: int,
+    result: Dict[str, Any],
+    row_count: int,
+) -> None:
+    """Send a query result, encoding large ones off the event loop.
+
+    row_count is the number of rows in the payload (see _row_count). The
+    event-loop lag is sampled before encoding and logged with the encode
+    time (loop_lag_ms, encode_ms), so the two paths can be compared on a
+    live install by moving EXECUTOR_ENCODE_MIN_ROWS.
+    """
+    offloaded = row_count >= EXECUTOR_ENCODE_MIN_ROWS
+    lag = await _async_loop_lag(hass.loop)
+    if offloaded:
+        payload, seconds = await hass.async_add_executor_job(
+            _encode_result, msg_id, result
+        )
+    else:
+        payload, seconds = _encode_result(msg_id, result)
+    connection.send_message(payload)
+    _LOGGER.debug(
+        "send_query_result: msg_id=%s offloaded=%s rows=%d loop_lag_ms=%.2f "
+        "encode_ms=%.2f bytes=%d",
+        msg_id, offloaded, row_count, lag * 1000, seconds * 1000, len(payload),
+    )
+
+
+async def _async_loop_lag(loop: asyncio.AbstractEventLoop) -> float:
+    """Return how late, in seconds, the loop runs a callback queued now."""
+    queued = loop.time()
+    future: asyncio.Future = loop.create_future()
+    loop.call_soon(lambda: future.set_result(loop.time() - queued))
+    return await future
+
 
 def register_websocket_commands(hass: HomeAssistant) -> None:
     """Register WebSocket command handlers."""
+    handlers = (
+        handle_query_entities,
+        handle_query_unavailable,
+        handle_subscribe,
+        handle_stream_entities,
+        handle_batch,
+        handle_query_changes,
+        handle_summary,
+        handle_subscribe_summary,
+        handle_histogram,
+        handle_rollup,
+        handle_subscribe_rollup,
+        handle_battery_types,
+        handle_subscribe_battery_types,
+    )
     _LOGGER.debug(
-        "register_websocket_commands: registering commands=%s",
-        [COMMAND_QUERY_ENTITIES, COMMAND_QUERY_UNAVAILABLE, COMMAND_SUBSCRIBE],
+        "register_websocket_commands: registering command_count=%d",
+        len(handlers),
     )
-    websocket_api.async_register_command(hass, handle_query_entities)
-    websocket_api.async_register_command(hass, handle_query_unavailable)
-    websocket_api.async_register_command(hass, handle_subscribe)
+    for handler in handlers:
+        websocket_api.async_register_command(hass, handler)
     _LOGGER.info(
-        "register_websocket_commands: registered command_count=3 "
-        "commands=[%s, %s, %s]",
-        COMMAND_QUERY_ENTITIES, COMMAND_QUERY_UNAVAILABLE, COMMAND_SUBSCRIBE,
+        "register_websocket_commands: registered command_count=%d commands=%s",
+        len(handlers),
+        [handler._ws_command for handler in handlers],
     )
 
 
 @websocket_api.websocket_command(
-    {vol.Required("type"): COMMAND_QUERY_ENTITIES}
+    {
+        vol.Required("type"): COMMAND_QUERY_ENTITIES,
+        **QUERY_PARAMS,
+        **SORT_PARAMS,
+        **TIER_PARAMS,
+        **PAGE_PARAMS,
+        **SEARCH_PARAMS,
+        **FILTER_PARAMS,
+        **GROUP_PARAMS,
+    }
 )
 @websocket_api.async_response
 async def handle_query_entities(
@@ -40,7 +226,7 @@ async def handle_query_entities(
     connection: websocket_api.ActiveConnection,
     msg: Dict[str, Any],
 ) -> None:
-    """Handle vulcan-brownout/query_entities — no parameters."""
+    """Handle vulcan-brownout/query_entities — see BatteryMonitor.query_entities."""
     msg_id = msg["id"]
     _LOGGER.debug(
         "handle_query_entities: msg_id=%s command=%s",
@@ -60,16 +246,33 @@ async def handle_query_entities(
             )
             return
 
-        result = await battery_monitor.query_entities()
+        try:
+            _check_tier_sort(msg)
+            _check_group_by(msg)
+            result = await battery_monitor.query_entities(
+                msg.get("fields"), msg["format"], msg["sort"],
+                msg.get("limit"), msg.get("cursor"), msg.get("tier"),
+                msg.get("search"), msg.get("group_by"),
+                _filter_plan(battery_monitor, msg),
+            )
+        except _CommandError as err:
+            connection.send_error(msg_id, err.code, err.message)
+            return
+        except InvalidCursor as err:
+            connection.send_error(msg_id, "invalid_cursor", str(err))
+            return
         entity_count = result.get("total", 0)
+        row_count = _row_count(result)
         _LOGGER.debug(
-            "handle_query_entities: msg_id=%s result_total=%d sending_response=true",
-            msg_id, entity_count,
+            "handle_query_entities: msg_id=%s result_total=%d rows=%d sending_response=true",
+            msg_id, entity_count, row_count,
+        )
+        await _async_send_query_result(
+            hass, connection, msg_id, result, row_count
         )
-        connection.send_result(msg_id, result)
         _LOGGER.info(
             "handle_query_entities: msg_id=%s entities_returned=%d",
-            msg_id, entity_count,
+            msg_id, row_count,
         )
 
     except Exception as e:
@@ -83,7 +286,154 @@ async def handle_query_entities(
 
 
 @websocket_api.websocket_command(
-    {vol.Required("type"): COMMAND_QUERY_UNAVAILABLE}
+    {
+        vol.Required("type"): COMMAND_STREAM_ENTITIES,
+        vol.Optional("fields"): FIELDS_SCHEMA,
+        **SORT_PARAMS,
+        **TIER_PARAMS,
+        **SEARCH_PARAMS,
+        **FILTER_PARAMS,
+        vol.Optional("chunk_bytes", default=STREAM_CHUNK_BYTES): vol.All(
+            vol.Coerce(int),
+            vol.Range(min=STREAM_CHUNK_BYTES_MIN, max=STREAM_CHUNK_BYTES_MAX),
+        ),
+    }
+)
+@websocket_api.async_response
+async def handle_stream_entities(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Handle vulcan-brownout/stream_entities — the low-battery snapshot in chunks.
+
+    Replies with {total, version, epoch}, then sends the rows as events under the
+    same message id, each {"chunk": n, "entities": [...]} no larger than
+    chunk_bytes of encoded rows, yielding to the event loop between
+    chunks. A final {"end": true, "total", "chunks"} event marks
+    completion and closes the subscription; a failure after the reply
+    ends it with {"end": true, "error": {code, message}} instead.
+    Unsubscribing stops the stream early.
+    """
+    msg_id = msg["id"]
+    _LOGGER.debug(
+        "handle_stream_entities: msg_id=%s command=%s chunk_bytes=%d",
+        msg_id, COMMAND_STREAM_ENTITIES, msg["chunk_bytes"],
+    )
+    streaming = False
+    try:
+        battery_monitor: BatteryMonitor = hass.data.get(DOMAIN)
+        if battery_monitor is None:
+            _LOGGER.warning(
+                "handle_stream_entities: msg_id=%s error=integration_not_loaded",
+                msg_id,
+            )
+            connection.send_error(
+                msg_id,
+                "integration_not_loaded",
+                "Vulcan Brownout integration not loaded",
+            )
+            return
+
+        try:
+            _check_tier_sort(msg)
+            where = _filter_plan(battery_monitor, msg)
+        except _CommandError as err:
+            connection.send_error(msg_id, err.code, err.message)
+            return
+        low_battery, _, _ = battery_monitor.low_battery_entities(
+            msg["sort"], tier=msg.get("tier"), search=msg.get("search"),
+            where=where,
+        )
+        total = len(low_battery)
+        cancelled = False
+
+        @callback
+        def on_unsubscribe() -> None:
+            nonlocal cancelled
+            cancelled = True
+
+        connection.subscriptions[msg_id] = on_unsubscribe
+        connection.send_result(
+            msg_id,
+            {
+                "total": total,
+                "version": battery_monitor.version,
+                "epoch": battery_monitor.epoch,
+            },
+        )
+        streaming = True
+
+        chunk_count = 0
+        for chunk in iter_chunks(
+            battery_monitor.encoded_rows(low_battery, msg.get("fields")),
+            msg["chunk_bytes"],
+        ):
+            if cancelled:
+                _LOGGER.debug(
+                    "handle_stream_entities: msg_id=%s cancelled=true "
+                    "chunks_sent=%d",
+                    msg_id, chunk_count,
+                )
+                return
+            connection.send_message(
+                websocket_api.event_message(
+                    msg_id,
+                    {
+                        "chunk": chunk_count,
+                        "entities": [json_fragment(row) for row in chunk],
+                    },
+                )
+            )
+            chunk_count += 1
+            await asyncio.sleep(0)
+
+        if cancelled:
+            return
+        connection.subscriptions.pop(msg_id, None)
+        connection.send_message(
+            websocket_api.event_message(
+                msg_id, {"end": True, "total": total, "chunks": chunk_count}
+            )
+        )
+        _LOGGER.info(
+            "handle_stream_entities: msg_id=%s entities_streamed=%d chunks=%d",
+            msg_id, total, chunk_count,
+        )
+
+    except Exception as e:
+        _LOGGER.error(
+            "handle_stream_entities: msg_id=%s error=%s",
+            msg_id, e, exc_info=True,
+        )
+        if not streaming:
+            connection.send_error(
+                msg_id, "internal_error", "Failed to stream entities"
+            )
+        elif connection.subscriptions.pop(msg_id, None) is not None:
+            # The result already went out; end the stream instead
+            connection.send_message(
+                websocket_api.event_message(
+                    msg_id,
+                    {
+                        "end": True,
+                        "error": {
+                            "code": "internal_error",
+                            "message": "Failed to stream entities",
+                        },
+                    },
+                )
+            )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): COMMAND_QUERY_UNAVAILABLE,
+        **QUERY_PARAMS,
+        **PAGE_PARAMS,
+        **SEARCH_PARAMS,
+        **FILTER_PARAMS,
+    }
 )
 @websocket_api.async_response
 async def handle_query_unavailable(
@@ -91,7 +441,7 @@ async def handle_query_unavailable(
     connection: websocket_api.ActiveConnection,
     msg: Dict[str, Any],
 ) -> None:
-    """Handle vulcan-brownout/query_unavailable — no parameters."""
+    """Handle vulcan-brownout/query_unavailable — fields, format, paging, search."""
     msg_id = msg["id"]
     _LOGGER.debug(
         "handle_query_unavailable: msg_id=%s command=%s",
@@ -111,16 +461,31 @@ async def handle_query_unavailable(
             )
             return
 
-        result = await battery_monitor.get_unavailable_entities()
+        try:
+            _check_unavailable_fields(msg)
+            result = await battery_monitor.get_unavailable_entities(
+                msg.get("fields"), msg["format"],
+                msg.get("limit"), msg.get("cursor"), msg.get("search"),
+                _filter_plan(battery_monitor, msg),
+            )
+        except _CommandError as err:
+            connection.send_error(msg_id, err.code, err.message)
+            return
+        except InvalidCursor as err:
+            connection.send_error(msg_id, "invalid_cursor", str(err))
+            return
         entity_count = result.get("total", 0)
+        row_count = _row_count(result)
         _LOGGER.debug(
-            "handle_query_unavailable: msg_id=%s result_total=%d sending_response=true",
-            msg_id, entity_count,
+            "handle_query_unavailable: msg_id=%s result_total=%d rows=%d sending_response=true",
+            msg_id, entity_count, row_count,
+        )
+        await _async_send_query_result(
+            hass, connection, msg_id, result, row_count
         )
-        connection.send_result(msg_id, result)
         _LOGGER.info(
             "handle_query_unavailable: msg_id=%s entities_returned=%d",
-            msg_id, entity_count,
+            msg_id, row_count,
         )
 
     except Exception as e:
@@ -134,102 +499,690 @@ async def handle_query_unavailable(
 
 
 @websocket_api.websocket_command(
-    {vol.Required("type"): COMMAND_SUBSCRIBE}
+    {
+        vol.Required("type"): COMMAND_QUERY_CHANGES,
+        **CHANGES_PARAMS,
+    }
 )
 @websocket_api.async_response
-async def handle_subscribe(
+async def handle_query_changes(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: Dict[str, Any],
 ) -> None:
-    """Handle vulcan-brownout/subscribe."""
+    """Handle vulcan-brownout/query_changes — low-list delta after since."""
     msg_id = msg["id"]
     _LOGGER.debug(
-        "handle_subscribe: msg_id=%s command=%s",
-        msg_id, COMMAND_SUBSCRIBE,
+        "handle_query_changes: msg_id=%s command=%s since=%d",
+        msg_id, COMMAND_QUERY_CHANGES, msg["since"],
     )
     try:
-        subscription_manager: WebSocketSubscriptionManager = hass.data.get(
-            f"{DOMAIN}_subscriptions"
-        )
-        if subscription_manager is None:
-            _LOGGER.warning(
-                "handle_subscribe: msg_id=%s error=subscription_manager_not_loaded",
-                msg_id,
-            )
-            connection.send_error(
-                msg_id,
-                "integration_not_loaded",
-                "Subscription manager not initialized",
-            )
-            return
-
         battery_monitor: BatteryMonitor = hass.data.get(DOMAIN)
         if battery_monitor is None:
             _LOGGER.warning(
-                "handle_subscribe: msg_id=%s error=battery_monitor_not_loaded",
+                "handle_query_changes: msg_id=%s error=integration_not_loaded",
                 msg_id,
             )
             connection.send_error(
                 msg_id,
                 "integration_not_loaded",
-                "Battery monitor not loaded",
+                "Vulcan Brownout integration not loaded",
             )
             return
 
-        subscription_id = f"sub_{uuid.uuid4().hex[:12]}"
-        entity_ids = list(battery_monitor.entities.keys())
+        result = await battery_monitor.query_changes(
+            msg["since"], msg.get("fields"), msg.get("epoch")
+        )
+        await _async_send_query_result(
+            hass, connection, msg_id, result, _row_count(result)
+        )
+
+    except Exception as e:
+        _LOGGER.error(
+            "handle_query_changes: msg_id=%s error=%s",
+            msg_id, e, exc_info=True,
+        )
+        connection.send_error(
+            msg_id, "internal_error", "Failed to query changes"
+        )
+
+
+class _CommandError(Exception):
+    """A command failure that maps to a WebSocket error code and message."""
+
+    def __init__(self, code: str, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _filter_plan(
+    battery_monitor: BatteryMonitor, msg: Dict[str, Any]
+) -> Optional[FilterPlan]:
+    """Return the compiled plan of a command's "filter" and "labels".
+
+    Plans come from the monitor's cache; raises _CommandError for an
+    invalid expression.
+    """
+    expression = legacy_filter(msg.get("filter"), msg.get("labels"))
+    if expression is None:
+        return None
+    try:
+        return battery_monitor.filter_plans.get(expression)
+    except InvalidFilter as err:
+        raise _CommandError("invalid_format", f"Invalid filter: {err}") from err
+
+
+def _check_tier_sort(msg: Dict[str, Any]) -> None:
+    """Reject a sort order that a tier-scoped list can't be served in."""
+    if msg.get("tier") is not None and msg["sort"] != SORT_LEVEL:
+        raise _CommandError(
+            "invalid_format", f"Tier lists are ordered by {SORT_LEVEL}"
+        )
+
+
+def _check_unavailable_fields(msg: Dict[str, Any]) -> None:
+    """Reject a projection that keeps none of an unavailable row's keys."""
+    fields = msg.get("fields")
+    if fields and UNAVAILABLE_FIELDS.isdisjoint(fields):
+        raise _CommandError(
+            "invalid_format",
+            "Unavailable rows have none of the requested fields",
+        )
+
+
+def _check_group_by(msg: Dict[str, Any]) -> None:
+    """Reject parameters a grouped low list can't be served with."""
+    if msg.get("group_by") is None:
+        return
+    if (
+        msg["sort"] != SORT_LEVEL
+        or msg["format"] != FORMAT_ROWS
+        or msg.get("tier") is not None
+        or msg.get("search")
+        or msg.get("labels")
+        or msg.get("filter")
+    ):
+        raise _CommandError(
+            "invalid_format",
+            "group_by takes no tier, search or filter, sort level and format rows",
+        )
+
+
+def _add_subscription(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg_id: int,
+    caller: str,
+    fields: Optional[List[str]],
+    tier: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+    hold: bool = False,
+) -> Dict[str, Any]:
+    """Register an entity_changed subscription owned by msg_id.
+
+    With tier, only changes of entities entering, leaving or staying in
+    that severity tier are pushed; with a "filter" or "labels" in params,
+    only changes of entities matching it. With hold, its events are queued
+    until the subscription manager's release(subscription_id).
+
+    caller names the handler in log lines. Returns the subscribe result;
+    raises _CommandError if it can't be added.
+    """
+    subscription_manager: WebSocketSubscriptionManager = hass.data.get(
+        f"{DOMAIN}_subscriptions"
+    )
+    if subscription_manager is None:
+        _LOGGER.warning(
+            "%s: msg_id=%s error=subscription_manager_not_loaded",
+            caller, msg_id,
+        )
+        raise _CommandError(
+            "integration_not_loaded", "Subscription manager not initialized"
+        )
+
+    battery_monitor: BatteryMonitor = hass.data.get(DOMAIN)
+    if battery_monitor is None:
+        _LOGGER.warning(
+            "%s: msg_id=%s error=battery_monitor_not_loaded",
+            caller, msg_id,
+        )
+        raise _CommandError("integration_not_loaded", "Battery monitor not loaded")
+
+    where = _filter_plan(battery_monitor, params or {})
+    subscription_id = f"sub_{uuid.uuid4().hex[:12]}"
+    _LOGGER.debug(
+        "%s: msg_id=%s subscription_id=%s tracked=%d",
+        caller, msg_id, subscription_id, len(battery_monitor.entities),
+    )
+
+    # No entity_ids: the subscription follows every battery entity,
+    # including ones tracked later, and its tier/filter is tested per change
+    if not subscription_manager.subscribe(
+        subscription_id, connection, None, fields, tier, where, hold
+    ):
+        current_count = subscription_manager.get_subscription_count()
+        _LOGGER.warning(
+            "%s: msg_id=%s error=subscription_limit_exceeded "
+            "current_count=%d",
+            caller, msg_id, current_count,
+        )
+        raise _CommandError(
+            "subscription_limit_exceeded", "Maximum subscriptions reached"
+        )
+
+    _LOGGER.info(
+        "%s: msg_id=%s subscription_id=%s total_subscribers=%d",
+        caller, msg_id, subscription_id,
+        subscription_manager.get_subscription_count(),
+    )
+
+    @callback
+    def on_disconnect() -> None:
         _LOGGER.debug(
-            "handle_subscribe: msg_id=%s subscription_id=%s entity_count=%d",
-            msg_id, subscription_id, len(entity_ids),
+            "%s.on_disconnect: subscription_id=%s cleaning_up=true",
+            caller, subscription_id,
+        )
+        subscription_manager.unsubscribe(subscription_id)
+        _LOGGER.info(
+            "%s.on_disconnect: subscription_id=%s unsubscribed=true "
+            "remaining_subscribers=%d",
+            caller, subscription_id,
+            subscription_manager.get_subscription_count(),
         )
 
-        if not subscription_manager.subscribe(
-            subscription_id, connection, entity_ids
-        ):
-            current_count = subscription_manager.get_subscription_count()
+    connection.subscriptions[msg_id] = on_disconnect
+    return {"subscription_id": subscription_id, "status": "subscribed"}
+
+
+def _add_topic_subscription(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg_id: int,
+    topic: str,
+) -> None:
+    """Subscribe msg_id to an aggregate topic; raises _CommandError on failure."""
+    subscription_manager: WebSocketSubscriptionManager = hass.data.get(
+        f"{DOMAIN}_subscriptions"
+    )
+    if subscription_manager is None:
+        raise _CommandError(
+            "integration_not_loaded", "Subscription manager not initialized"
+        )
+    if not subscription_manager.subscribe_topic(topic, connection, msg_id):
+        raise _CommandError(
+            "subscription_limit_exceeded", "Maximum subscriptions reached"
+        )
+
+    @callback
+    def on_unsubscribe() -> None:
+        subscription_manager.unsubscribe_topic(topic, connection, msg_id)
+
+    connection.subscriptions[msg_id] = on_unsubscribe
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): COMMAND_SUBSCRIBE,
+        **SUBSCRIBE_PARAMS,
+    }
+)
+@websocket_api.async_response
+async def handle_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Handle vulcan-brownout/subscribe."""
+    msg_id = msg["id"]
+    _LOGGER.debug(
+        "handle_subscribe: msg_id=%s command=%s",
+        msg_id, COMMAND_SUBSCRIBE,
+    )
+    try:
+        result = _add_subscription(
+            hass, connection, msg_id, "handle_subscribe", msg.get("fields"),
+            msg.get("tier"), msg,
+        )
+        connection.send_result(msg_id, result)
+
+    except _CommandError as err:
+        connection.send_error(msg_id, err.code, err.message)
+
+    except Exception as e:
+        _LOGGER.error(
+            "handle_subscribe: msg_id=%s error=%s",
+            msg_id, e, exc_info=True,
+        )
+        connection.send_error(
+            msg_id, "internal_error", "Failed to subscribe"
+        )
+
+
+# Sub-command parameter schemas accepted by vulcan-brownout/batch
+BATCH_COMMAND_SCHEMAS: Dict[str, vol.Schema] = {
+    COMMAND_QUERY_ENTITIES: vol.Schema({
+        vol.Required("type"): COMMAND_QUERY_ENTITIES,
+        **QUERY_PARAMS,
+        **SORT_PARAMS,
+        **TIER_PARAMS,
+        **PAGE_PARAMS,
+        **SEARCH_PARAMS,
+        **FILTER_PARAMS,
+        **GROUP_PARAMS,
+    }),
+    COMMAND_QUERY_UNAVAILABLE: vol.Schema({
+        vol.Required("type"): COMMAND_QUERY_UNAVAILABLE,
+        **QUERY_PARAMS,
+        **PAGE_PARAMS,
+        **SEARCH_PARAMS,
+        **FILTER_PARAMS,
+    }),
+    COMMAND_SUBSCRIBE: vol.Schema(
+        {vol.Required("type"): COMMAND_SUBSCRIBE, **SUBSCRIBE_PARAMS}
+    ),
+    COMMAND_QUERY_CHANGES: vol.Schema(
+        {vol.Required("type"): COMMAND_QUERY_CHANGES, **CHANGES_PARAMS}
+    ),
+    COMMAND_SUMMARY: vol.Schema({vol.Required("type"): COMMAND_SUMMARY}),
+    COMMAND_HISTOGRAM: vol.Schema(
+        {vol.Required("type"): COMMAND_HISTOGRAM, **HISTOGRAM_PARAMS}
+    ),
+    COMMAND_ROLLUP: vol.Schema(
+        {vol.Required("type"): COMMAND_ROLLUP, **ROLLUP_PARAMS}
+    ),
+    COMMAND_BATTERY_TYPES: vol.Schema({vol.Required("type"): COMMAND_BATTERY_TYPES}),
+}
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): COMMAND_BATCH,
+        vol.Required("commands"): vol.All(
+            [dict], vol.Length(min=1, max=BATCH_MAX_COMMANDS)
+        ),
+    }
+)
+@websocket_api.async_response
+async def handle_batch(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Handle vulcan-brownout/batch — several sub-commands, one reply.
+
+    Sub-commands run back to back without yielding to the event loop, so
+    every result reflects the same index version, returned alongside them
+    as {"version", "epoch", "results": [{"type", "success", "result" |
+    "error"}]}.
+    A failing sub-command only fails its own entry. At most one subscribe
+    is allowed; its subscription belongs to the batch message id, and its
+    events are held until the reply has been sent, so none arrive before
+    the snapshot they follow.
+    """
+    msg_id = msg["id"]
+    commands = msg["commands"]
+    _LOGGER.debug(
+        "handle_batch: msg_id=%s command=%s sub_commands=%s",
+        msg_id, COMMAND_BATCH, [command.get("type") for command in commands],
+    )
+    subscription_id: Optional[str] = None
+    try:
+        battery_monitor: BatteryMonitor = hass.data.get(DOMAIN)
+        if battery_monitor is None:
             _LOGGER.warning(
-                "handle_subscribe: msg_id=%s error=subscription_limit_exceeded "
-                "current_count=%d",
-                msg_id, current_count,
+                "handle_batch: msg_id=%s error=integration_not_loaded", msg_id
             )
             connection.send_error(
                 msg_id,
-                "subscription_limit_exceeded",
-                "Maximum subscriptions reached",
+                "integration_not_loaded",
+                "Vulcan Brownout integration not loaded",
             )
             return
 
-        connection.send_result(
-            msg_id,
-            {"subscription_id": subscription_id, "status": "subscribed"},
-        )
-        _LOGGER.info(
-            "handle_subscribe: msg_id=%s subscription_id=%s "
-            "entity_count=%d total_subscribers=%d",
-            msg_id, subscription_id, len(entity_ids),
-            subscription_manager.get_subscription_count(),
-        )
+        version = battery_monitor.version
+        results: List[Dict[str, Any]] = []
+        row_count = 0
+        for command in commands:
+            command_type = command.get("type")
+            try:
+                schema = BATCH_COMMAND_SCHEMAS.get(command_type)
+                if schema is None:
+                    raise _CommandError(
+                        "unknown_command", f"Unsupported in batch: {command_type}"
+                    )
+                try:
+                    command = schema(command)
+                except vol.Invalid as err:
+                    raise _CommandError("invalid_format", str(err)) from err
 
-        async def on_disconnect() -> None:
-            _LOGGER.debug(
-                "handle_subscribe.on_disconnect: subscription_id=%s cleaning_up=true",
-                subscription_id,
-            )
-            subscription_manager.unsubscribe(subscription_id)
-            _LOGGER.info(
-                "handle_subscribe.on_disconnect: subscription_id=%s unsubscribed=true "
-                "remaining_subscribers=%d",
-                subscription_id, subscription_manager.get_subscription_count(),
+                # The monitor's query coroutines never suspend, so awaiting
+                # them here keeps the whole batch on one index version
+                if command_type == COMMAND_QUERY_ENTITIES:
+                    _check_tier_sort(command)
+                    _check_group_by(command)
+                    result = await battery_monitor.query_entities(
+                        command.get("fields"), command["format"],
+                        command["sort"], command.get("limit"),
+                        command.get("cursor"), command.get("tier"),
+                        command.get("search"), command.get("group_by"),
+                        _filter_plan(battery_monitor, command),
+                    )
+                elif command_type == COMMAND_QUERY_UNAVAILABLE:
+                    _check_unavailable_fields(command)
+                    result = await battery_monitor.get_unavailable_entities(
+                        command.get("fields"), command["format"],
+                        command.get("limit"), command.get("cursor"),
+                        command.get("search"),
+                        _filter_plan(battery_monitor, command),
+                    )
+                elif command_type == COMMAND_QUERY_CHANGES:
+                    result = await battery_monitor.query_changes(
+                        command["since"], command.get("fields"),
+                        command.get("epoch"),
+                    )
+                elif command_type == COMMAND_SUMMARY:
+                    result = battery_monitor.summary()
+                elif command_type == COMMAND_HISTOGRAM:
+                    result = battery_monitor.level_histogram(command.get("facet"))
+                elif command_type == COMMAND_ROLLUP:
+                    result = battery_monitor.rollup_tree(command["depth"])
+                elif command_type == COMMAND_BATTERY_TYPES:
+                    result = battery_monitor.battery_types()
+                else:
+                    if subscription_id is not None:
+                        raise _CommandError(
+                            "invalid_format", "Only one subscribe per batch"
+                        )
+                    result = _add_subscription(
+                        hass, connection, msg_id, "handle_batch",
+                        command.get("fields"), command.get("tier"), command,
+                        hold=True,
+                    )
+                    subscription_id = result["subscription_id"]
+            except _CommandError as err:
+                results.append({
+                    "type": command_type,
+                    "success": False,
+                    "error": {"code": err.code, "message": err.message},
+                })
+                continue
+            except InvalidCursor as err:
+                results.append({
+                    "type": command_type,
+                    "success": False,
+                    "error": {"code": "invalid_cursor", "message": str(err)},
+                })
+                continue
+            row_count += _row_count(result)
+            results.append(
+                {"type": command_type, "success": True, "result": result}
             )
 
-        connection.subscriptions[msg_id] = on_disconnect
+        _LOGGER.info(
+            "handle_batch: msg_id=%s version=%d sub_commands=%d failed=%d rows=%d",
+            msg_id, version, len(results),
+            sum(1 for entry in results if not entry["success"]), row_count,
+        )
+        await _async_send_query_result(
+            hass, connection, msg_id,
+            {
+                "version": version,
+                "epoch": battery_monitor.epoch,
+                "results": results,
+            },
+            row_count,
+        )
+        if subscription_id is not None:
+            subscription_manager: WebSocketSubscriptionManager = hass.data[
+                f"{DOMAIN}_subscriptions"
+            ]
+            subscription_manager.release(subscription_id)
 
     except Exception as e:
         _LOGGER.error(
-            "handle_subscribe: msg_id=%s error=%s",
+            "handle_batch: msg_id=%s error=%s",
             msg_id, e, exc_info=True,
         )
+        if subscription_id is not None:
+            unsubscribe = connection.subscriptions.pop(msg_id, None)
+            if unsubscribe is not None:
+                unsubscribe()
         connection.send_error(
-            msg_id, "internal_error", "Failed to subscribe"
+            msg_id, "internal_error", "Failed to run batch"
+        )
+
+
+@websocket_api.websocket_command({vol.Required("type"): COMMAND_SUMMARY})
+@callback
+def handle_summary(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Handle vulcan-brownout/summary — badge counts from O(1) aggregates."""
+    msg_id = msg["id"]
+    battery_monitor: BatteryMonitor = hass.data.get(DOMAIN)
+    if battery_monitor is None:
+        _LOGGER.warning(
+            "handle_summary: msg_id=%s error=integration_not_loaded", msg_id
+        )
+        connection.send_error(
+            msg_id,
+            "integration_not_loaded",
+            "Vulcan Brownout integration not loaded",
+        )
+        return
+    summary = battery_monitor.summary()
+    _LOGGER.debug("handle_summary: msg_id=%s summary=%s", msg_id, summary)
+    connection.send_result(msg_id, summary)
+
+
+@websocket_api.websocket_command({vol.Required("type"): COMMAND_SUBSCRIBE_SUMMARY})
+@callback
+def handle_subscribe_summary(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Handle vulcan-brownout/subscribe_summary.
+
+    Replies with the current summary, then sends a summary event under the
+    same message id whenever any of its counts changes.
+    """
+    msg_id = msg["id"]
+    battery_monitor: BatteryMonitor = hass.data.get(DOMAIN)
+    if battery_monitor is None:
+        _LOGGER.warning(
+            "handle_subscribe_summary: msg_id=%s error=integration_not_loaded",
+            msg_id,
+        )
+        connection.send_error(
+            msg_id,
+            "integration_not_loaded",
+            "Vulcan Brownout integration not loaded",
         )
+        return
+    try:
+        _add_topic_subscription(hass, connection, msg_id, TOPIC_SUMMARY)
+    except _CommandError as err:
+        connection.send_error(msg_id, err.code, err.message)
+        return
+    connection.send_result(msg_id, battery_monitor.summary())
+    _LOGGER.info("handle_subscribe_summary: msg_id=%s subscribed=true", msg_id)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): COMMAND_HISTOGRAM,
+        **HISTOGRAM_PARAMS,
+    }
+)
+@callback
+def handle_histogram(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Handle vulcan-brownout/histogram — fleet level distribution."""
+    msg_id = msg["id"]
+    battery_monitor: BatteryMonitor = hass.data.get(DOMAIN)
+    if battery_monitor is None:
+        _LOGGER.warning(
+            "handle_histogram: msg_id=%s error=integration_not_loaded", msg_id
+        )
+        connection.send_error(
+            msg_id,
+            "integration_not_loaded",
+            "Vulcan Brownout integration not loaded",
+        )
+        return
+    result = battery_monitor.level_histogram(msg.get("facet"))
+    _LOGGER.debug(
+        "handle_histogram: msg_id=%s facet=%s total=%d",
+        msg_id, msg.get("facet"), result["total"],
+    )
+    connection.send_result(msg_id, result)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): COMMAND_ROLLUP,
+        **ROLLUP_PARAMS,
+    }
+)
+@callback
+def handle_rollup(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Handle vulcan-brownout/rollup — per floor/area/device aggregates."""
+    msg_id = msg["id"]
+    battery_monitor: BatteryMonitor = hass.data.get(DOMAIN)
+    if battery_monitor is None:
+        _LOGGER.warning(
+            "handle_rollup: msg_id=%s error=integration_not_loaded", msg_id
+        )
+        connection.send_error(
+            msg_id,
+            "integration_not_loaded",
+            "Vulcan Brownout integration not loaded",
+        )
+        return
+    result = battery_monitor.rollup_tree(msg["depth"])
+    _LOGGER.debug(
+        "handle_rollup: msg_id=%s depth=%d floors=%d",
+        msg_id, msg["depth"], len(result.get("floors", ())),
+    )
+    connection.send_result(msg_id, result)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): COMMAND_SUBSCRIBE_ROLLUP,
+        **ROLLUP_PARAMS,
+    }
+)
+@callback
+def handle_subscribe_rollup(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Handle vulcan-brownout/subscribe_rollup.
+
+    Replies with the current rollup, then sends the rollup at the same
+    depth as an event under the same message id whenever a node changes.
+    """
+    msg_id = msg["id"]
+    battery_monitor: BatteryMonitor = hass.data.get(DOMAIN)
+    if battery_monitor is None:
+        _LOGGER.warning(
+            "handle_subscribe_rollup: msg_id=%s error=integration_not_loaded",
+            msg_id,
+        )
+        connection.send_error(
+            msg_id,
+            "integration_not_loaded",
+            "Vulcan Brownout integration not loaded",
+        )
+        return
+    try:
+        _add_topic_subscription(
+            hass, connection, msg_id, rollup_topic(msg["depth"])
+        )
+    except _CommandError as err:
+        connection.send_error(msg_id, err.code, err.message)
+        return
+    connection.send_result(msg_id, battery_monitor.rollup_tree(msg["depth"]))
+    _LOGGER.info(
+        "handle_subscribe_rollup: msg_id=%s depth=%d subscribed=true",
+        msg_id, msg["depth"],
+    )
+
+
+@websocket_api.websocket_command({vol.Required("type"): COMMAND_BATTERY_TYPES})
+@callback
+def handle_battery_types(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Handle vulcan-brownout/battery_types — devices needing batteries by type."""
+    msg_id = msg["id"]
+    battery_monitor: BatteryMonitor = hass.data.get(DOMAIN)
+    if battery_monitor is None:
+        _LOGGER.warning(
+            "handle_battery_types: msg_id=%s error=integration_not_loaded", msg_id
+        )
+        connection.send_error(
+            msg_id,
+            "integration_not_loaded",
+            "Vulcan Brownout integration not loaded",
+        )
+        return
+    result = battery_monitor.battery_types()
+    _LOGGER.debug(
+        "handle_battery_types: msg_id=%s types=%d devices=%d",
+        msg_id, len(result["types"]), result["devices"],
+    )
+    connection.send_result(msg_id, result)
+
+
+@websocket_api.websocket_command(
+    {vol.Required("type"): COMMAND_SUBSCRIBE_BATTERY_TYPES}
+)
+@callback
+def handle_subscribe_battery_types(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Handle vulcan-brownout/subscribe_battery_types.
+
+    Replies with the current battery types, then sends them as an event
+    under the same message id whenever a device's count changes.
+    """
+    msg_id = msg["id"]
+    battery_monitor: BatteryMonitor = hass.data.get(DOMAIN)
+    if battery_monitor is None:
+        _LOGGER.warning(
+            "handle_subscribe_battery_types: msg_id=%s error=integration_not_loaded",
+            msg_id,
+        )
+        connection.send_error(
+            msg_id,
+            "integration_not_loaded",
+            "Vulcan Brownout integration not loaded",
+        )
+        return
+    try:
+        _add_topic_subscription(hass, connection, msg_id, TOPIC_BATTERY_TYPES)
+    except _CommandError as err:
+        connection.send_error(msg_id, err.code, err.message)
+        return
+    connection.send_result(msg_id, battery_monitor.battery_types())
+    _LOGGER.info(
+        "handle_subscribe_battery_types: msg_id=%s subscribed=true", msg_id
+    )
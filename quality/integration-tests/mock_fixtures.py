@@ -18,6 +18,8 @@ def generate_test_entities(count: int = 150) -> List[Dict[str, Any]]:
               "YRD256", "5800PIR", "E1C-NB7", "DWZWAVE25", "ZCOMBO-G"]
     areas = ["Entrance", "Bedroom", "Kitchen", "Living Room", "Garage",
              "Bathroom", "Office", "Hallway", "Basement", "Patio"]
+    # Every other area is upstairs (area index parity picks the floor)
+    floors = ["ground_floor", "first_floor"]
 
     # Critical entities (below 15%)
     critical_count = max(3, count // 15)
@@ -32,11 +34,24 @@ def generate_test_entities(count: int = 150) -> List[Dict[str, Any]]:
                 "device_class": "battery",
                 "unit_of_measurement": "%",
                 "battery_level": battery_level,
+                # battery_notes attributes on the first entity of each device:
+                # CR2032 coin cells on even devices, 4 x AA on odd ones
+                **(
+                    {} if i % 2 else
+                    {"battery_type": "AA", "battery_quantity": 4} if i // 2 % 2 else
+                    {"battery_type": "CR2032"}
+                ),
             },
             "available": True,
+            # Pairs of critical entities share a device (e.g. multi-cell locks)
+            "device_id": f"device_critical_{i // 2:03d}",
             "manufacturer": manufacturers[i % len(manufacturers)],
             "model": models[i % len(models)],
             "area_name": areas[i % len(areas)],
+            "floor_id": floors[i % len(floors)],
+            # Registry labels (entity and device labels merged)
+            "labels": (["tenant-1"] if i % 3 == 0 else [])
+            + (["critical-infrastructure"] if i < 2 else []),
         })
 
     # Above-threshold entities (>= 15%)
@@ -54,16 +69,19 @@ def generate_test_entities(count: int = 150) -> List[Dict[str, Any]]:
                 "battery_level": battery_level,
             },
             "available": True,
+            # At 80%, shares a device with the binary sensor that is on
+            **({"device_id": "device_binary_000"} if i == 65 else {}),
         })
 
-    # Binary sensors (should be filtered out)
+    # Binary battery sensors ("on" means low); tracked without a level
     for i in range(3):
         entities.append({
             "entity_id": f"binary_sensor.battery_low_{i:03d}",
-            "state": "off",
+            "state": "on" if i == 0 else "off",
             "friendly_name": f"Battery Low Alert {i}",
-            "attributes": {"device_class": "battery_low"},
+            "attributes": {"device_class": "battery"},
             "available": True,
+            **({"device_id": "device_binary_000"} if i == 0 else {}),
         })
 
     # Unavailable entities (should be skipped)
@@ -74,6 +92,11 @@ def generate_test_entities(count: int = 150) -> List[Dict[str, Any]]:
             "friendly_name": f"Unavailable Device {i}",
             "attributes": {"device_class": "battery"},
             "available": False,
+            "area_name": "Garage",
+            "floor_id": "ground_floor",
+            # One device with two unavailable battery entities
+            "device_id": "device_garage_000",
+            "labels": ["tenant-1"] if i == 0 else [],
         })
 
     return entities
@@ -68,6 +68,11 @@ class HAWebSocketClient:
         response = json.loads(await self.ws.recv())
         return response
 
+    async def receive(self) -> Dict[str, Any]:
+        """Read the next pushed message (e.g. a subscription event)."""
+        assert self.ws is not None, "Not connected"
+        return json.loads(await self.ws.recv())
+
     async def close(self) -> None:
         if self.ws:
             await self.ws.close()
@@ -96,6 +101,14 @@ class MockHAController:
         ) as resp:
             assert resp.status == 200
 
+    async def set_state(self, entity_id: str, state: str, attributes: dict) -> None:
+        assert self.session is not None, "Not initialized"
+        async with self.session.post(
+            f"{TEST_HA_URL}/api/states/{entity_id}",
+            json={"state": state, "attributes": attributes},
+        ) as resp:
+            assert resp.status == 200
+
 
 @pytest_asyncio.fixture
 async def mock_ha():
@@ -115,6 +128,31 @@ async def ws_client(mock_ha):
     await client.close()
 
 
+def _tier(level):
+    """Severity tier of a level under the default bounds (5 / 15 / 30)."""
+    for name, bound in (("critical", 5), ("warning", 15), ("watch", 30)):
+        if level < bound:
+            return name
+    return "ok"
+
+
+def _status(row):
+    """Expected status of a row: its level's tier, or low/ok for a binary sensor."""
+    if row["battery_level"] is None:
+        return "low" if row["state"] == "on" else "ok"
+    return _tier(row["battery_level"])
+
+
+def _level_key(level):
+    """Level order of the backend; rows without a level (binary) come first."""
+    return (level is not None, level or 0.0)
+
+
+# Binary battery sensors in the fixtures: three, of which one is "on"
+BINARY_TRACKED = 3
+BINARY_LOW = 1
+
+
 class TestQueryEntities:
     """Test vulcan-brownout/query_entities — no params, returns low-battery entities."""
 
@@ -134,11 +172,14 @@ class TestQueryEntities:
 
     @pytest.mark.asyncio
     async def test_query_entities_only_below_threshold(self, ws_client):
-        """All returned entities should have battery_level < 15."""
+        """All returned entities should have battery_level < 15 (or be binary and on)."""
         response = await ws_client.send_command("vulcan-brownout/query_entities", {})
         assert response["success"] is True
 
         for device in response["data"]["entities"]:
+            if device["battery_level"] is None:
+                assert device["state"] == "on"
+                continue
             assert device["battery_level"] < 15, (
                 f"{device['entity_id']} has level {device['battery_level']}"
             )
@@ -150,7 +191,7 @@ class TestQueryEntities:
         assert response["success"] is True
 
         devices = response["data"]["entities"]
-        levels = [d["battery_level"] for d in devices]
+        levels = [_level_key(d["battery_level"]) for d in devices]
         assert levels == sorted(levels)
 
     @pytest.mark.asyncio
@@ -165,16 +206,1007 @@ class TestQueryEntities:
             assert "battery_level" in device
             assert "status" in device
             assert "device_name" in device
-            assert device["status"] == "critical"
+            assert device["status"] == _status(device)
 
     @pytest.mark.asyncio
-    async def test_query_entities_all_critical(self, ws_client):
-        """All returned entities should have status=critical."""
+    async def test_query_entities_status_is_tier(self, ws_client):
+        """Each row's status is the severity tier of its level."""
         response = await ws_client.send_command("vulcan-brownout/query_entities", {})
         assert response["success"] is True
 
+        statuses = set()
         for device in response["data"]["entities"]:
-            assert device["status"] == "critical"
+            assert device["status"] == _status(device)
+            statuses.add(device["status"])
+        # Below the default 15% threshold only the two lowest tiers occur,
+        # plus "low" for binary sensors that are on
+        assert statuses <= {"critical", "warning", "low"}
+
+    @pytest.mark.asyncio
+    async def test_query_entities_fields_projection(self, ws_client):
+        """Only the requested fields should be returned."""
+        fields = ["entity_id", "battery_level", "device_name", "area_name"]
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"fields": fields}
+        )
+        assert response["success"] is True
+
+        devices = response["data"]["entities"]
+        assert devices
+        for device in devices:
+            assert set(device) <= set(fields)
+            assert "entity_id" in device
+            assert "attributes" not in device
+
+    @pytest.mark.asyncio
+    async def test_query_entities_attribute_allow_list(self, ws_client):
+        """Only allow-listed attributes are forwarded."""
+        response = await ws_client.send_command("vulcan-brownout/query_entities", {})
+        assert response["success"] is True
+
+        allowed = {"friendly_name", "device_class", "unit_of_measurement", "icon"}
+        for device in response["data"]["entities"]:
+            assert set(device["attributes"]) <= allowed
+
+
+class TestSortAndPagination:
+    """Test the sort, limit and cursor parameters of the query commands."""
+
+    async def _pages(self, ws_client, command, data, limit):
+        rows, cursor, totals = [], None, set()
+        while True:
+            params = {**data, "limit": limit}
+            if cursor:
+                params["cursor"] = cursor
+            response = await ws_client.send_command(command, params)
+            assert response["success"] is True
+            page = response["data"]
+            assert len(page["entities"]) <= limit
+            rows.extend(page["entities"])
+            totals.add(page["total"])
+            if not page["has_more"]:
+                assert page["next_cursor"] is None
+                return rows, totals
+            cursor = page["next_cursor"]
+
+    @pytest.mark.asyncio
+    async def test_sort_orders(self, ws_client):
+        def by(sort):
+            return ws_client.send_command(
+                "vulcan-brownout/query_entities", {"sort": sort}
+            )
+
+        levels = (await by("level"))["data"]["entities"]
+        names = (await by("name"))["data"]["entities"]
+        areas = (await by("area"))["data"]["entities"]
+        recent = (await by("last_changed"))["data"]["entities"]
+
+        ids = sorted(d["entity_id"] for d in levels)
+        for rows in (names, areas, recent):
+            assert sorted(d["entity_id"] for d in rows) == ids
+        keys = [d["device_name"].casefold() for d in names]
+        assert keys == sorted(keys)
+        keys = [(d["area_name"] is None, (d["area_name"] or "").casefold()) for d in areas]
+        assert keys == sorted(keys)
+        keys = [d["last_changed"] or "" for d in recent]
+        assert keys == sorted(keys, reverse=True)
+
+        # Without threshold overrides the margin order is the level order
+        margins = (await by("margin"))["data"]["entities"]
+        levels = [_level_key(d["battery_level"]) for d in margins]
+        assert levels == sorted(levels)
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_list_once(self, ws_client):
+        for sort in ("level", "name", "area", "last_changed", "margin"):
+            full = await ws_client.send_command(
+                "vulcan-brownout/query_entities", {"sort": sort}
+            )
+            rows, totals = await self._pages(
+                ws_client, "vulcan-brownout/query_entities", {"sort": sort}, 2
+            )
+            assert rows == full["data"]["entities"]
+            assert totals == {full["data"]["total"]}
+
+    @pytest.mark.asyncio
+    async def test_query_unavailable_pages(self, ws_client):
+        full = await ws_client.send_command("vulcan-brownout/query_unavailable", {})
+        rows, totals = await self._pages(
+            ws_client, "vulcan-brownout/query_unavailable", {}, 1
+        )
+        assert rows == full["data"]["entities"]
+        assert totals == {full["data"]["total"]}
+
+    @pytest.mark.asyncio
+    async def test_cursor_from_other_sort_is_rejected(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"sort": "name", "limit": 1}
+        )
+        cursor = response["data"]["next_cursor"]
+        assert cursor
+
+        for params in ({"cursor": cursor}, {"cursor": "not-a-cursor"}):
+            response = await ws_client.send_command(
+                "vulcan-brownout/query_entities", {"sort": "level", **params}
+            )
+            assert response["success"] is False
+            assert response["error"]["code"] == "invalid_cursor"
+
+
+class TestSeverityTiers:
+    """Test tier-scoped queries and tier counts."""
+
+    @pytest.mark.asyncio
+    async def test_tier_query_matches_counts(self, ws_client):
+        summary = await ws_client.send_command("vulcan-brownout/summary", {})
+        counts = summary["data"]["tiers"]
+        for tier, count in counts.items():
+            response = await ws_client.send_command(
+                "vulcan-brownout/query_entities", {"tier": tier}
+            )
+            assert response["success"] is True
+            data = response["data"]
+            assert data["total"] == count
+            assert len(data["entities"]) == count
+            assert all(d["status"] == tier for d in data["entities"])
+            levels = [_level_key(d["battery_level"]) for d in data["entities"]]
+            assert levels == sorted(levels)
+
+    @pytest.mark.asyncio
+    async def test_tier_query_reaches_above_threshold(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"tier": "ok"}
+        )
+        assert response["success"] is True
+        # Binary sensors that are off have no level but are "ok"
+        assert all(
+            d["battery_level"] >= 30
+            for d in response["data"]["entities"] if d["battery_level"] is not None
+        )
+
+    @pytest.mark.asyncio
+    async def test_tier_query_rejects_other_sort(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"tier": "critical", "sort": "name"}
+        )
+        assert response["success"] is False
+        assert response["error"]["code"] == "invalid_format"
+
+
+class TestSearch:
+    """Test the search parameter of the query commands."""
+
+    @pytest.mark.asyncio
+    async def test_search_narrows_low_list(self, ws_client):
+        full = await ws_client.send_command("vulcan-brownout/query_entities", {})
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"search": "kitch"}
+        )
+        assert response["success"] is True
+        data = response["data"]
+        assert data["total"] == len(data["entities"]) > 0
+        low_ids = {d["entity_id"] for d in full["data"]["entities"]}
+        assert all(d["entity_id"] in low_ids for d in data["entities"])
+        assert all(d["area_name"] == "Kitchen" for d in data["entities"])
+
+    @pytest.mark.asyncio
+    async def test_search_ranks_closest_match_first(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"tier": "watch", "search": "device 1"}
+        )
+        assert response["success"] is True
+        rows = response["data"]["entities"]
+        assert len(rows) > 1
+        assert rows[0]["device_name"] == "Above Threshold Device 1"
+        assert all(
+            d["device_name"].startswith("Above Threshold Device 1") for d in rows
+        )
+
+    @pytest.mark.asyncio
+    async def test_search_pages_cover_matches_once(self, ws_client):
+        data = {"search": "battery"}
+        full = await ws_client.send_command("vulcan-brownout/query_entities", data)
+        rows, totals = await TestSortAndPagination()._pages(
+            ws_client, "vulcan-brownout/query_entities", data, 2
+        )
+        assert rows == full["data"]["entities"]
+        assert totals == {full["data"]["total"]}
+
+    @pytest.mark.asyncio
+    async def test_search_without_match_is_empty(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"search": "zzzz"}
+        )
+        assert response["success"] is True
+        assert response["data"]["entities"] == []
+        assert response["data"]["total"] == 0
+
+    @pytest.mark.asyncio
+    async def test_search_unavailable(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_unavailable", {"search": "unavailable device 1"}
+        )
+        assert response["success"] is True
+        rows = response["data"]["entities"]
+        assert [d["entity_id"] for d in rows] == ["sensor.battery_unavailable_001"]
+
+
+class TestLabels:
+    """Test the labels parameter of the query commands."""
+
+    @pytest.mark.asyncio
+    async def test_labels_narrow_low_list(self, ws_client):
+        full = await ws_client.send_command("vulcan-brownout/query_entities", {})
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"labels": ["tenant-1"]}
+        )
+        assert response["success"] is True
+        data = response["data"]
+        ids = [d["entity_id"] for d in data["entities"]]
+        assert data["total"] == len(ids) == 4
+        # Still in low-list order
+        assert ids == [
+            d["entity_id"] for d in full["data"]["entities"] if d["entity_id"] in ids
+        ]
+
+    @pytest.mark.asyncio
+    async def test_labels_match_any(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities",
+            {"labels": ["tenant-1", "critical-infrastructure"]},
+        )
+        assert response["data"]["total"] == 5
+
+        unknown = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"labels": ["no-such-label"]}
+        )
+        assert unknown["data"]["total"] == 0
+
+    @pytest.mark.asyncio
+    async def test_labels_on_unavailable_and_pages(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_unavailable", {"labels": ["tenant-1"]}
+        )
+        assert [d["entity_id"] for d in response["data"]["entities"]] == [
+            "sensor.battery_unavailable_000"
+        ]
+
+        data = {"labels": ["tenant-1"]}
+        full = await ws_client.send_command("vulcan-brownout/query_entities", data)
+        rows, totals = await TestSortAndPagination()._pages(
+            ws_client, "vulcan-brownout/query_entities", data, 3
+        )
+        assert rows == full["data"]["entities"]
+        assert totals == {full["data"]["total"]}
+
+    @pytest.mark.asyncio
+    async def test_labels_not_combined_with_group_by(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities",
+            {"group_by": "device", "labels": ["tenant-1"]},
+        )
+        assert response["success"] is False
+
+
+class TestBinarySensors:
+    """Test binary battery sensors, tracked without a level."""
+
+    @pytest.mark.asyncio
+    async def test_on_sensor_is_low(self, ws_client):
+        response = await ws_client.send_command("vulcan-brownout/query_entities", {})
+        rows = response["data"]["entities"]
+        # No level, so ahead of every level in the low list
+        row = rows[0]
+        assert row["entity_id"] == "binary_sensor.battery_low_000"
+        assert row["state"] == "on"
+        assert row["battery_level"] is None
+        assert row["status"] == "low"
+        # "off" sensors aren't low
+        assert "binary_sensor.battery_low_001" not in {d["entity_id"] for d in rows}
+
+    @pytest.mark.asyncio
+    async def test_on_sensor_is_in_no_tier(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"filter": {"tier": "critical"}}
+        )
+        ids = [d["entity_id"] for d in response["data"]["entities"]]
+        assert "binary_sensor.battery_low_000" not in ids
+
+    @pytest.mark.asyncio
+    async def test_off_sensors_are_ok(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"tier": "ok", "search": "battery low alert"}
+        )
+        rows = response["data"]["entities"]
+        assert [d["entity_id"] for d in rows] == [
+            "binary_sensor.battery_low_001", "binary_sensor.battery_low_002"
+        ]
+        assert {d["battery_level"] for d in rows} == {None}
+        assert {d["status"] for d in rows} == {"ok"}
+
+    @pytest.mark.asyncio
+    async def test_sensor_turning_on_enters_low_list(self, ws_client, mock_ha):
+        await mock_ha.set_state(
+            "binary_sensor.battery_low_001", "on", {"device_class": "battery"}
+        )
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"filter": {"low": True}}
+        )
+        ids = [d["entity_id"] for d in response["data"]["entities"]]
+        assert "binary_sensor.battery_low_001" in ids
+
+
+class TestFilters:
+    """Test the filter expression parameter of the query commands."""
+
+    @pytest.mark.asyncio
+    async def test_filter_and_not(self, ws_client):
+        full = await ws_client.send_command("vulcan-brownout/query_entities", {})
+        rows = full["data"]["entities"]
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities",
+            {"filter": {"and": [
+                {"tier": "critical"},
+                {"not": {"label": "tenant-1"}},
+                {"floor": "ground_floor"},
+            ]}},
+        )
+        assert response["success"] is True
+        ids = [d["entity_id"] for d in response["data"]["entities"]]
+        assert ids
+        assert response["data"]["total"] == len(ids)
+        # A subset of the low list, in its order
+        assert ids == [d["entity_id"] for d in rows if d["entity_id"] in ids]
+        assert {d["status"] for d in response["data"]["entities"]} == {"critical"}
+
+    @pytest.mark.asyncio
+    async def test_labels_are_filter_shorthand(self, ws_client):
+        labels = await ws_client.send_command(
+            "vulcan-brownout/query_entities",
+            {"labels": ["tenant-1", "critical-infrastructure"]},
+        )
+        expression = await ws_client.send_command(
+            "vulcan-brownout/query_entities",
+            {"filter": {"or": [
+                {"label": "critical-infrastructure"}, {"label": "tenant-1"},
+            ]}},
+        )
+        assert expression["data"] == labels["data"]
+
+        below = await ws_client.send_command(
+            "vulcan-brownout/query_entities",
+            {"filter": {"below": 5}, "labels": ["tenant-1"]},
+        )
+        assert all(d["battery_level"] < 5 for d in below["data"]["entities"])
+        assert below["data"]["total"] <= labels["data"]["total"]
+
+    @pytest.mark.asyncio
+    async def test_filter_on_unavailable(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_unavailable",
+            {"filter": {"or": [{"label": "tenant-1"}, {"area": "no_such_area"}]}},
+        )
+        assert [d["entity_id"] for d in response["data"]["entities"]] == [
+            "sensor.battery_unavailable_000"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_invalid_filter_rejected(self, ws_client):
+        for expression in (
+            {"tier": "purple"},
+            {"and": []},
+            {"color": "red"},
+            {"label": "a", "tier": "critical"},
+            {"below": "low"},
+        ):
+            response = await ws_client.send_command(
+                "vulcan-brownout/query_entities", {"filter": expression}
+            )
+            assert response["success"] is False
+            assert response["error"]["code"] == "invalid_format"
+
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities",
+            {"group_by": "device", "filter": {"tier": "critical"}},
+        )
+        assert response["success"] is False
+
+
+class TestDeviceGroups:
+    """Test query_entities with group_by: device."""
+
+    @pytest.mark.asyncio
+    async def test_groups_cover_low_list(self, ws_client):
+        full = await ws_client.send_command("vulcan-brownout/query_entities", {})
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"group_by": "device"}
+        )
+        assert response["success"] is True
+        groups = response["data"]["groups"]
+        assert response["data"]["total"] == len(groups)
+
+        low_ids = {d["entity_id"] for d in full["data"]["entities"]}
+        grouped = [d["entity_id"] for g in groups for d in g["entities"]]
+        assert len(grouped) == len(set(grouped))
+        assert low_ids <= set(grouped)
+        # Fixture pairs of critical entities share a device
+        assert any(len(g["entities"]) == 2 for g in groups)
+
+    @pytest.mark.asyncio
+    async def test_group_rollups(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"group_by": "device"}
+        )
+        groups = response["data"]["groups"]
+        assert groups
+        for group in groups:
+            levels = [
+                d["battery_level"] for d in group["entities"]
+                if d["battery_level"] is not None
+            ]
+            assert levels == sorted(levels)
+            assert group["min_level"] == (levels[0] if levels else None)
+            flagged = any(
+                d["battery_level"] is None and d["state"] == "on"
+                for d in group["entities"]
+            )
+            assert group["status"] == (
+                "low" if flagged or not levels else _tier(levels[0])
+            )
+            assert group["low"] == sum(
+                d["state"] == "on" if d["battery_level"] is None
+                else d["battery_level"] < 15
+                for d in group["entities"]
+            )
+        # Groups with a binary sensor that is on sort first
+        keys = [
+            _level_key(None if g["status"] == "low" else g["min_level"])
+            for g in groups
+        ]
+        assert keys == sorted(keys)
+
+    @pytest.mark.asyncio
+    async def test_binary_low_member_sets_group_status(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"group_by": "device"}
+        )
+        group = response["data"]["groups"][0]
+        # The binary sensor that is on shares its device with an 80% sensor
+        assert group["device_id"] == "device_binary_000"
+        assert group["status"] == "low"
+        assert group["min_level"] == 80.0
+        assert group["low"] == 1
+        assert [d["battery_level"] for d in group["entities"]] == [None, 80.0]
+
+    @pytest.mark.asyncio
+    async def test_group_pages_cover_groups_once(self, ws_client):
+        data = {"group_by": "device"}
+        full = await ws_client.send_command("vulcan-brownout/query_entities", data)
+        groups, cursor = [], None
+        while True:
+            params = {**data, "limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = (await ws_client.send_command(
+                "vulcan-brownout/query_entities", params
+            ))["data"]
+            groups.extend(page["groups"])
+            if not page["has_more"]:
+                break
+            cursor = page["next_cursor"]
+        assert groups == full["data"]["groups"]
+
+    @pytest.mark.asyncio
+    async def test_group_by_rejects_tier(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities",
+            {"group_by": "device", "tier": "critical"},
+        )
+        assert response["success"] is False
+        assert response["error"]["code"] == "invalid_format"
+
+
+class TestColumnarFormat:
+    """Test the opt-in format: "columnar" encoding of query results."""
+
+    @pytest.mark.asyncio
+    async def test_query_entities_columnar_matches_rows(self, ws_client):
+        fields = ["entity_id", "battery_level", "manufacturer", "area_name"]
+        rows = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"fields": fields}
+        )
+        columnar = await ws_client.send_command(
+            "vulcan-brownout/query_entities",
+            {"fields": fields, "format": "columnar"},
+        )
+        assert rows["success"] is True
+        assert columnar["success"] is True
+
+        data = columnar["data"]
+        assert data["format"] == "columnar"
+        assert data["fields"] == fields
+        assert data["total"] == rows["data"]["total"]
+
+        decoded = []
+        for i in range(data["total"]):
+            row = {}
+            for field in fields:
+                value = data["columns"][field][i]
+                lookup = data["dictionaries"].get(field)
+                row[field] = lookup[value] if lookup is not None else value
+            decoded.append(row)
+        assert decoded == rows["data"]["entities"]
+
+    @pytest.mark.asyncio
+    async def test_query_entities_columnar_dictionary_encodes_strings(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_entities",
+            {"fields": ["entity_id", "manufacturer"], "format": "columnar"},
+        )
+        assert response["success"] is True
+
+        data = response["data"]
+        assert "entity_id" not in data["dictionaries"]
+        lookup = data["dictionaries"]["manufacturer"]
+        assert len(lookup) == len(set(lookup))
+        assert all(isinstance(code, int) for code in data["columns"]["manufacturer"])
+
+    @pytest.mark.asyncio
+    async def test_query_unavailable_columnar(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_unavailable",
+            {"fields": ["entity_id", "state"], "format": "columnar"},
+        )
+        assert response["success"] is True
+        data = response["data"]
+        assert data["format"] == "columnar"
+        assert len(data["columns"]["entity_id"]) == data["total"]
+
+    @pytest.mark.asyncio
+    async def test_query_unavailable_projection(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_unavailable",
+            {"fields": ["entity_id", "status"], "format": "columnar"},
+        )
+        assert response["success"] is True
+        assert response["data"]["fields"] == ["entity_id"]
+
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_unavailable",
+            {"fields": ["status", "attributes"]},
+        )
+        assert response["success"] is False
+        assert response["error"]["code"] == "invalid_format"
+
+
+class TestStreamEntities:
+    """Test vulcan-brownout/stream_entities — chunked low-battery snapshot."""
+
+    async def _stream(self, ws_client, data):
+        response = await ws_client.send_command(
+            "vulcan-brownout/stream_entities", data
+        )
+        assert response["success"] is True
+        events = []
+        while True:
+            message = await ws_client.receive()
+            assert message["type"] == "event"
+            assert message["id"] == response["id"]
+            events.append(message["event"])
+            if message["event"].get("end"):
+                return response["data"], events
+
+    @pytest.mark.asyncio
+    async def test_stream_entities_matches_query(self, ws_client):
+        fields = ["entity_id", "battery_level", "device_name"]
+        query = await ws_client.send_command(
+            "vulcan-brownout/query_entities", {"fields": fields}
+        )
+        result, events = await self._stream(ws_client, {"fields": fields})
+
+        streamed = [row for event in events[:-1] for row in event["entities"]]
+        assert streamed == query["data"]["entities"]
+        assert result["total"] == len(streamed)
+        assert "version" in result
+
+    @pytest.mark.asyncio
+    async def test_stream_entities_bounded_chunks(self, ws_client):
+        result, events = await self._stream(ws_client, {"chunk_bytes": 1024})
+
+        chunks, end = events[:-1], events[-1]
+        assert [event["chunk"] for event in chunks] == list(range(len(chunks)))
+        assert end == {"end": True, "total": result["total"], "chunks": len(chunks)}
+        for event in chunks:
+            if len(event["entities"]) > 1:
+                assert len(json.dumps(event["entities"])) <= 1024 + 64
+
+
+class TestBatch:
+    """Test vulcan-brownout/batch — several sub-commands in one round trip."""
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_individual_commands(self, ws_client):
+        entities = await ws_client.send_command("vulcan-brownout/query_entities", {})
+        unavailable = await ws_client.send_command(
+            "vulcan-brownout/query_unavailable", {}
+        )
+        response = await ws_client.send_command("vulcan-brownout/batch", {
+            "commands": [
+                {"type": "vulcan-brownout/query_entities"},
+                {"type": "vulcan-brownout/query_unavailable"},
+                {"type": "vulcan-brownout/subscribe"},
+            ],
+        })
+
+        assert response["success"] is True
+        data = response["data"]
+        assert "version" in data
+        results = data["results"]
+        assert [r["type"] for r in results] == [
+            "vulcan-brownout/query_entities",
+            "vulcan-brownout/query_unavailable",
+            "vulcan-brownout/subscribe",
+        ]
+        assert all(r["success"] for r in results)
+        assert results[0]["result"] == entities["data"]
+        assert results[1]["result"] == unavailable["data"]
+        assert results[2]["result"]["status"] == "subscribed"
+
+    @pytest.mark.asyncio
+    async def test_batch_passes_sub_command_params(self, ws_client):
+        response = await ws_client.send_command("vulcan-brownout/batch", {
+            "commands": [{
+                "type": "vulcan-brownout/query_entities",
+                "fields": ["entity_id"],
+                "format": "columnar",
+            }],
+        })
+        result = response["data"]["results"][0]["result"]
+        assert result["format"] == "columnar"
+        assert result["fields"] == ["entity_id"]
+
+    @pytest.mark.asyncio
+    async def test_batch_unknown_sub_command_fails_alone(self, ws_client):
+        response = await ws_client.send_command("vulcan-brownout/batch", {
+            "commands": [
+                {"type": "vulcan-brownout/nope"},
+                {"type": "vulcan-brownout/query_entities"},
+            ],
+        })
+        assert response["success"] is True
+        first, second = response["data"]["results"]
+        assert first["success"] is False
+        assert first["error"]["code"] == "unknown_command"
+        assert second["success"] is True
+
+
+class TestQueryChanges:
+    """Test vulcan-brownout/query_changes — low-list delta since a version."""
+
+    BATTERY = {"device_class": "battery", "unit_of_measurement": "%"}
+
+    @pytest.mark.asyncio
+    async def test_query_changes_entered_changed_left(self, ws_client, mock_ha):
+        start = await ws_client.send_command(
+            "vulcan-brownout/query_changes", {"since": 0}
+        )
+        assert start["success"] is True
+        version = start["data"]["version"]
+
+        await mock_ha.set_state("sensor.poll_test_battery", "4", self.BATTERY)
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_changes",
+            {"since": version, "fields": ["entity_id", "battery_level"]},
+        )
+        data = response["data"]
+        assert data["full"] is False
+        assert data["version"] > version
+        assert data["entered"] == [
+            {"entity_id": "sensor.poll_test_battery", "battery_level": 4.0}
+        ]
+        assert data["changed"] == []
+        assert data["left"] == []
+        version = data["version"]
+
+        await mock_ha.set_state("sensor.poll_test_battery", "7", self.BATTERY)
+        data = (await ws_client.send_command(
+            "vulcan-brownout/query_changes", {"since": version}
+        ))["data"]
+        assert [row["entity_id"] for row in data["changed"]] == [
+            "sensor.poll_test_battery"
+        ]
+        assert data["entered"] == []
+        version = data["version"]
+
+        await mock_ha.set_state("sensor.poll_test_battery", "90", self.BATTERY)
+        data = (await ws_client.send_command(
+            "vulcan-brownout/query_changes", {"since": version}
+        ))["data"]
+        assert data["left"] == ["sensor.poll_test_battery"]
+        assert data["entered"] == [] and data["changed"] == []
+
+    @pytest.mark.asyncio
+    async def test_query_changes_no_changes(self, ws_client):
+        first = await ws_client.send_command(
+            "vulcan-brownout/query_changes", {"since": 0}
+        )
+        version = first["data"]["version"]
+        data = (await ws_client.send_command(
+            "vulcan-brownout/query_changes", {"since": version}
+        ))["data"]
+        assert data == {
+            "version": version, "epoch": first["data"]["epoch"], "full": False,
+            "entered": [], "changed": [], "left": [],
+        }
+
+    @pytest.mark.asyncio
+    async def test_query_changes_unknown_version_is_full(self, ws_client):
+        query = await ws_client.send_command("vulcan-brownout/query_entities", {})
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_changes", {"since": 10_000_000}
+        )
+        data = response["data"]
+        assert data["full"] is True
+        assert data["entities"] == query["data"]["entities"]
+        assert data["total"] == query["data"]["total"]
+
+    @pytest.mark.asyncio
+    async def test_query_changes_other_epoch_is_full(self, ws_client):
+        first = await ws_client.send_command(
+            "vulcan-brownout/query_changes", {"since": 0}
+        )
+        data = first["data"]
+        same = await ws_client.send_command(
+            "vulcan-brownout/query_changes",
+            {"since": data["version"], "epoch": data["epoch"]},
+        )
+        assert same["data"]["full"] is False
+
+        other = await ws_client.send_command(
+            "vulcan-brownout/query_changes",
+            {"since": data["version"], "epoch": "not-this-run"},
+        )
+        assert other["data"]["full"] is True
+        assert other["data"]["epoch"] == data["epoch"]
+
+
+class TestSummary:
+    """Test vulcan-brownout/summary and subscribe_summary."""
+
+    BATTERY = {"device_class": "battery", "unit_of_measurement": "%"}
+
+    @pytest.mark.asyncio
+    async def test_summary_matches_query(self, ws_client):
+        query = await ws_client.send_command("vulcan-brownout/query_entities", {})
+        unavailable = await ws_client.send_command(
+            "vulcan-brownout/query_unavailable", {}
+        )
+        response = await ws_client.send_command("vulcan-brownout/summary", {})
+
+        assert response["success"] is True
+        summary = response["data"]
+        assert set(summary) == {
+            "low", "tiers", "unavailable", "tracked", "min_level", "lowest",
+            "version",
+        }
+        assert summary["low"] == query["data"]["total"]
+        assert set(summary["tiers"]) == {"critical", "warning", "watch", "ok"}
+        # Binary sensors that are on are in no tier
+        assert sum(summary["tiers"].values()) == summary["tracked"] - BINARY_LOW
+        assert summary["unavailable"] == unavailable["data"]["total"]
+        # Binary sensors have no level and don't count towards min_level
+        lowest = next(
+            d for d in query["data"]["entities"] if d["battery_level"] is not None
+        )
+        assert summary["min_level"] == lowest["battery_level"]
+        assert summary["lowest"] == lowest["entity_id"]
+        assert len(json.dumps(summary)) < 300
+
+    @pytest.mark.asyncio
+    async def test_subscribe_summary_pushes_changes(self, ws_client, mock_ha):
+        response = await ws_client.send_command(
+            "vulcan-brownout/subscribe_summary", {}
+        )
+        assert response["success"] is True
+        before = response["data"]
+
+        await mock_ha.set_state("sensor.summary_test_battery", "0", self.BATTERY)
+        message = await ws_client.receive()
+        assert message["type"] == "event"
+        assert message["id"] == response["id"]
+        after = message["event"]
+        assert after["low"] == before["low"] + 1
+        assert after["tracked"] == before["tracked"] + 1
+        assert after["min_level"] == 0.0
+
+
+class TestHistogram:
+    """Test vulcan-brownout/histogram — fleet level distribution."""
+
+    @pytest.mark.asyncio
+    async def test_histogram_buckets(self, ws_client):
+        response = await ws_client.send_command("vulcan-brownout/histogram", {})
+        assert response["success"] is True
+        data = response["data"]
+        assert data["bucket_width"] == 5.0
+        assert len(data["buckets"]) == 20
+        assert sum(data["buckets"]) == data["total"]
+        assert "facets" not in data
+
+        summary = await ws_client.send_command("vulcan-brownout/summary", {})
+        # Binary sensors are tracked but have no level to bucket
+        assert data["total"] == summary["data"]["tracked"] - BINARY_TRACKED
+        assert sum(data["buckets"][:3]) == summary["data"]["low"] - BINARY_LOW
+
+    @pytest.mark.asyncio
+    async def test_histogram_facet_sums_to_total(self, ws_client):
+        for facet in ("area", "manufacturer"):
+            response = await ws_client.send_command(
+                "vulcan-brownout/histogram", {"facet": facet}
+            )
+            data = response["data"]
+            per_bucket = [sum(col) for col in zip(*(f["buckets"] for f in data["facets"]))]
+            assert per_bucket == data["buckets"]
+            values = [f["value"] for f in data["facets"]]
+            assert len(values) == len(set(values))
+
+    @pytest.mark.asyncio
+    async def test_histogram_rejects_unknown_facet(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/histogram", {"facet": "color"}
+        )
+        assert response["success"] is False
+
+
+class TestRollup:
+    """Test vulcan-brownout/rollup and subscribe_rollup."""
+
+    BATTERY = {"device_class": "battery", "unit_of_measurement": "%"}
+
+    @pytest.mark.asyncio
+    async def test_rollup_matches_summary(self, ws_client):
+        summary = await ws_client.send_command("vulcan-brownout/summary", {})
+        response = await ws_client.send_command("vulcan-brownout/rollup", {})
+        assert response["success"] is True
+        root = response["data"]
+        for key in ("tracked", "low", "min_level"):
+            assert root[key] == summary["data"][key]
+        # Both unavailable entities belong to one device
+        assert summary["data"]["unavailable"] == 2
+        assert root["unavailable"] == 1
+
+        # Children partition their parent's counts, down to areas
+        for parent, children in [(root, root["floors"])] + [
+            (floor, floor["areas"]) for floor in root["floors"]
+        ]:
+            for key in ("tracked", "low", "unavailable"):
+                assert sum(child[key] for child in children) == parent[key]
+            assert min(
+                child["min_level"] for child in children
+                if child["min_level"] is not None
+            ) == parent["min_level"]
+        assert all("devices" not in area for f in root["floors"] for area in f["areas"])
+
+    @pytest.mark.asyncio
+    async def test_rollup_floor_and_area_placement(self, ws_client):
+        response = await ws_client.send_command("vulcan-brownout/rollup", {})
+        floors = {f["floor_id"]: f for f in response["data"]["floors"]}
+        # Unassigned entities sort after the real floors
+        assert list(floors)[-1] is None
+        ground = {a["name"]: a for a in floors["ground_floor"]["areas"]}
+        assert ground["Garage"]["unavailable"] == 1
+        assert "Bedroom" not in ground
+        assert floors["first_floor"]["unavailable"] == 0
+
+    @pytest.mark.asyncio
+    async def test_rollup_devices_at_depth_three(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/rollup", {"depth": 3}
+        )
+        floors = response["data"]["floors"]
+        devices = [
+            device for floor in floors for area in floor["areas"]
+            for device in area["devices"]
+        ]
+        assert sum(d["tracked"] for d in devices) == response["data"]["tracked"]
+        assert sum(d["unavailable"] for d in devices) == (
+            response["data"]["unavailable"]
+        )
+        for floor in floors:
+            for area in floor["areas"]:
+                levels = [
+                    d["min_level"] for d in area["devices"]
+                    if d["min_level"] is not None
+                ]
+                assert levels == sorted(levels)
+
+        shallow = await ws_client.send_command(
+            "vulcan-brownout/rollup", {"depth": 1}
+        )
+        assert all("areas" not in floor for floor in shallow["data"]["floors"])
+
+    @pytest.mark.asyncio
+    async def test_rollup_rejects_bad_depth(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/rollup", {"depth": 4}
+        )
+        assert response["success"] is False
+
+    @pytest.mark.asyncio
+    async def test_subscribe_rollup_pushes_changes(self, ws_client, mock_ha):
+        response = await ws_client.send_command(
+            "vulcan-brownout/subscribe_rollup", {"depth": 1}
+        )
+        assert response["success"] is True
+        before = response["data"]
+
+        await mock_ha.set_state("sensor.rollup_test_battery", "0", self.BATTERY)
+        message = await ws_client.receive()
+        assert message["type"] == "event"
+        assert message["id"] == response["id"]
+        after = message["event"]
+        assert after["low"] == before["low"] + 1
+        assert after["min_level"] == 0.0
+        unassigned = {f["floor_id"]: f for f in after["floors"]}[None]
+        assert unassigned["min_level"] == 0.0
+
+
+class TestBatteryTypes:
+    """Test vulcan-brownout/battery_types and subscribe_battery_types."""
+
+    @pytest.mark.asyncio
+    async def test_counts_devices_by_type(self, ws_client):
+        response = await ws_client.send_command("vulcan-brownout/battery_types", {})
+        assert response["success"] is True
+        data = response["data"]
+        rows = {
+            (row["battery_type"], row["battery_quantity"]): row
+            for row in data["types"]
+        }
+        # One row per device, not per entity (pairs share a device)
+        assert rows[("AA", 4)] == {
+            "battery_type": "AA", "battery_quantity": 4,
+            "devices": 2, "low": 2, "critical": 1, "batteries": 8,
+        }
+        assert rows[("CR2032", 1)]["devices"] == 3
+        assert rows[("CR2032", 1)]["critical"] == 2
+        # The low binary sensor has no battery_type
+        assert rows[(None, None)]["devices"] == 1
+        assert rows[(None, None)]["batteries"] is None
+        # Most batteries first, untyped devices last
+        assert [row["battery_type"] for row in data["types"]] == ["AA", "CR2032", None]
+        assert data["devices"] == sum(row["devices"] for row in data["types"])
+        assert data["batteries"] == 11
+
+    @pytest.mark.asyncio
+    async def test_battery_types_in_batch(self, ws_client):
+        direct = await ws_client.send_command("vulcan-brownout/battery_types", {})
+        response = await ws_client.send_command(
+            "vulcan-brownout/batch",
+            {"commands": [{"type": "vulcan-brownout/battery_types"}]},
+        )
+        assert response["success"] is True
+        assert response["data"]["results"][0]["result"] == direct["data"]
+
+    @pytest.mark.asyncio
+    async def test_subscribe_battery_types_pushes_changes(self, ws_client, mock_ha):
+        response = await ws_client.send_command(
+            "vulcan-brownout/subscribe_battery_types", {}
+        )
+        assert response["success"] is True
+        before = response["data"]
+
+        await mock_ha.set_state(
+            "sensor.remote_battery", "3",
+            {"device_class": "battery", "battery_type": "AAA", "battery_quantity": 2},
+        )
+        message = await ws_client.receive()
+        assert message["type"] == "event"
+        assert message["id"] == response["id"]
+        after = message["event"]
+        assert after["devices"] == before["devices"] + 1
+        assert {
+            "battery_type": "AAA", "battery_quantity": 2,
+            "devices": 1, "low": 1, "critical": 1, "batteries": 2,
+        } in after["types"]
 
 
 class TestSubscribe:
@@ -259,13 +1291,26 @@ class TestQueryUnavailable:
         await client.close()
 
     @pytest.mark.asyncio
-    async def test_query_unavailable_excludes_binary_sensors(self, ws_client):
-        """Binary sensors must never appear in unavailable results."""
-        response = await ws_client.send_command("vulcan-brownout/query_unavailable", {})
+    async def test_query_unavailable_fields_projection(self, ws_client):
+        response = await ws_client.send_command(
+            "vulcan-brownout/query_unavailable", {"fields": ["entity_id", "state"]}
+        )
         assert response["success"] is True
 
         for entity in response["data"]["entities"]:
-            assert not entity["entity_id"].startswith("binary_sensor.")
+            assert set(entity) <= {"entity_id", "state"}
+
+    @pytest.mark.asyncio
+    async def test_query_unavailable_includes_binary_sensors(self, ws_client, mock_ha):
+        """Unavailable binary battery sensors are listed like numeric ones."""
+        await mock_ha.set_state(
+            "binary_sensor.battery_low_002", "unavailable", {"device_class": "battery"}
+        )
+        response = await ws_client.send_command("vulcan-brownout/query_unavailable", {})
+        assert response["success"] is True
+
+        ids = [entity["entity_id"] for entity in response["data"]["entities"]]
+        assert "binary_sensor.battery_low_002" in ids
 
     @pytest.mark.asyncio
     async def test_query_unavailable_no_numeric_entities(self, ws_client):
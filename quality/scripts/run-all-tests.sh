@@ -30,6 +30,22 @@ PYTHON_FILES=(
     "$PROJECT_ROOT/quality/integration-tests/mock_fixtures.py"
     "$PROJECT_ROOT/.github/docker/mock_ha/server.py"
     "$PROJECT_ROOT/.github/docker/mock_ha/fixtures.py"
+    "$PROJECT_ROOT/quality/unit-tests/conftest.py"
+    "$PROJECT_ROOT/quality/unit-tests/test_sorted_index.py"
+    "$PROJECT_ROOT/quality/unit-tests/test_change_log.py"
+    "$PROJECT_ROOT/quality/unit-tests/test_search_index.py"
+    "$PROJECT_ROOT/quality/unit-tests/test_aggregates.py"
+    "$PROJECT_ROOT/quality/unit-tests/test_rollup.py"
+    "$PROJECT_ROOT/quality/unit-tests/test_label_index.py"
+    "$PROJECT_ROOT/quality/unit-tests/test_filters.py"
+    "$PROJECT_ROOT/quality/unit-tests/test_level_store.py"
+    "$PROJECT_ROOT/quality/unit-tests/test_snapshot.py"
+    "$PROJECT_ROOT/quality/unit-tests/test_init.py"
+    "$PROJECT_ROOT/quality/unit-tests/test_battery_entity.py"
+    "$PROJECT_ROOT/quality/unit-tests/test_metadata.py"
+    "$PROJECT_ROOT/quality/unit-tests/test_thresholds.py"
+    "$PROJECT_ROOT/quality/unit-tests/test_config_flow.py"
+    "$PROJECT_ROOT/quality/unit-tests/test_exclusions.py"
 )
 
 # Colors
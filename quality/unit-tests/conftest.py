@@ -0,0 +1,66 @@
+"""pytest configuration for Vulcan Brownout unit tests.
+
+The index and aggregate modules are pure Python. They are loaded from the
+component's source tree as the vulcan_brownout package without running its
+__init__, which imports Home Assistant.
+
+Tests of the Home Assistant facing modules import the component the way
+Home Assistant does, as custom_components.vulcan_brownout, and run on the
+hass fixture of pytest-homeassistant-custom-component; they are skipped
+where that harness isn't installed.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+COMPONENT_DIR = (
+    Path(__file__).resolve().parents[2]
+    / "development" / "src" / "custom_components" / "vulcan_brownout"
+)
+
+if "vulcan_brownout" not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        "vulcan_brownout",
+        COMPONENT_DIR / "__init__.py",
+        submodule_search_locations=[str(COMPONENT_DIR)],
+    )
+    assert _spec is not None
+    sys.modules["vulcan_brownout"] = importlib.util.module_from_spec(_spec)
+
+# Makes custom_components.vulcan_brownout importable and loadable by the
+# hass fixture's integration loader
+sys.path.insert(0, str(COMPONENT_DIR.parents[1]))
+
+
+@pytest.fixture
+def add_battery(hass):
+    """Return a helper that registers a battery entity and sets its state."""
+    from homeassistant.helpers import entity_registry as er
+
+    def add(entity_id, state, attributes=None, **entry):
+        domain, object_id = entity_id.split(".")
+        er.async_get(hass).async_get_or_create(
+            domain, "test", object_id, suggested_object_id=object_id,
+            original_device_class="battery", **entry,
+        )
+        hass.states.async_set(
+            entity_id, state, {"device_class": "battery", **(attributes or {})}
+        )
+
+    return add
+
+
+@pytest.fixture
+def config_entry(hass, enable_custom_integrations):
+    """Return a Vulcan Brownout config entry added to hass, not yet set up."""
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+    entry = MockConfigEntry(
+        domain="vulcan_brownout", title="Vulcan Brownout",
+        unique_id="vulcan_brownout_unique",
+    )
+    entry.add_to_hass(hass)
+    return entry
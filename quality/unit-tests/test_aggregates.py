@@ -0,0 +1,122 @@
+"""Unit tests for the incrementally maintained aggregates.
+
+Usage:
+    pytest quality/unit-tests/test_aggregates.py -v
+"""
+
+from vulcan_brownout.aggregates import (
+    BatteryInventory,
+    DeviceGroup,
+    LevelHistogram,
+    MinTracker,
+)
+
+
+class TestMinTracker:
+    """Lazy-deletion minimum."""
+
+    def test_min_follows_updates_and_discards(self):
+        tracker = MinTracker()
+        tracker.set("a", 30.0)
+        tracker.set("b", 10.0)
+        assert tracker.min() == (10.0, "b")
+
+        tracker.set("b", 50.0)
+        assert tracker.min() == (30.0, "a")
+        tracker.discard("a")
+        assert tracker.min() == (50.0, "b")
+        tracker.discard("b")
+        assert tracker.min() is None
+
+    def test_stale_entries_are_compacted(self):
+        tracker = MinTracker()
+        for value in range(500):
+            tracker.set("a", float(value))
+        assert len(tracker) == 1
+        assert len(tracker._heap) <= 2 * len(tracker) + 65
+        assert tracker.min() == (499.0, "a")
+
+
+class TestLevelHistogram:
+    """Bucket counts overall and per facet."""
+
+    def test_buckets_and_moves(self):
+        histogram = LevelHistogram(10.0, ("model",))
+        histogram.set("a", 5.0, ("m1",))
+        histogram.set("b", 100.0, ("m1",))
+        histogram.set("c", 55.0, (None,))
+        assert histogram.counts[0] == 1
+        assert histogram.counts[9] == 1
+        assert histogram.counts[5] == 1
+
+        histogram.set("a", 95.0, ("m2",))
+        assert histogram.counts[0] == 0
+        assert histogram.counts[9] == 2
+        assert histogram.facet_counts["model"]["m1"][9] == 1
+        assert histogram.facet_counts["model"]["m2"][9] == 1
+
+    def test_empty_facet_values_are_dropped(self):
+        histogram = LevelHistogram(10.0, ("model",))
+        histogram.set("a", 5.0, ("m1",))
+        histogram.discard("a")
+        histogram.discard("missing")
+        assert len(histogram) == 0
+        assert sum(histogram.counts) == 0
+        assert histogram.facet_counts["model"] == {}
+
+
+class TestDeviceGroup:
+    """Per-device member rollup."""
+
+    def test_low_members_and_min_level(self):
+        group = DeviceGroup("device")
+        group.set("a", 40.0, False)
+        group.set("b", 5.0, True)
+        group.set("c", -1.0, False)
+        assert len(group) == 3
+        assert group.low == {"b"}
+        assert group.min_level() == 5.0
+
+        group.set("b", 60.0, False)
+        assert group.low == set()
+        assert group.min_level() == 40.0
+        group.discard("a")
+        group.discard("b")
+        assert group.min_level() is None
+
+    def test_low_members_without_a_level_are_flagged(self):
+        group = DeviceGroup("device")
+        group.set("binary", -1.0, True)
+        group.set("numeric", 80.0, False)
+        assert group.flagged == {"binary"}
+        assert group.min_level() == 80.0
+
+        group.set("binary", -1.0, False)
+        assert group.flagged == set()
+        group.set("binary", -1.0, True)
+        group.discard("binary")
+        assert group.flagged == set()
+
+
+class TestBatteryInventory:
+    """Devices needing batteries per (type, quantity)."""
+
+    def test_devices_move_between_specs(self):
+        inventory = BatteryInventory()
+        inventory.set("d1", ("CR2032", 1), True, False)
+        inventory.set("d2", ("CR2032", 1), True, True)
+        assert inventory.counts == {("CR2032", 1): [2, 2, 1]}
+
+        revision = inventory.revision
+        inventory.set("d2", ("CR2032", 1), True, True)
+        assert inventory.revision == revision
+
+        inventory.set("d1", ("AA", 2), True, False)
+        assert inventory.counts == {("CR2032", 1): [1, 1, 1], ("AA", 2): [1, 1, 0]}
+
+    def test_neither_low_nor_critical_removes(self):
+        inventory = BatteryInventory()
+        inventory.set("d1", (None, None), True, False)
+        inventory.set("d1", (None, None), False, False)
+        assert len(inventory) == 0
+        assert inventory.counts == {}
@@ -0,0 +1,145 @@
+"""Unit tests for the BatteryEntity record and its cached row encoding.
+
+Usage:
+    pytest quality/unit-tests/test_battery_entity.py -v
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.core import State  # noqa: E402
+from homeassistant.helpers.json import json_bytes  # noqa: E402
+
+from custom_components.vulcan_brownout.battery_monitor import (  # noqa: E402
+    BatteryEntity,
+    BatteryMonitor,
+)
+from custom_components.vulcan_brownout.metadata import (  # noqa: E402
+    AreaMetadata,
+    DeviceMetadata,
+    MetadataTable,
+)
+from custom_components.vulcan_brownout.thresholds import (  # noqa: E402
+    ThresholdPolicy,
+)
+
+
+def _state(entity_id, value, **attributes):
+    return State(entity_id, value, {"device_class": "battery", **attributes})
+
+
+class TestBatteryEntity:
+    """Compact record built from a State."""
+
+    def test_keeps_only_allow_listed_attributes(self):
+        state = _state(
+            "sensor.lock_battery", "42",
+            friendly_name="Lock", battery_type="CR2032",
+            firmware_dump="x" * 10_000,
+        )
+        entity = BatteryEntity("sensor.lock_battery", state)
+        assert entity.attributes == {
+            "device_class": "battery", "friendly_name": "Lock",
+            "battery_type": "CR2032",
+        }
+        # battery_type feeds the inventory but isn't sent to clients
+        assert entity.allowed_attributes() == {
+            "device_class": "battery", "friendly_name": "Lock",
+        }
+        assert entity.last_changed is state.last_changed
+        assert not hasattr(entity, "__dict__")
+
+    @pytest.mark.parametrize(
+        ("value", "level"),
+        [("42.5", 42.5), ("120", 100.0), ("-3", 0.0), ("abc", -1.0),
+         ("unavailable", -1.0)],
+    )
+    def test_level_parsing(self, value, level):
+        entity = BatteryEntity("sensor.a", _state("sensor.a", value))
+        assert entity.battery_level == level
+
+    def test_binary_sensor_has_no_level(self):
+        entity = BatteryEntity(
+            "binary_sensor.a_low", _state("binary_sensor.a_low", "on")
+        )
+        assert entity.is_binary
+        assert entity.level is None
+        assert entity.to_dict(["battery_level", "state"]) == {
+            "battery_level": None, "state": "on",
+        }
+
+    def test_metadata_comes_from_shared_records(self):
+        hall = AreaMetadata("hall", "Hall", "ground")
+        garage = AreaMetadata("garage", "Garage", "ground")
+        device = DeviceMetadata("d1", "Front Door Lock", "Acme", "L1", hall)
+        state = _state("sensor.a", "9", friendly_name="Fallback")
+
+        entity = BatteryEntity("sensor.a", state, device)
+        assert (entity.device_name, entity.model, entity.area_name) == (
+            "Front Door Lock", "L1", "Hall",
+        )
+        assert BatteryEntity("sensor.a", state, device, garage).area_name == "Garage"
+        assert BatteryEntity("sensor.a", state).device_name == "Fallback"
+
+    async def test_snapshot_round_trip(self, hass):
+        metadata = MetadataTable(hass)
+        metadata.load_snapshot({
+            "areas": {"hall": ["Hall", "ground"], "garage": ["Garage", None]},
+            "devices": {"d1": ["Front Door Lock", "Acme", "L1", "hall"]},
+        })
+        entity = BatteryEntity(
+            "sensor.a", _state("sensor.a", "9", friendly_name="Lock"),
+            metadata.devices["d1"], metadata.areas["garage"],
+        )
+
+        record = entity.to_snapshot()
+        restored = BatteryEntity.from_snapshot(record, metadata)
+        assert restored.to_snapshot() == record
+        assert restored.device is metadata.devices["d1"]
+        assert restored.area_override is metadata.areas["garage"]
+        assert restored.last_changed == entity.last_changed
+        assert (restored.battery_level, restored.slot, restored.attributes) == (
+            9.0, -1, {},
+        )
+
+
+class TestEncodedRow:
+    """Per-entity cache of the serialized row."""
+
+    def test_encoding_is_cached_until_invalidated(self):
+        entity = BatteryEntity("sensor.a", _state("sensor.a", "9"))
+        encoded = entity.encoded()
+        assert json.loads(encoded) == json.loads(json_bytes(entity.to_dict()))
+        assert entity.encoded() is encoded
+
+        entity.invalidate()
+        assert entity.encoded() is not encoded
+        assert entity.encoded() == encoded
+
+    def test_fragment_embeds_the_cached_row(self):
+        entity = BatteryEntity("sensor.a", _state("sensor.a", "9"))
+        payload = json_bytes({"entities": [entity.as_fragment()], "total": 1})
+        assert json.loads(payload) == {
+            "entities": [json.loads(json_bytes(entity.to_dict()))], "total": 1,
+        }
+
+    async def test_monitor_rows_follow_threshold_changes(self, hass, add_battery):
+        add_battery("sensor.a", "20")
+        monitor = BatteryMonitor(hass)
+        await monitor.discover_entities()
+        entity = monitor.entities["sensor.a"]
+        assert json.loads(entity.encoded())["status"] == "watch"
+
+        monitor.set_thresholds(ThresholdPolicy(25, tiers={"watch": 10}))
+        result = await monitor.query_entities()
+        rows = json.loads(json_bytes(result))["entities"]
+        assert [(row["entity_id"], row["status"]) for row in rows] == [
+            ("sensor.a", "ok"),
+        ]
+
+        projected = list(monitor.encoded_rows([entity], ["entity_id"]))
+        assert projected == [json_bytes({"entity_id": "sensor.a"})]
+        assert list(monitor.encoded_rows([entity])) == [entity.encoded()]
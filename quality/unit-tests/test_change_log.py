@@ -0,0 +1,43 @@
+"""Unit tests for the change log behind query_changes.
+
+Usage:
+    pytest quality/unit-tests/test_change_log.py -v
+"""
+
+from vulcan_brownout.change_log import ChangeLog
+
+
+class TestChangeLog:
+    """ChangeLog ranges, folding and eviction."""
+
+    def test_since_folds_changes_per_entity(self):
+        log = ChangeLog(10)
+        log.record(1, "a", False, True)
+        log.record(2, "a", True, True)
+        log.record(3, "b", True, False)
+        log.record(4, "a", True, False)
+
+        assert log.since(0) == {"a": (False, False), "b": (True, False)}
+        assert log.since(1) == {"a": (True, False), "b": (True, False)}
+        assert log.since(4) == {}
+
+    def test_eviction_raises_the_floor(self):
+        log = ChangeLog(2)
+        log.record(1, "a", False, True)
+        log.record(2, "b", False, True)
+        assert log.floor == 0
+        log.record(3, "c", False, True)
+
+        assert len(log) == 2
+        assert log.floor == 1
+        assert log.since(0) is None
+        assert log.since(1) == {"b": (False, True), "c": (False, True)}
+
+    def test_reset_truncates_history(self):
+        log = ChangeLog(10)
+        log.record(1, "a", False, True)
+        log.reset(7)
+
+        assert len(log) == 0
+        assert log.since(6) is None
+        assert log.since(7) == {}
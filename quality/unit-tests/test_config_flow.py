@@ -0,0 +1,160 @@
+"""Unit tests for the options flow and its live application.
+
+Usage:
+    pytest quality/unit-tests/test_config_flow.py -v
+"""
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.data_entry_flow import FlowResultType  # noqa: E402
+
+from custom_components.vulcan_brownout.const import (  # noqa: E402
+    CONF_ENTITY_THRESHOLDS,
+    CONF_EXCLUDE_DEVICES,
+    CONF_EXCLUDE_ENTITIES,
+    CONF_GLOBAL_THRESHOLD,
+    CONF_MODEL_THRESHOLDS,
+    CONF_SEVERITY_TIERS,
+    DOMAIN,
+    STATUS_CRITICAL,
+    STATUS_WARNING,
+)
+
+
+async def _setup(hass, entry):
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return hass.data[DOMAIN]
+
+
+async def _submit(hass, entry, user_input):
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "init"
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input
+    )
+    await hass.async_block_till_done()
+    return result
+
+
+class TestOptionsFlow:
+    """Options are validated, saved and applied without a reload."""
+
+    async def test_thresholds_are_saved_and_applied(
+        self, hass, add_battery, config_entry
+    ):
+        add_battery("sensor.lock_battery", "20")
+        add_battery("sensor.remote_battery", "35")
+        monitor = await _setup(hass, config_entry)
+        assert monitor.low_count == 0
+
+        result = await _submit(hass, config_entry, {
+            CONF_GLOBAL_THRESHOLD: 25,
+            CONF_ENTITY_THRESHOLDS: {"sensor.remote_battery": 40},
+        })
+        assert result["type"] is FlowResultType.CREATE_ENTRY
+        assert config_entry.options[CONF_GLOBAL_THRESHOLD] == 25.0
+        assert config_entry.options[CONF_ENTITY_THRESHOLDS] == {
+            "sensor.remote_battery": 40.0,
+        }
+        # Applied by the update listener to the same monitor
+        assert hass.data[DOMAIN] is monitor
+        assert monitor.thresholds.default == 25.0
+        assert monitor.entities["sensor.remote_battery"].threshold == 40.0
+        assert monitor.low_count == 2
+
+    async def test_invalid_input_shows_the_form_again(
+        self, hass, add_battery, config_entry
+    ):
+        add_battery("sensor.lock_battery", "20")
+        monitor = await _setup(hass, config_entry)
+
+        result = await _submit(hass, config_entry, {
+            CONF_GLOBAL_THRESHOLD: 20,
+            CONF_MODEL_THRESHOLDS: {"L1": 150},
+        })
+        assert result["type"] is FlowResultType.FORM
+        assert result["errors"] == {"base": "invalid_threshold"}
+        assert config_entry.options == {}
+        assert monitor.thresholds.models == {}
+
+    async def test_cleared_override_is_removed(
+        self, hass, add_battery, config_entry
+    ):
+        add_battery("sensor.lock_battery", "20")
+        monitor = await _setup(hass, config_entry)
+        await _submit(hass, config_entry, {
+            CONF_GLOBAL_THRESHOLD: 15,
+            CONF_ENTITY_THRESHOLDS: {"sensor.lock_battery": 30},
+        })
+        assert monitor.low_count == 1
+
+        # The cleared field is absent from the submission
+        await _submit(hass, config_entry, {CONF_GLOBAL_THRESHOLD: 15})
+        assert config_entry.options[CONF_ENTITY_THRESHOLDS] == {}
+        assert monitor.thresholds.entities == {}
+        assert monitor.low_count == 0
+
+    async def test_tiers_are_saved_and_applied(
+        self, hass, add_battery, config_entry
+    ):
+        add_battery("sensor.lock_battery", "8")
+        monitor = await _setup(hass, config_entry)
+        assert monitor.entities["sensor.lock_battery"].tier == STATUS_WARNING
+
+        result = await _submit(hass, config_entry, {
+            CONF_GLOBAL_THRESHOLD: 15,
+            CONF_SEVERITY_TIERS: {STATUS_CRITICAL: 10},
+        })
+        assert result["type"] is FlowResultType.CREATE_ENTRY
+        assert monitor.entities["sensor.lock_battery"].tier == STATUS_CRITICAL
+
+        result = await _submit(hass, config_entry, {
+            CONF_GLOBAL_THRESHOLD: 15,
+            CONF_SEVERITY_TIERS: {STATUS_CRITICAL: 20},
+        })
+        assert result["errors"] == {"base": "invalid_threshold"}
+        assert monitor.entities["sensor.lock_battery"].tier == STATUS_CRITICAL
+
+    async def test_exclusions_are_saved_and_applied(
+        self, hass, add_battery, config_entry
+    ):
+        add_battery("sensor.lock_battery", "8")
+        add_battery("sensor.phone_battery", "9")
+        add_battery("sensor.watch_battery", "unavailable")
+        monitor = await _setup(hass, config_entry)
+        assert monitor.low_count == 2
+
+        result = await _submit(hass, config_entry, {
+            CONF_GLOBAL_THRESHOLD: 15,
+            CONF_EXCLUDE_ENTITIES: ["sensor.phone_*", "sensor.watch_*"],
+        })
+        assert result["type"] is FlowResultType.CREATE_ENTRY
+        assert config_entry.options[CONF_EXCLUDE_ENTITIES] == [
+            "sensor.phone_*", "sensor.watch_*",
+        ]
+        assert config_entry.options[CONF_EXCLUDE_DEVICES] == []
+        assert set(monitor.entities) == {"sensor.lock_battery"}
+        assert monitor.unavailable == set()
+        assert monitor.excluded == {"sensor.phone_battery", "sensor.watch_battery"}
+        assert monitor.low_count == 1
+
+        # Excluded entities stay out on later state events
+        hass.states.async_set(
+            "sensor.phone_battery", "3", {"device_class": "battery"}
+        )
+        await hass.async_block_till_done()
+        assert "sensor.phone_battery" not in monitor.entities
+
+        # Clearing the rules re-admits them
+        await _submit(hass, config_entry, {CONF_GLOBAL_THRESHOLD: 15})
+        assert set(monitor.entities) == {
+            "sensor.lock_battery", "sensor.phone_battery",
+        }
+        assert monitor.entities["sensor.phone_battery"].battery_level == 3.0
+        assert monitor.unavailable == {"sensor.watch_battery"}
+        assert monitor.excluded == set()
+        assert monitor.low_count == 2
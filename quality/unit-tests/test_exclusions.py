@@ -0,0 +1,67 @@
+"""Unit tests for the compiled exclusion rules and their options schema.
+
+Usage:
+    pytest quality/unit-tests/test_exclusions.py -v
+"""
+
+import pytest
+
+vol = pytest.importorskip("voluptuous")
+
+from vulcan_brownout.const import (  # noqa: E402
+    CONF_EXCLUDE_AREAS,
+    CONF_EXCLUDE_ENTITIES,
+    CONF_EXCLUDE_LABELS,
+)
+from vulcan_brownout.exclusions import ExclusionRules  # noqa: E402
+
+
+class TestExclusionRules:
+    """An entity matching any rule is excluded."""
+
+    def test_empty_rules_match_nothing(self):
+        rules = ExclusionRules()
+        assert not rules
+        assert not rules.matches("sensor.lock_battery", "zha", "d1", "hall", ["x"])
+
+    @pytest.mark.parametrize(
+        ("entity_id", "excluded"),
+        [
+            ("sensor.phone_battery", True),
+            ("sensor.phone_backup_battery", True),
+            ("sensor.spare_lock_battery", True),
+            ("sensor.lock_battery", False),
+            # Globs match the whole entity id
+            ("sensor.lock_battery_phone", False),
+        ],
+    )
+    def test_globs(self, entity_id, excluded):
+        rules = ExclusionRules(globs=["sensor.phone_*", "sensor.spare_?ock_*"])
+        assert rules.matches(entity_id) is excluded
+
+    def test_each_rule_kind(self):
+        rules = ExclusionRules(
+            platforms=["mobile_app"], devices=["d1"], areas=["garage"],
+            labels=["ignore"],
+        )
+        assert rules
+        assert rules.matches("sensor.a", platform="mobile_app")
+        assert rules.matches("sensor.a", device_id="d1")
+        assert rules.matches("sensor.a", area_id="garage")
+        assert rules.matches("sensor.a", labels={"spare", "ignore"})
+        assert not rules.matches("sensor.a", "zha", "d2", "hall", {"spare"})
+        assert not rules.matches("sensor.a")
+
+    def test_from_options(self):
+        rules = ExclusionRules.from_options({
+            CONF_EXCLUDE_ENTITIES: ["sensor.phone_*"],
+            CONF_EXCLUDE_AREAS: ["garage"],
+            "global_threshold": 15,
+        })
+        assert rules == ExclusionRules(globs=["sensor.phone_*"], areas=["garage"])
+        assert rules != ExclusionRules(globs=["sensor.phone_*"])
+        assert ExclusionRules.from_options({}) == ExclusionRules()
+
+    def test_from_options_rejects_invalid_values(self):
+        with pytest.raises(vol.Invalid):
+            ExclusionRules.from_options({CONF_EXCLUDE_LABELS: "ignore"})
@@ -0,0 +1,204 @@
+"""Unit tests for filter compilation, planning and the plan cache.
+
+Usage:
+    pytest quality/unit-tests/test_filters.py -v
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from vulcan_brownout.filters import (
+    InvalidFilter,
+    PlanCache,
+    compile_filter,
+    legacy_filter,
+)
+from vulcan_brownout.aggregates import LevelHistogram
+from vulcan_brownout.label_index import LabelIndex
+from vulcan_brownout.level_store import LevelStore
+from vulcan_brownout.rollup import RollupTree
+from vulcan_brownout.search_index import TrigramIndex
+from vulcan_brownout.sorted_index import SortedIndex
+
+
+def _monitor():
+    """Index stand-ins for four entities; a and b are critical and low."""
+    rows = {
+        "a": ("critical", 3.0, ["outdoor"], ("f1", "garden", "d1"), "Garden Gate"),
+        "b": ("critical", 8.0, [], ("f1", "hall", "d2"), "Hall Motion"),
+        "c": ("warning", 30.0, ["outdoor"], ("f2", "garage", "d3"), "Garage Door"),
+        "d": ("ok", 90.0, ["indoor"], ("f2", "hall2", "d4"), "Hall Lamp"),
+    }
+    tier_indexes = {
+        tier: SortedIndex() for tier in ("critical", "warning", "watch", "ok")
+    }
+    low = SortedIndex()
+    labels = LabelIndex()
+    rollup = RollupTree()
+    search = TrigramIndex()
+    histogram = LevelHistogram(5.0, ())
+    levels = LevelStore()
+    entities = {}
+    for entity_id, (tier, level, label_ids, path, name) in rows.items():
+        tier_indexes[tier].set(entity_id, (level, entity_id))
+        if tier == "critical":
+            low.set(entity_id, (level, entity_id))
+        labels.set(entity_id, label_ids)
+        rollup.set(entity_id, path, level, tier == "critical")
+        search.set(entity_id, name)
+        histogram.set(entity_id, level, ())
+        levels.set(levels.allocate(entity_id), level, 15.0, False)
+        entities[entity_id] = SimpleNamespace(battery_level=level)
+    return SimpleNamespace(
+        tier_indexes=tier_indexes,
+        sort_indexes={"level": low},
+        label_index=labels,
+        rollup=rollup,
+        search_index=search,
+        histogram=histogram,
+        levels=levels,
+        entities=entities,
+    )
+
+
+class TestCanonicalization:
+    """Equivalent expressions compile to one canonical form."""
+
+    def test_operand_order_nesting_and_duplicates(self):
+        first = compile_filter({"and": [
+            {"label": "outdoor"},
+            {"and": [{"tier": "critical"}, {"label": "outdoor"}]},
+        ]})
+        second = compile_filter({"and": [{"tier": "critical"}, {"label": "outdoor"}]})
+        assert first.canonical == second.canonical
+        assert json.loads(first.canonical) == {
+            "and": [{"label": "outdoor"}, {"tier": "critical"}]
+        }
+
+    def test_double_negation_and_single_operand(self):
+        plan = compile_filter({"not": {"not": {"or": [{"area": "hall"}]}}})
+        assert json.loads(plan.canonical) == {"area": "hall"}
+
+    @pytest.mark.parametrize(
+        "expression",
+        [
+            {},
+            {"tier": "critical", "label": "x"},
+            {"tier": "unknown"},
+            {"low": False},
+            {"below": True},
+            {"below": 101},
+            {"label": ""},
+            {"search": "  "},
+            {"color": "red"},
+            {"and": []},
+            {"or": {"label": "x"}},
+        ],
+    )
+    def test_invalid_expressions(self, expression):
+        with pytest.raises(InvalidFilter):
+            compile_filter(expression)
+
+    def test_depth_and_term_limits(self):
+        nested = {"label": "x"}
+        for _ in range(20):
+            nested = {"not": {"and": [nested, {"label": "y"}]}}
+        with pytest.raises(InvalidFilter):
+            compile_filter(nested)
+        with pytest.raises(InvalidFilter):
+            compile_filter({"or": [{"label": str(i)} for i in range(100)]})
+
+    def test_legacy_filter(self):
+        assert legacy_filter() is None
+        assert legacy_filter(labels=["a"]) == {"or": [{"label": "a"}]}
+        assert legacy_filter({"tier": "ok"}, ["a"]) == {
+            "and": [{"tier": "ok"}, {"or": [{"label": "a"}]}]
+        }
+
+
+class TestPlan:
+    """Running a compiled plan against the indexes."""
+
+    def test_select_within_scope(self):
+        monitor = _monitor()
+        everyone = SortedIndex()
+        for entity_id in monitor.entities:
+            everyone.set(entity_id, (entity_id,))
+
+        plan = compile_filter({"label": "outdoor"})
+        assert set(plan.select(monitor, everyone)) == {"a", "c"}
+        assert set(plan.select(monitor, monitor.sort_indexes["level"])) == {"a"}
+
+    def test_per_candidate_terms(self):
+        monitor = _monitor()
+        everyone = SortedIndex()
+        for entity_id in monitor.entities:
+            everyone.set(entity_id, (entity_id,))
+
+        plan = compile_filter({"and": [{"floor": "f2"}, {"below": 50}]})
+        assert set(plan.select(monitor, everyone)) == {"c"}
+        plan = compile_filter({"not": {"search": "hall"}})
+        assert set(plan.select(monitor, everyone)) == {"a", "c"}
+
+    def test_below_selects_from_the_level_store(self):
+        monitor = _monitor()
+        everyone = SortedIndex()
+        for entity_id in monitor.entities:
+            everyone.set(entity_id, (entity_id,))
+
+        plan = compile_filter({"below": 10})
+        # Histogram buckets [0, 5) and [5, 10) hold a and b
+        assert plan._root.estimate(monitor) == 2
+        assert set(plan.select(monitor, everyone)) == {"a", "b"}
+        plan = compile_filter({"and": [{"below": 5}, {"label": "outdoor"}]})
+        assert set(plan.select(monitor, everyone)) == {"a"}
+
+    def test_contains_matches_select(self):
+        monitor = _monitor()
+        plan = compile_filter({"or": [
+            {"and": [{"low": True}, {"search": "gar"}]},
+            {"label": "indoor"},
+        ]})
+        assert {
+            entity_id for entity_id in monitor.entities
+            if plan.contains(monitor, entity_id)
+        } == {"a", "d"}
+
+
+class TestPlanCache:
+    """LRU cache of compiled plans."""
+
+    def test_hits_misses_and_eviction(self):
+        cache = PlanCache(2)
+        first = cache.get({"label": "a"})
+        assert cache.get({"label": "a"}) is first
+        cache.get({"label": "b"})
+        cache.get({"label": "c"})
+
+        assert (cache.hits, cache.misses) == (1, 3)
+        assert len(cache) == 2
+        assert cache.get({"label": "a"}) is not first
+
+    def test_equivalent_expressions_share_a_plan(self):
+        cache = PlanCache(4)
+        first = cache.get({"and": [{"label": "a"}, {"tier": "critical"}]})
+        second = cache.get({"and": [{"tier": "critical"}, {"label": "a"}]})
+        third = cache.get({"and": [{"label": "a"}, {"and": [{"tier": "critical"}]}]})
+
+        assert second is first
+        assert third is first
+        assert (cache.hits, cache.misses) == (2, 1)
+        assert len(cache) == 1
+
+    def test_plan_outlives_its_alias(self):
+        cache = PlanCache(1)
+        first = cache.get({"or": [{"label": "a"}, {"label": "b"}]})
+        assert cache.get({"or": [{"label": "b"}, {"label": "a"}]}) is first
+        assert cache.get({"or": [{"label": "a"}, {"label": "b"}]}) is first
+        assert cache.misses == 1
+
+    def test_non_json_expression(self):
+        with pytest.raises(InvalidFilter):
+            PlanCache(2).get({"label": {1, 2}})
@@ -0,0 +1,91 @@
+"""Unit tests for config entry setup, unload and the reload handoff.
+
+Usage:
+    pytest quality/unit-tests/test_init.py -v
+"""
+
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.util import dt as dt_util  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    async_fire_time_changed,
+)
+
+from custom_components.vulcan_brownout.const import (  # noqa: E402
+    DOMAIN,
+    HANDOFF_MAX_AGE,
+)
+
+HANDOFF = f"{DOMAIN}_handoff"
+
+
+async def _setup(hass, entry):
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return hass.data[DOMAIN]
+
+
+async def _unload(hass, entry):
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+class TestHandoff:
+    """Unloading parks the index for the next setup."""
+
+    async def test_unload_detaches_the_state_listener(
+        self, hass, add_battery, config_entry
+    ):
+        add_battery("sensor.lock_battery", "40")
+        monitor = await _setup(hass, config_entry)
+        await _unload(hass, config_entry)
+        assert DOMAIN not in hass.data
+        assert hass.data[HANDOFF][1] is monitor
+
+        version = monitor.version
+        hass.states.async_set("sensor.lock_battery", "3", {"device_class": "battery"})
+        await hass.async_block_till_done()
+        assert monitor.entities["sensor.lock_battery"].battery_level == 40.0
+        assert monitor.version == version
+
+    async def test_setup_adopts_and_reconciles_the_handoff(
+        self, hass, add_battery, config_entry
+    ):
+        add_battery("sensor.lock_battery", "40")
+        add_battery("sensor.remote_battery", "70")
+        monitor = await _setup(hass, config_entry)
+        await _unload(hass, config_entry)
+
+        # Changes while no listener was attached
+        hass.states.async_set("sensor.lock_battery", "3", {"device_class": "battery"})
+        hass.states.async_set(
+            "sensor.remote_battery", "unavailable", {"device_class": "battery"}
+        )
+        add_battery("sensor.new_battery", "12")
+
+        assert await _setup(hass, config_entry) is monitor
+        assert HANDOFF not in hass.data
+        assert set(monitor.entities) == {"sensor.lock_battery", "sensor.new_battery"}
+        assert monitor.entities["sensor.lock_battery"].battery_level == 3.0
+        assert monitor.unavailable == {"sensor.remote_battery"}
+        assert monitor.low_count == 2
+
+    async def test_unadopted_handoff_expires(self, hass, add_battery, config_entry):
+        add_battery("sensor.lock_battery", "40")
+        await _setup(hass, config_entry)
+        await _unload(hass, config_entry)
+        assert HANDOFF in hass.data
+
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + timedelta(seconds=HANDOFF_MAX_AGE + 1)
+        )
+        await hass.async_block_till_done()
+        assert HANDOFF not in hass.data
+
+        # Without a handoff, setup rebuilds the index
+        monitor = await _setup(hass, config_entry)
+        assert set(monitor.entities) == {"sensor.lock_battery"}
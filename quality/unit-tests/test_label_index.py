@@ -0,0 +1,39 @@
+"""Unit tests for the label index.
+
+Usage:
+    pytest quality/unit-tests/test_label_index.py -v
+"""
+
+from vulcan_brownout.label_index import LabelIndex
+
+
+class TestLabelIndex:
+    """Label postings."""
+
+    def test_set_reports_changes_and_moves_postings(self):
+        index = LabelIndex()
+        assert index.set("a", ["outdoor", "zigbee"]) is True
+        assert index.set("a", ["zigbee", "outdoor"]) is False
+        assert index.set("b", ["outdoor"]) is True
+        assert index.members("outdoor") == {"a", "b"}
+        assert index.count("zigbee") == 1
+
+        assert index.set("a", ["indoor"]) is True
+        assert index.members("outdoor") == {"b"}
+        assert index.count("zigbee") == 0
+        assert index.labels_of("a") == {"indoor"}
+
+    def test_entity_without_labels_is_indexed(self):
+        index = LabelIndex()
+        index.set("a", [])
+        assert "a" in index
+        assert index.labels_of("a") == frozenset()
+
+    def test_discard(self):
+        index = LabelIndex()
+        index.set("a", ["outdoor"])
+        index.discard("a")
+        index.discard("missing")
+        assert len(index) == 0
+        assert index.count("outdoor") == 0
+        assert index.labels_of("a") == frozenset()
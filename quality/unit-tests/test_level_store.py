@@ -0,0 +1,74 @@
+"""Unit tests for the columnar level store, with and without NumPy.
+
+Usage:
+    pytest quality/unit-tests/test_level_store.py -v
+"""
+
+import pytest
+
+from vulcan_brownout import level_store
+from vulcan_brownout.level_store import LevelStore
+
+
+@pytest.fixture(params=["numpy", "python"])
+def store(request, monkeypatch):
+    """An empty store scanned through NumPy or the pure-Python fallback."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(level_store, "np", None)
+    return LevelStore()
+
+
+def _fill(store, rows):
+    """Allocate and write (entity_id, level, threshold, pinned) rows."""
+    slots = {}
+    for entity_id, level, threshold, pinned in rows:
+        slots[entity_id] = store.allocate(entity_id)
+        store.set(slots[entity_id], level, threshold, pinned)
+    return slots
+
+
+class TestLevelStore:
+    """Slot bookkeeping and vectorized scans."""
+
+    def test_below_skips_missing_levels(self, store):
+        _fill(store, [
+            ("a", 3.0, 15.0, False),
+            ("b", 14.99, 15.0, False),
+            ("c", 15.0, 15.0, False),
+            ("binary", None, 15.0, False),
+            ("broken", -1.0, 15.0, False),
+        ])
+        assert sorted(store.below(15.0)) == ["a", "b"]
+        assert store.below(0.0) == []
+
+    def test_released_slots_are_reused_and_skipped(self, store):
+        slots = _fill(store, [("a", 3.0, 15.0, False), ("b", 4.0, 15.0, False)])
+        store.release(slots["a"])
+        assert len(store) == 1
+        assert store.below(50.0) == ["b"]
+
+        assert store.allocate("c") == slots["a"]
+        assert len(store) == 2
+
+    def test_moved_by_a_new_default(self, store):
+        _fill(store, [
+            ("a", 10.0, 15.0, False),
+            ("pinned", 10.0, 25.0, True),
+            ("binary", None, 15.0, False),
+        ])
+        bounds = (5.0, 15.0, 30.0)
+        assert sorted(store.moved(20.0, bounds, bounds)) == ["a", "binary"]
+        assert store.moved(15.0, bounds, bounds) == []
+
+    def test_moved_by_new_tier_bounds(self, store):
+        slots = _fill(store, [
+            ("a", 4.0, 15.0, False),
+            ("b", 12.0, 15.0, False),
+            ("c", 50.0, 15.0, False),
+            ("binary", None, 15.0, False),
+        ])
+        store.release(slots["c"])
+        moved = store.moved(15.0, (5.0, 15.0, 30.0), (3.0, 15.0, 30.0))
+        assert moved == ["a"]
@@ -0,0 +1,128 @@
+"""Unit tests for the shared device and area metadata records.
+
+Usage:
+    pytest quality/unit-tests/test_metadata.py -v
+"""
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.helpers import (  # noqa: E402
+    area_registry as ar,
+    device_registry as dr,
+)
+
+from custom_components.vulcan_brownout.const import DOMAIN  # noqa: E402
+from custom_components.vulcan_brownout.metadata import (  # noqa: E402
+    MetadataTable,
+)
+
+
+@pytest.fixture
+def lock(hass, config_entry):
+    """A device in the Hall area."""
+    area = ar.async_get(hass).async_create("Hall")
+    devices = dr.async_get(hass)
+    device = devices.async_get_or_create(
+        config_entry_id=config_entry.entry_id,
+        identifiers={("test", "lock")},
+        name="Front Door Lock", manufacturer="Acme", model="L1",
+    )
+    return devices.async_update_device(device.id, area_id=area.id)
+
+
+class TestMetadataTable:
+    """Flyweight records, resolved once and refreshed in place."""
+
+    async def test_records_are_resolved_once_and_shared(self, hass, lock):
+        table = MetadataTable(hass)
+        record = table.get_device(lock.id)
+        assert table.get_device(lock.id) is record
+        assert record.area is table.get_area(lock.area_id)
+        assert (record.name, record.manufacturer, record.model) == (
+            "Front Door Lock", "Acme", "L1",
+        )
+        assert table.get_device("missing") is None
+        assert table.get_area(None) is None
+
+    async def test_refresh_reports_only_row_changes(self, hass, lock):
+        table = MetadataTable(hass)
+        record = table.get_device(lock.id)
+        devices = dr.async_get(hass)
+
+        devices.async_update_device(lock.id, sw_version="2.0")
+        assert table.refresh_device(lock.id) is False
+
+        devices.async_update_device(lock.id, name="Back Door Lock")
+        assert table.refresh_device(lock.id) is True
+        assert table.get_device(lock.id) is record
+        assert record.name == "Back Door Lock"
+
+        devices.async_remove_device(lock.id)
+        assert table.refresh_device(lock.id) is True
+        assert lock.id not in table.devices
+
+    async def test_removed_area_is_detached_from_devices(self, hass, lock):
+        table = MetadataTable(hass)
+        record = table.get_device(lock.id)
+        area = record.area
+
+        ar.async_get(hass).async_delete(lock.area_id)
+        assert table.refresh_area(lock.area_id) is True
+        assert record.area is None
+        assert area.name is None
+        assert lock.area_id not in table.areas
+
+    async def test_snapshot_round_trip(self, hass, lock):
+        table = MetadataTable(hass)
+        table.get_device(lock.id)
+
+        restored = MetadataTable(hass)
+        restored.load_snapshot(table.to_snapshot())
+        assert restored.to_snapshot() == table.to_snapshot()
+        assert restored.devices[lock.id].area is restored.areas[lock.area_id]
+
+
+class TestMonitorMetadata:
+    """Registry events reach every entity through the shared record."""
+
+    async def test_device_rename_reaches_every_row(
+        self, hass, add_battery, config_entry, lock
+    ):
+        add_battery("sensor.lock_battery", "8", device_id=lock.id)
+        add_battery("sensor.lock_backup_battery", "50", device_id=lock.id)
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+        monitor = hass.data[DOMAIN]
+        first = monitor.entities["sensor.lock_battery"]
+        second = monitor.entities["sensor.lock_backup_battery"]
+        assert first.device is second.device
+        first.encoded()
+
+        version = monitor.version
+        dr.async_get(hass).async_update_device(lock.id, sw_version="2.0")
+        await hass.async_block_till_done()
+        assert monitor.version == version
+
+        dr.async_get(hass).async_update_device(lock.id, name="Back Door Lock")
+        await hass.async_block_till_done()
+        assert monitor.version > version
+        assert {first.device_name, second.device_name} == {"Back Door Lock"}
+        assert first.to_dict(["device_name"]) == {"device_name": "Back Door Lock"}
+        assert b'"Back Door Lock"' in first.encoded()
+
+    async def test_area_rename_reaches_rows_and_search(
+        self, hass, add_battery, config_entry, lock
+    ):
+        add_battery("sensor.lock_battery", "8", device_id=lock.id)
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+        monitor = hass.data[DOMAIN]
+
+        ar.async_get(hass).async_update(lock.area_id, name="Porch")
+        await hass.async_block_till_done()
+        assert monitor.entities["sensor.lock_battery"].area_name == "Porch"
+        assert [
+            item_id for _, item_id in monitor.search_index.search("porch")
+        ] == ["sensor.lock_battery"]
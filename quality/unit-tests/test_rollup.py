@@ -0,0 +1,62 @@
+"""Unit tests for the floor → area → device rollup tree.
+
+Usage:
+    pytest quality/unit-tests/test_rollup.py -v
+"""
+
+from vulcan_brownout.rollup import RollupTree
+
+
+class TestRollupTree:
+    """Floor → area → device rollup."""
+
+    def test_counts_and_min_level_along_the_path(self):
+        tree = RollupTree()
+        tree.set("a", ("f1", "kitchen", "d1"), 10.0, True)
+        tree.set("b", ("f1", "kitchen", "d2"), 60.0, False)
+        tree.set("c", ("f1", "hall", "d3"), -1.0, False, is_unavailable=True)
+
+        floor = tree.root.children["f1"]
+        assert (floor.tracked, floor.low, floor.unavailable) == (2, 1, 1)
+        assert floor.min_level() == 10.0
+        assert floor.children["hall"].min_level() is None
+        assert tree.path_of("c") == ("f1", "hall", "d3")
+
+    def test_unavailable_counts_distinct_devices(self):
+        tree = RollupTree()
+        tree.set("a", ("f1", "hall", "d1"), -1.0, False, is_unavailable=True)
+        tree.set("b", ("f1", "hall", "d1"), -1.0, False, is_unavailable=True)
+        tree.set("c", ("f1", "hall", "c"), -1.0, False, is_unavailable=True)
+        assert tree.root.children["f1"].unavailable == 2
+
+        tree.discard("a")
+        assert tree.root.unavailable == 2
+        tree.set("b", ("f1", "hall", "d1"), 40.0, False)
+        assert tree.root.unavailable == 1
+        assert tree.root.tracked == 1
+
+    def test_moving_an_entity_prunes_its_old_branch(self):
+        tree = RollupTree()
+        tree.set("a", ("f1", "kitchen", "d1"), 10.0, True)
+        tree.set("b", ("f1", "hall", "d2"), 50.0, False)
+
+        tree.set("a", ("f2", "attic", "d1"), 10.0, True)
+        assert set(tree.root.children) == {"f1", "f2"}
+        assert set(tree.root.children["f1"].children) == {"hall"}
+        assert tree.root.children["f1"].min_level() == 50.0
+
+        tree.discard("b")
+        assert set(tree.root.children) == {"f2"}
+        assert tree.root.tracked == 1
+
+    def test_unchanged_contribution_keeps_the_revision(self):
+        tree = RollupTree()
+        tree.set("a", (None, None, "a"), 10.0, True)
+        revision = tree.revision
+        tree.set("a", (None, None, "a"), 10.0, True)
+        assert tree.revision == revision
+
+        tree.discard("a")
+        assert tree.revision == revision + 1
+        assert tree.root.children == {}
+        assert not tree.root
@@ -0,0 +1,51 @@
+"""Unit tests for the trigram search index.
+
+Usage:
+    pytest quality/unit-tests/test_search_index.py -v
+"""
+
+from vulcan_brownout.search_index import TrigramIndex, query_trigrams
+
+
+class TestTrigramIndex:
+    """Trigram matching and ranking."""
+
+    def test_query_words_match_word_prefixes(self):
+        index = TrigramIndex()
+        index.set("sensor.hallway", "Hallway Motion Sensor sensor.hallway")
+        index.set("sensor.kitchen", "Kitchen Door sensor.kitchen")
+
+        assert index.matching(query_trigrams("hall mot")) == {"sensor.hallway"}
+        assert index.matching(query_trigrams("allway")) == set()
+
+    def test_tighter_matches_rank_first(self):
+        index = TrigramIndex()
+        index.set("long", "Hall Motion Sensor Upstairs Landing")
+        index.set("short", "Hall")
+        index.set("other", "Kitchen")
+
+        ranked = index.search("hall")
+        assert [item_id for _, item_id in ranked] == ["short", "long"]
+        assert ranked[0][0] < ranked[1][0]
+
+    def test_ties_rank_by_id(self):
+        index = TrigramIndex()
+        index.set("b", "Hall")
+        index.set("a", "Hall")
+        assert [item_id for _, item_id in index.search("hall")] == ["a", "b"]
+
+    def test_query_without_words(self):
+        index = TrigramIndex()
+        index.set("a", "Hall")
+        assert index.search(" _. ") is None
+
+    def test_set_replaces_old_text_and_discard_cleans_postings(self):
+        index = TrigramIndex()
+        index.set("a", "Hall")
+        index.set("a", "Kitchen")
+        assert index.matching(query_trigrams("hall")) == set()
+        assert index.matching(query_trigrams("kit")) == {"a"}
+
+        index.discard("a")
+        assert len(index) == 0
+        assert index.estimate(query_trigrams("kit")) == 0
@@ -0,0 +1,137 @@
+"""Unit tests for the persisted warm-start snapshot of the battery index.
+
+Usage:
+    pytest quality/unit-tests/test_snapshot.py -v
+"""
+
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.helpers import (  # noqa: E402
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+)
+from homeassistant.util import dt as dt_util  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    async_fire_time_changed,
+)
+
+from custom_components.vulcan_brownout.battery_monitor import (  # noqa: E402
+    BatteryMonitor,
+)
+from custom_components.vulcan_brownout.const import (  # noqa: E402
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
+from custom_components.vulcan_brownout.exclusions import (  # noqa: E402
+    ExclusionRules,
+)
+
+
+@pytest.fixture
+def fleet(hass, add_battery, config_entry):
+    """A lock on a device in the Hall, a device-less remote and a dead sensor."""
+    area = ar.async_get(hass).async_create("Hall")
+    devices = dr.async_get(hass)
+    device = devices.async_get_or_create(
+        config_entry_id=config_entry.entry_id,
+        identifiers={("test", "lock")},
+        name="Front Door Lock", manufacturer="Acme", model="L1",
+    )
+    devices.async_update_device(device.id, area_id=area.id)
+    add_battery("sensor.lock_battery", "8", device_id=device.id)
+    add_battery("sensor.remote_battery", "60")
+    add_battery("sensor.gone_battery", "unavailable")
+
+
+async def _saved_monitor(hass):
+    """Discover the fleet and let the debounced snapshot save run."""
+    monitor = BatteryMonitor(hass)
+    await monitor.discover_entities()
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=SNAPSHOT_SAVE_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+    return monitor
+
+
+class TestSnapshot:
+    """Saving, restoring and validating the snapshot."""
+
+    async def test_restore_serves_the_saved_index(self, hass, hass_storage, fleet):
+        monitor = await _saved_monitor(hass)
+        assert hass_storage[STORAGE_KEY]["version"] == STORAGE_VERSION
+
+        restored = BatteryMonitor(hass)
+        assert await restored.async_load_snapshot() is True
+        assert restored.summary() == monitor.summary()
+        assert restored.unavailable == {"sensor.gone_battery"}
+        entity = restored.entities["sensor.lock_battery"]
+        assert (
+            entity.battery_level, entity.device_name, entity.model,
+            entity.area_name,
+        ) == (8.0, "Front Door Lock", "L1", "Hall")
+        # Entities share the restored device records
+        assert entity.device is restored.metadata.devices[entity.device.device_id]
+
+    async def test_validation_drops_what_went_away(self, hass, hass_storage, fleet):
+        await _saved_monitor(hass)
+        er.async_get(hass).async_remove("sensor.remote_battery")
+        hass.states.async_remove("sensor.remote_battery")
+        hass.states.async_set(
+            "sensor.lock_battery", "55", {"device_class": "battery"}
+        )
+
+        restored = BatteryMonitor(hass)
+        assert await restored.async_load_snapshot() is True
+        assert set(restored.entities) == {
+            "sensor.lock_battery", "sensor.remote_battery",
+        }
+        await restored.async_validate_snapshot()
+        assert set(restored.entities) == {"sensor.lock_battery"}
+        assert restored.entities["sensor.lock_battery"].battery_level == 55.0
+        assert restored.low_count == 0
+
+    async def test_excluded_ids_are_not_restored(self, hass, hass_storage, fleet):
+        await _saved_monitor(hass)
+
+        restored = BatteryMonitor(
+            hass, exclusions=ExclusionRules(globs=["sensor.gone_*", "sensor.remote_*"])
+        )
+        assert await restored.async_load_snapshot() is True
+        assert set(restored.entities) == {"sensor.lock_battery"}
+        assert restored.unavailable == set()
+        assert restored.excluded == {"sensor.gone_battery", "sensor.remote_battery"}
+
+    async def test_old_layout_is_discarded(self, hass, hass_storage):
+        hass_storage[STORAGE_KEY] = {
+            "version": STORAGE_VERSION - 1,
+            "minor_version": 1,
+            "key": STORAGE_KEY,
+            "data": {"version": 4, "entities": [["sensor.a", "10"]]},
+        }
+        monitor = BatteryMonitor(hass)
+        assert await monitor.async_load_snapshot() is False
+        assert monitor.entities == {}
+        assert monitor.version == 0
+
+    async def test_removing_the_entry_deletes_the_snapshot(
+        self, hass, hass_storage, fleet, config_entry
+    ):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + timedelta(seconds=SNAPSHOT_SAVE_DELAY + 1)
+        )
+        await hass.async_block_till_done()
+        assert STORAGE_KEY in hass_storage
+
+        await hass.config_entries.async_remove(config_entry.entry_id)
+        await hass.async_block_till_done()
+        assert STORAGE_KEY not in hass_storage
+        assert "vulcan_brownout_handoff" not in hass.data
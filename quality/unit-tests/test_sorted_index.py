@@ -0,0 +1,114 @@
+"""Unit tests for the sorted indexes and their paging cursors.
+
+Usage:
+    pytest quality/unit-tests/test_sorted_index.py -v
+"""
+
+import base64
+
+import pytest
+
+from vulcan_brownout.sorted_index import (
+    InvalidCursor,
+    SortedIndex,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+class TestSortedIndex:
+    """SortedIndex ordering, moves and keyset paging."""
+
+    def test_set_keeps_order_and_moves_changed_keys(self):
+        index = SortedIndex()
+        index.set("b", (20.0, "b"))
+        index.set("a", (50.0, "a"))
+        index.set("c", (5.0, "c"))
+        assert index.page() == (["c", "b", "a"], None)
+
+        index.set("a", (1.0, "a"))
+        assert index.page()[0] == ["a", "c", "b"]
+        assert len(index) == 3
+
+    def test_discard(self):
+        index = SortedIndex()
+        index.set("a", (1.0, "a"))
+        index.discard("a")
+        index.discard("missing")
+        assert len(index) == 0
+        assert "a" not in index
+
+    def test_paging_over_ties_serves_every_row_once(self):
+        index = SortedIndex()
+        for item_id in ("e", "d", "c", "b", "a"):
+            index.set(item_id, (10.0, item_id))
+        index.set("z", (3.0, "z"))
+
+        seen = []
+        after = None
+        while True:
+            ids, after = index.page(after, limit=2)
+            seen.extend(ids)
+            if after is None:
+                break
+        assert seen == ["z", "a", "b", "c", "d", "e"]
+
+    def test_page_is_stable_when_earlier_rows_change(self):
+        index = SortedIndex()
+        for level, item_id in ((1.0, "a"), (2.0, "b"), (3.0, "c"), (4.0, "d")):
+            index.set(item_id, (level, item_id))
+        ids, after = index.page(limit=2)
+        assert ids == ["a", "b"]
+
+        index.discard("a")
+        index.set("x", (0.5, "x"))
+        assert index.page(after, limit=2) == (["c", "d"], None)
+
+    def test_last_key_is_none_on_final_page(self):
+        index = SortedIndex()
+        index.set("a", (1.0, "a"))
+        index.set("b", (2.0, "b"))
+        assert index.page(limit=2) == (["a", "b"], None)
+        assert index.page(limit=1) == (["a"], (1.0, "a"))
+
+    def test_mismatched_key_raises_invalid_cursor(self):
+        index = SortedIndex()
+        index.set("a", (1.0, "a"))
+        with pytest.raises(InvalidCursor):
+            index.page(("text", "a"))
+
+    def test_keys_for_filters_in_order(self):
+        index = SortedIndex()
+        for level, item_id in ((3.0, "a"), (1.0, "b"), (2.0, "c")):
+            index.set(item_id, (level, item_id))
+        assert index.keys_for({"a", "b", "missing"}) == [(1.0, "b"), (3.0, "a")]
+        assert index.keys_for({"a", "b", "c", "d"}) == [
+            (1.0, "b"), (2.0, "c"), (3.0, "a"),
+        ]
+
+
+class TestCursor:
+    """Opaque cursor encoding and validation."""
+
+    def test_round_trip(self):
+        cursor = encode_cursor("level", (12.5, "Hall", "sensor.a"))
+        assert decode_cursor(cursor, "level") == (12.5, "Hall", "sensor.a")
+
+    def test_other_sort_is_rejected(self):
+        cursor = encode_cursor("level", (12.5, "sensor.a"))
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor, "name")
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not base64!",
+            base64.urlsafe_b64encode(b"not json").decode(),
+            base64.urlsafe_b64encode(b'{"level": 1}').decode(),
+            base64.urlsafe_b64encode(b'["level", "key"]').decode(),
+            base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+        ],
+    )
+    def test_malformed_cursor_is_rejected(self, cursor):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor, "level")
@@ -0,0 +1,136 @@
+"""Unit tests for the threshold policy, severity tiers and their options schema.
+
+Usage:
+    pytest quality/unit-tests/test_thresholds.py -v
+"""
+
+import pytest
+
+vol = pytest.importorskip("voluptuous")
+
+from vulcan_brownout.const import (  # noqa: E402
+    BATTERY_THRESHOLD,
+    CONF_AREA_THRESHOLDS,
+    CONF_ENTITY_THRESHOLDS,
+    CONF_GLOBAL_THRESHOLD,
+    CONF_MODEL_THRESHOLDS,
+    CONF_SEVERITY_TIERS,
+    STATUS_CRITICAL,
+    STATUS_OK,
+    STATUS_WARNING,
+    STATUS_WATCH,
+)
+from vulcan_brownout.thresholds import (  # noqa: E402
+    TIERS_SCHEMA,
+    ThresholdPolicy,
+)
+
+
+@pytest.fixture
+def policy():
+    return ThresholdPolicy(
+        20,
+        entities={"sensor.lock_battery": 40},
+        models={"L1": 30},
+        areas={"garage": 10},
+    )
+
+
+class TestThresholdPolicy:
+    """Most specific override wins: entity, model, area, then default."""
+
+    @pytest.mark.parametrize(
+        ("entity_id", "model", "area_id", "threshold"),
+        [
+            ("sensor.lock_battery", "L1", "garage", 40.0),
+            ("sensor.other_battery", "L1", "garage", 30.0),
+            ("sensor.other_battery", "L2", "garage", 10.0),
+            ("sensor.other_battery", None, None, 20.0),
+        ],
+    )
+    def test_precedence(self, policy, entity_id, model, area_id, threshold):
+        assert policy.threshold(entity_id, model, area_id) == threshold
+
+    def test_override_is_none_when_the_default_applies(self, policy):
+        assert policy.override("sensor.other_battery", "L2", "hall") is None
+        assert policy.override("sensor.other_battery", "L1", None) == 30
+
+    def test_from_options_defaults(self):
+        policy = ThresholdPolicy.from_options({})
+        assert policy.default == BATTERY_THRESHOLD
+        assert (policy.entities, policy.models, policy.areas) == ({}, {}, {})
+        assert policy == ThresholdPolicy()
+
+    def test_from_options_coerces_values(self):
+        policy = ThresholdPolicy.from_options({
+            CONF_GLOBAL_THRESHOLD: "25",
+            CONF_ENTITY_THRESHOLDS: {"sensor.lock_battery": 40},
+            CONF_MODEL_THRESHOLDS: {"L1": "30"},
+            CONF_AREA_THRESHOLDS: {"garage": 10.5},
+            "unrelated_option": True,
+        })
+        assert policy.default == 25.0
+        assert policy.models == {"L1": 30.0}
+        assert policy.threshold("sensor.other_battery", None, "garage") == 10.5
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {CONF_GLOBAL_THRESHOLD: 101},
+            {CONF_GLOBAL_THRESHOLD: "low"},
+            {CONF_ENTITY_THRESHOLDS: {"sensor.lock_battery": -1}},
+            {CONF_MODEL_THRESHOLDS: ["L1"]},
+        ],
+    )
+    def test_from_options_rejects_invalid_values(self, options):
+        with pytest.raises(vol.Invalid):
+            ThresholdPolicy.from_options(options)
+
+    def test_equality_and_same_overrides(self, policy):
+        same = ThresholdPolicy(
+            20, {"sensor.lock_battery": 40}, {"L1": 30}, {"garage": 10}
+        )
+        assert policy == same
+        new_default = ThresholdPolicy(25, policy.entities, policy.models, policy.areas)
+        assert policy != new_default
+        assert policy.same_overrides(new_default)
+        assert not policy.same_overrides(ThresholdPolicy(20))
+
+
+class TestSeverityTiers:
+    """Fixed cut points, independent of the low threshold."""
+
+    @pytest.mark.parametrize(
+        ("level", "tier"),
+        [
+            (0, STATUS_CRITICAL), (4.9, STATUS_CRITICAL),
+            (5, STATUS_WARNING), (14.9, STATUS_WARNING),
+            (15, STATUS_WATCH), (29.9, STATUS_WATCH),
+            (30, STATUS_OK), (100, STATUS_OK),
+        ],
+    )
+    def test_default_bounds_are_exclusive(self, level, tier):
+        assert ThresholdPolicy(50).tier(level) == tier
+
+    def test_partial_tiers_keep_the_other_defaults(self):
+        policy = ThresholdPolicy.from_options(
+            {CONF_SEVERITY_TIERS: {STATUS_WATCH: "50"}}
+        )
+        assert policy.tier_bounds == (5.0, 15.0, 50.0)
+        assert policy.tier(40) == STATUS_WATCH
+        assert policy != ThresholdPolicy()
+        assert policy.same_overrides(ThresholdPolicy())
+
+    @pytest.mark.parametrize(
+        "tiers",
+        [
+            {STATUS_CRITICAL: 20},
+            {STATUS_WARNING: 40, STATUS_WATCH: 30},
+            {STATUS_WATCH: 120},
+        ],
+    )
+    def test_schema_rejects_invalid_bounds(self, tiers):
+        with pytest.raises(vol.Invalid):
+            TIERS_SCHEMA(tiers)
+        with pytest.raises(vol.Invalid):
+            ThresholdPolicy.from_options({CONF_SEVERITY_TIERS: tiers})